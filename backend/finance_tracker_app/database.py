@@ -0,0 +1,64 @@
+"""
+Konfigurasi koneksi database dari environment variable.
+
+SQLite (tanpa DATABASE_URL): PRAGMA di SQLITE_PRAGMAS dipasang di setiap koneksi baru lewat sinyal
+connection_created. WAL membuat pembaca tidak terblokir penulis, dan transaksi IMMEDIATE mengambil kunci tulis di
+awal sehingga penulis yang bersaing menunggu busy timeout alih-alih langsung gagal "database is locked".
+
+PostgreSQL (DATABASE_URL): health check koneksi selalu aktif; dengan DB_POOL=True (default) koneksi diambil dari
+pool psycopg 3 per proses, jika tidak koneksi persisten biasa dengan DB_CONN_MAX_AGE.
+"""
+import os
+
+import dj_database_url
+from django.conf import settings
+from django.db.backends.signals import connection_created
+from django.dispatch import receiver
+
+
+def sqlite_pragmas():
+    return {
+        'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 256 * 1024 * 1024)),
+        # Negatif = dalam KiB (64 MiB per koneksi)
+        'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -64000)),
+    }
+
+
+def sqlite_config(base_dir):
+    return {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'NAME': os.environ.get('SQLITE_PATH', base_dir / 'db.sqlite3'),
+        'OPTIONS': {
+            'transaction_mode': os.environ.get('SQLITE_TRANSACTION_MODE', 'IMMEDIATE') or None,
+            # Batas tunggu sqlite3.connect (detik), diselaraskan dengan PRAGMA busy_timeout
+            'timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)) / 1000,
+        },
+        # Database uji berbasis file: SQLite in-memory (shared cache) tidak mendukung penulis paralel
+        'TEST': {'NAME': base_dir / 'test_db.sqlite3'},
+    }
+
+
+def url_config():
+    config = dj_database_url.config(conn_max_age=int(os.environ.get('DB_CONN_MAX_AGE', 600)),
+                                    conn_health_checks=True,
+                                    ssl_require=os.environ.get('DATABASE_SSL_REQUIRE', 'True') == 'True')
+    if config['ENGINE'].endswith('postgresql') and os.environ.get('DB_POOL', 'True') == 'True':
+        # Pool tidak bisa digabung dengan koneksi persisten; koneksi dikembalikan ke pool di akhir request
+        config['CONN_MAX_AGE'] = 0
+        config.setdefault('OPTIONS', {})['pool'] = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 2)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'timeout': int(os.environ.get('DB_POOL_TIMEOUT', 10)),
+        }
+    return config
+
+
+@receiver(connection_created)
+def configure_connection(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    for name, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+        connection.connection.execute(f'PRAGMA {name} = {value}')
@@ -0,0 +1,114 @@
+import json
+import logging
+import time
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+
+logger = logging.getLogger('finance_tracker_app.performance')
+slow_logger = logging.getLogger('finance_tracker_app.slow_requests')
+
+# Batas query yang disimpan per request untuk log request lambat; jumlah dan total waktu tetap dihitung semua
+MAX_RECORDED_QUERIES = 500
+MAX_SQL_LENGTH = 2000
+
+
+class QueryRecorder:
+    """execute_wrapper yang mencatat durasi tiap statement SQL di semua koneksi selama satu request."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            if len(self.queries) < MAX_RECORDED_QUERIES:
+                self.queries.append((elapsed, context['connection'].alias, sql[:MAX_SQL_LENGTH]))
+
+    def slowest(self, limit):
+        return sorted(self.queries, key=lambda query: query[0], reverse=True)[:limit]
+
+
+def _ms(seconds):
+    return round(seconds * 1000, 2)
+
+
+def _query_entries(queries):
+    return [{'ms': _ms(elapsed), 'db': alias, 'sql': sql} for elapsed, alias, sql in queries]
+
+
+class PerformanceMiddleware:
+    """
+    Catat jumlah query, waktu DB, waktu view, dan statement paling lambat per request, baik view HTML maupun
+    API. Hasilnya dikirim sebagai header Server-Timing dan satu baris log JSON level DEBUG; request di atas
+    SLOW_REQUEST_MS ditulis ke log request lambat beserta daftar query-nya. Untuk respons streaming, waktu
+    yang dicatat hanya sampai respons mulai dikirim. Berjalan di WSGI maupun ASGI tanpa adaptasi sync/async.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        recorder, started = QueryRecorder(), time.perf_counter()
+        with self._recording(recorder):
+            response = self.get_response(request)
+        return self._report(request, response, recorder, time.perf_counter() - started)
+
+    async def __acall__(self, request):
+        recorder, started = QueryRecorder(), time.perf_counter()
+        with self._recording(recorder):
+            response = await self.get_response(request)
+        return self._report(request, response, recorder, time.perf_counter() - started)
+
+    def _recording(self, recorder):
+        stack = ExitStack()
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(recorder))
+        return stack
+
+    def _report(self, request, response, recorder, total):
+        view = max(total - recorder.duration, 0)
+        timing = (f'db;dur={_ms(recorder.duration)};desc="{recorder.count} queries", '
+                  f'view;dur={_ms(view)}, total;dur={_ms(total)}')
+        if response.has_header('Server-Timing'):
+            timing = f"{response['Server-Timing']}, {timing}"
+        response['Server-Timing'] = timing
+
+        match = getattr(request, 'resolver_match', None)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': match.view_name if match else None,
+            'status': response.status_code,
+            # Hanya user yang sudah dimuat view (request.user atau auser()); jangan memicu query sesudah pengukuran
+            'user': getattr(getattr(request, '_cached_user', None) or getattr(request, '_acached_user', None), 'pk',
+                            None),
+            'total_ms': _ms(total),
+            'db_ms': _ms(recorder.duration),
+            'view_ms': _ms(view),
+            'queries': recorder.count,
+            'slowest': _query_entries(recorder.slowest(settings.PERFORMANCE_SLOWEST_QUERIES)),
+        }
+        # Satu baris per request terlalu ramai untuk produksi; aktifkan dengan PERFORMANCE_LOG_LEVEL=DEBUG
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(json.dumps(record), extra={'performance': record})
+        if record['total_ms'] >= settings.SLOW_REQUEST_MS:
+            slow = {key: value for key, value in record.items() if key != 'slowest'}
+            slow['query_list'] = _query_entries(recorder.queries)
+            slow_logger.warning(json.dumps(slow), extra={'performance': slow})
+        return response
@@ -12,7 +12,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 import os
 from pathlib import Path
 
-import dj_database_url
+from . import database
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -85,8 +85,9 @@ REST_FRAMEWORK = {
     ]
 }
 
-MIDDLEWARE = ['django.middleware.security.SecurityMiddleware', 'whitenoise.middleware.WhiteNoiseMiddleware',
-              'django.contrib.sessions.middleware.SessionMiddleware', 'corsheaders.middleware.CorsMiddleware',
+MIDDLEWARE = ['finance_tracker_app.middleware.PerformanceMiddleware', 'django.middleware.security.SecurityMiddleware',
+              'whitenoise.middleware.WhiteNoiseMiddleware', 'django.contrib.sessions.middleware.SessionMiddleware',
+              'corsheaders.middleware.CorsMiddleware',
               'django.middleware.common.CommonMiddleware', 'django.middleware.csrf.CsrfViewMiddleware',
               'django.contrib.auth.middleware.AuthenticationMiddleware',
               'django.contrib.messages.middleware.MessageMiddleware',
@@ -105,10 +106,58 @@ WSGI_APPLICATION = 'finance_tracker_app.wsgi.application'
 
 # Database
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
+# Pengaturan koneksi dan tuning per vendor ada di finance_tracker_app.database (semua lewat environment variable)
 if 'DATABASE_URL' in os.environ:
-    DATABASES = {'default': dj_database_url.config(conn_max_age=600, ssl_require=True)}
+    DATABASES = {'default': database.url_config()}
 else:
-    DATABASES = {'default': {'ENGINE': 'django.db.backends.sqlite3', 'NAME': BASE_DIR / 'db.sqlite3', }}
+    DATABASES = {'default': database.sqlite_config(BASE_DIR)}
+SQLITE_PRAGMAS = database.sqlite_pragmas()
+
+# Thread worker (masing-masing dengan koneksi DB sendiri) untuk agregat yang dijalankan bersamaan di view async
+# (transactions.concurrency.gather). 0 = berurutan lewat ORM async biasa. Baru menguntungkan bila koneksi dipakai
+# ulang (persisten atau dari pool) dan tiap query punya latensi jaringan, jadi default-nya hanya aktif untuk PostgreSQL.
+ASYNC_QUERY_WORKERS = int(os.environ.get('ASYNC_QUERY_WORKERS',
+                                         4 if DATABASES['default']['ENGINE'].endswith('postgresql') else 0))
+
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+# Entri cache per pengguna diinvalidasi lewat versi data, timeout hanya untuk membebaskan memori.
+CACHES = {'default': {'BACKEND': os.environ.get('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'),
+                      'LOCATION': os.environ.get('CACHE_LOCATION', 'finance-tracker'), }}
+USER_CACHE_TIMEOUT = int(os.environ.get('USER_CACHE_TIMEOUT', 24 * 60 * 60))
+
+# Antrean job latar belakang (transactions.jobs, manage.py run_jobs)
+JOB_WORKER_PROCESSES = int(os.environ.get('JOB_WORKER_PROCESSES', 2))
+JOB_POLL_INTERVAL = float(os.environ.get('JOB_POLL_INTERVAL', 1))
+JOB_STALE_SECONDS = int(os.environ.get('JOB_STALE_SECONDS', 300))
+JOB_MAX_ATTEMPTS = int(os.environ.get('JOB_MAX_ATTEMPTS', 3))
+# Impor CSV lewat halaman web yang lebih besar dari ini dijalankan sebagai job
+IMPORT_JOB_THRESHOLD_BYTES = int(os.environ.get('IMPORT_JOB_THRESHOLD_BYTES', 1024 * 1024))
+
+# Ekspor delta (GET /api/export/): X-Next-Updated-Since dimundurkan sekian detik karena updated_at diisi sebelum
+# commit; harus lebih lama dari transaksi tulis terlama agar baris yang commit belakangan tidak terlewat
+EXPORT_SYNC_LAG_SECONDS = int(os.environ.get('EXPORT_SYNC_LAG_SECONDS', 60))
+
+# Instrumentasi per request (finance_tracker_app.middleware.PerformanceMiddleware)
+SLOW_REQUEST_MS = float(os.environ.get('SLOW_REQUEST_MS', 500))
+PERFORMANCE_SLOWEST_QUERIES = int(os.environ.get('PERFORMANCE_SLOWEST_QUERIES', 5))
+SLOW_REQUEST_LOG = os.environ.get('SLOW_REQUEST_LOG')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {'plain': {'format': '%(asctime)s %(levelname)s %(name)s %(message)s'}},
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'plain'},
+        'slow_requests': ({'class': 'logging.FileHandler', 'filename': SLOW_REQUEST_LOG, 'formatter': 'plain'}
+                          if SLOW_REQUEST_LOG else {'class': 'logging.StreamHandler', 'formatter': 'plain'}),
+    },
+    'loggers': {
+        'finance_tracker_app.performance': {'handlers': ['console'], 'propagate': False,
+                                            'level': os.environ.get('PERFORMANCE_LOG_LEVEL', 'WARNING')},
+        'finance_tracker_app.slow_requests': {'handlers': ['slow_requests'], 'level': 'WARNING', 'propagate': False},
+    },
+}
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
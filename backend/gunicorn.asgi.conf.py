@@ -0,0 +1,26 @@
+# Konfigurasi server ASGI produksi: gunicorn sebagai process manager dengan worker uvicorn, sehingga view async
+# (dashboard) berjalan di event loop dan agregatnya bisa dijalankan bersamaan (lihat ASYNC_QUERY_WORKERS).
+#
+#   gunicorn -c gunicorn.asgi.conf.py
+#
+# Sengaja tidak bernama gunicorn.conf.py: gunicorn memuat berkas itu otomatis dari direktori kerja, sehingga
+# `gunicorn finance_tracker_app.wsgi` akan ikut beralih ke ASGI tanpa diminta.
+#
+# Semua nilai bisa diatur lewat environment: PORT, WEB_CONCURRENCY, GUNICORN_TIMEOUT, GUNICORN_KEEPALIVE.
+# Tiap worker proses membuka paling banyak 1 + ASYNC_QUERY_WORKERS koneksi DB (CONN_MAX_AGE=600 dengan
+# DATABASE_URL), jadi WEB_CONCURRENCY * (1 + ASYNC_QUERY_WORKERS) harus muat di max_connections PostgreSQL.
+import multiprocessing
+import os
+
+wsgi_app = 'finance_tracker_app.asgi:application'
+worker_class = 'uvicorn_worker.UvicornWorker'
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(os.environ.get('WEB_CONCURRENCY', min(multiprocessing.cpu_count() * 2 + 1, 8)))
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+graceful_timeout = 30
+# Worker didaur ulang berkala agar kebocoran memori tidak menumpuk
+max_requests = 2000
+max_requests_jitter = 200
+accesslog = '-'
+errorlog = '-'
@@ -0,0 +1,77 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from .models import Wallet
+
+ACCESS_KEY = 'wallet-access:{user_id}'
+
+
+def _user_id(user):
+    return getattr(user, 'pk', user)
+
+
+def accessible_wallet_ids(user):
+    """
+    Id dompet milik pengguna dan yang dibagikan kepadanya. Dihitung sekali per request (disimpan di objek user)
+    dan disimpan di cache antar-request; cache dihapus lewat sinyal saat dompet dibuat/dihapus atau shared_with
+    berubah. Dipakai sebagai filter wallet_id IN (...) biasa, tanpa join M2M dan DISTINCT.
+    """
+    ids = getattr(user, '_accessible_wallet_ids', None)
+    if ids is not None:
+        return ids
+    key = ACCESS_KEY.format(user_id=user.pk)
+    ids = cache.get(key)
+    if ids is None:
+        owned = Wallet.objects.filter(user=user).values_list('pk', flat=True)
+        shared = Wallet.shared_with.through.objects.filter(user=user).values_list('wallet_id', flat=True)
+        ids = sorted(owned.union(shared))
+        cache.set(key, ids, settings.USER_CACHE_TIMEOUT)
+    user._accessible_wallet_ids = ids
+    return ids
+
+
+def accessible_wallets(user):
+    return Wallet.objects.filter(pk__in=accessible_wallet_ids(user))
+
+
+def invalidate(*users):
+    keys = [ACCESS_KEY.format(user_id=_user_id(user)) for user in users if user is not None]
+    if keys:
+        cache.delete_many(keys)
+        # Hapus lagi setelah commit agar request lain tidak menyimpan daftar lama yang dibaca sebelum commit
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+@receiver(post_save, sender=Wallet)
+def _wallet_saved(sender, instance, created, **kwargs):
+    if created:
+        invalidate(instance.user_id)
+
+
+@receiver(pre_delete, sender=Wallet)
+def _wallet_deleting(sender, instance, **kwargs):
+    # Baris shared_with sudah terhapus saat post_delete, jadi penerimanya dicatat lebih dulu
+    instance._shared_user_ids = list(instance.shared_with.values_list('pk', flat=True))
+
+
+@receiver(post_delete, sender=Wallet)
+def _wallet_deleted(sender, instance, **kwargs):
+    invalidate(instance.user_id, *getattr(instance, '_shared_user_ids', ()))
+
+
+@receiver(m2m_changed, sender=Wallet.shared_with.through)
+def _shared_with_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if reverse:
+        # instance adalah User; hanya akses user itu yang berubah
+        if action in ('post_add', 'post_remove', 'post_clear'):
+            invalidate(instance)
+    elif action == 'pre_clear':
+        # pk_set kosong untuk clear(), jadi penerimanya dicatat sebelum barisnya dihapus
+        instance._cleared_user_ids = list(instance.shared_with.values_list('pk', flat=True))
+    elif action == 'post_clear':
+        invalidate(*getattr(instance, '_cleared_user_ids', ()))
+    elif action in ('post_add', 'post_remove'):
+        invalidate(*pk_set)
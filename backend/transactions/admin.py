@@ -1,8 +1,9 @@
 from django.contrib import admin
-from .models import Category, Wallet, Payee, Transaction, Budget
+from .models import Category, Wallet, Payee, Transaction, Budget, RecurringRule
 
 admin.site.register(Category)
 admin.site.register(Wallet)
 admin.site.register(Payee)
 admin.site.register(Transaction)
-admin.site.register(Budget)
\ No newline at end of file
+admin.site.register(Budget)
+admin.site.register(RecurringRule)
\ No newline at end of file
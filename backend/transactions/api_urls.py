@@ -11,6 +11,10 @@ router.register(r'budgets', api_views.BudgetViewSet, basename='budget')
 router.register(r'goals', api_views.FinancialGoalViewSet, basename='goal')
 router.register(r'debts', api_views.DebtViewSet, basename='debt')
 router.register(r'transfers', api_views.TransferViewSet, basename='transfer')
+router.register(r'recurring', api_views.RecurringRuleViewSet, basename='recurring')
+router.register(r'jobs', api_views.JobViewSet, basename='job')
+router.register(r'reports', api_views.ReportViewSet, basename='report')
+router.register(r'export', api_views.ExportViewSet, basename='export')
 
 urlpatterns = [
     path('', include(router.urls)),
@@ -1,11 +1,26 @@
-from rest_framework import viewsets, status
-from rest_framework.decorators import api_view, permission_classes
+import copy
+import hashlib
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import transaction as db_transaction
+from django.http import HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date
+from rest_framework import mixins, serializers, viewsets, status
+from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
-from .models import Category, Wallet, Payee, Transaction, Budget, FinancialGoal, Debt, Transfer
+from . import balances, bulk, caching, exporters, recurring, reports, rollups, search, suggestions
+from .models import Category, Wallet, Payee, Transaction, Budget, FinancialGoal, Debt, Transfer, RecurringRule, Job
+from .pagination import MAX_TRANSACTION_PAGE_SIZE, TRANSACTION_ORDERING, TransactionCursorPagination
 from .serializers import (
-    CategorySerializer, WalletSerializer, PayeeSerializer, TransactionSerializer,
-    BudgetSerializer, FinancialGoalSerializer, DebtSerializer, TransferSerializer, UserSerializer
+    CategorySerializer, WalletSerializer, WalletBalanceSerializer, PayeeSerializer, TransactionSerializer,
+    TransactionFilterSerializer, BudgetSerializer, BudgetProgressSerializer, FinancialGoalSerializer, DebtSerializer,
+    TransferSerializer, UserSerializer, CashflowQuerySerializer, ReportRangeSerializer, ProjectionQuerySerializer,
+    RecurringRuleSerializer, JobSerializer, ExportQuerySerializer, PayeeSuggestQuerySerializer
 )
 
 @api_view(['GET'])
@@ -16,69 +31,234 @@ def whoami(request):
 
 class BaseUserViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated]
+    # True untuk resource yang ikut dihitung di dasbor (lihat caching.bump_data_version)
+    bumps_data_version = False
+    # Relasi yang dibaca serializer, dimuat sekaligus agar daftar tidak menjalankan query per baris
+    select_related_fields = ()
+    prefetch_related_fields = ()
+    # Resource (caching.RESOURCE_MODELS) yang menentukan isi daftar; bila diisi, daftar dikirim dengan ETag dan
+    # If-None-Match yang cocok dijawab 304 tanpa menjalankan query daftar maupun serializer
+    etag_resources = ()
+
+    def etag_versions(self):
+        return caching.get_resource_versions(self.request.user, self.etag_resources)
+
+    def list(self, request, *args, **kwargs):
+        if not self.etag_resources:
+            return super().list(request, *args, **kwargs)
+        key = f'{request.user.pk}|{request.get_full_path()}|{request.accepted_media_type}|{self.etag_versions()}'
+        etag = f'W/"{hashlib.sha1(key.encode()).hexdigest()}"'
+        response = get_conditional_response(request, etag=etag) or super().list(request, *args, **kwargs)
+        response['ETag'] = etag
+        # Hanya untuk browser pengguna itu sendiri, dan selalu divalidasi ulang
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
 
     def get_queryset(self):
-        return self.queryset.filter(user=self.request.user)
+        queryset = self.queryset.filter(user=self.request.user)
+        if self.select_related_fields:
+            queryset = queryset.select_related(*self.select_related_fields)
+        if self.prefetch_related_fields:
+            queryset = queryset.prefetch_related(*self.prefetch_related_fields)
+        return queryset
+
+    def data_changed(self, *users):
+        if self.bumps_data_version:
+            caching.bump_data_version(self.request.user, *users)
 
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
+        self.data_changed()
+
+    def perform_update(self, serializer):
+        serializer.save()
+        self.data_changed()
+
+    def perform_destroy(self, instance):
+        instance.delete()
+        self.data_changed()
 
 class CategoryViewSet(BaseUserViewSet):
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    # Nama kategori tampil di grafik dasbor
+    bumps_data_version = True
+    etag_resources = ('category',)
+
+    @db_transaction.atomic
+    def perform_destroy(self, instance):
+        rollups.fold_category(instance)
+        super().perform_destroy(instance)
 
 class WalletViewSet(BaseUserViewSet):
     queryset = Wallet.objects.all()
     serializer_class = WalletSerializer
+    bumps_data_version = True
+    etag_resources = ('wallet',)
+
+    def etag_versions(self):
+        # Saldo berubah lewat transaksi/transfer tanpa menyimpan dompet, tetapi selalu menaikkan versi data
+        return (*super().etag_versions(), caching.get_data_version(self.request.user))
+
+    @db_transaction.atomic
+    def perform_create(self, serializer):
+        super().perform_create(serializer)
+        balances.record_wallet_saved(serializer.instance)
+
+    @db_transaction.atomic
+    def perform_update(self, serializer):
+        old_balance = Wallet.objects.select_for_update().values_list('balance', flat=True).get(
+            pk=serializer.instance.pk)
+        super().perform_update(serializer)
+        balances.record_wallet_saved(serializer.instance, old_balance)
+
+    @action(detail=True, methods=['get'])
+    def balance(self, request, pk=None):
+        wallet = self.get_object()
+        as_of = request.query_params.get('date')
+        if as_of:
+            try:
+                as_of = date.fromisoformat(as_of)
+            except ValueError:
+                return Response({'date': 'Format tanggal harus YYYY-MM-DD.'}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(WalletBalanceSerializer({'wallet': wallet.pk, 'date': as_of or None,
+                                                 'balance': balances.balance_as_of(wallet.pk, as_of or None),
+                                                 'current_balance': wallet.balance}).data)
 
 class PayeeViewSet(BaseUserViewSet):
     queryset = Payee.objects.all()
     serializer_class = PayeeSerializer
+    etag_resources = ('payee',)
+
+    @action(detail=False, methods=['get'])
+    def suggest(self, request):
+        params = PayeeSuggestQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return Response(suggestions.suggest(request.user, params.validated_data['q'], params.validated_data['limit']))
 
 class TransactionViewSet(BaseUserViewSet):
     queryset = Transaction.objects.all()
     serializer_class = TransactionSerializer
+    select_related_fields = ('wallet', 'category', 'payee')
+    pagination_class = TransactionCursorPagination
+    ordering = TRANSACTION_ORDERING
+    bumps_data_version = True
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action in ('update', 'partial_update', 'destroy'):
+            # Baris dikunci sampai commit agar pembalikan saldo dihitung dari nilai terbaru
+            queryset = queryset.select_for_update(of=('self',))
+        return queryset
 
+    def filter_queryset(self, queryset):
+        if self.action != 'list':
+            return queryset
+        params = TransactionFilterSerializer(data=self.request.query_params)
+        params.is_valid(raise_exception=True)
+        self.ordering = params.validated_data['ordering']
+        return queryset.filter(**params.filters())
+
+    @db_transaction.atomic
     def perform_create(self, serializer):
         transaction = serializer.save(user=self.request.user)
-        wallet = transaction.wallet
-        total_expense = transaction.amount + transaction.admin_fee
-        if transaction.transaction_type == 'PENGELUARAN':
-            wallet.balance -= total_expense
-        elif transaction.transaction_type == 'PEMASUKAN':
-            wallet.balance += transaction.amount
-        wallet.save()
+        rollups.record_transaction(transaction)
+        balances.apply_delta(transaction.wallet_id, balances.transaction_delta(transaction))
+        self.data_changed(transaction.wallet.user_id)
 
-    def perform_update(self, serializer):
-        old_transaction = self.get_object()
-        old_wallet = old_transaction.wallet
-        if old_transaction.transaction_type == 'PENGELUARAN':
-            old_wallet.balance += (old_transaction.amount + old_transaction.admin_fee)
-        elif old_transaction.transaction_type == 'PEMASUKAN':
-            old_wallet.balance -= old_transaction.amount
-        old_wallet.save()
+    @db_transaction.atomic
+    def update(self, request, *args, **kwargs):
+        return super().update(request, *args, **kwargs)
 
+    @db_transaction.atomic
+    def destroy(self, request, *args, **kwargs):
+        return super().destroy(request, *args, **kwargs)
+
+    def perform_update(self, serializer):
+        # Instance sudah dikunci oleh get_object; salin sebelum serializer mengubahnya
+        old_transaction = copy.copy(serializer.instance)
+        old_delta = balances.transaction_delta(old_transaction)
         new_transaction = serializer.save()
-        new_wallet = new_transaction.wallet
-        if new_transaction.transaction_type == 'PENGELUARAN':
-            new_wallet.balance -= (new_transaction.amount + new_transaction.admin_fee)
-        elif new_transaction.transaction_type == 'PEMASUKAN':
-            new_wallet.balance += new_transaction.amount
-        new_wallet.save()
+        balances.apply_deltas([(old_transaction.wallet_id, -old_delta),
+                               (new_transaction.wallet_id, balances.transaction_delta(new_transaction))])
 
+        batch = rollups.RollupBatch()
+        batch.add_transaction(old_transaction, sign=-1)
+        batch.add_transaction(new_transaction)
+        batch.apply()
+        self.data_changed(old_transaction.wallet.user_id, new_transaction.wallet.user_id)
 
     def perform_destroy(self, instance):
-        wallet = instance.wallet
-        if instance.transaction_type == 'PENGELUARAN':
-            wallet.balance += (instance.amount + instance.admin_fee)
-        elif instance.transaction_type == 'PEMASUKAN':
-            wallet.balance -= instance.amount
-        wallet.save()
+        balances.apply_delta(instance.wallet_id, -balances.transaction_delta(instance))
+        rollups.record_transaction(instance, sign=-1)
         instance.delete()
+        self.data_changed(instance.wallet.user_id)
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        try:
+            limit = min(int(request.query_params.get('limit', search.SEARCH_LIMIT)), MAX_TRANSACTION_PAGE_SIZE)
+        except ValueError:
+            return Response({'limit': "Harus berupa angka."}, status=status.HTTP_400_BAD_REQUEST)
+        results = search.search_transactions(request.user, request.query_params.get('q', ''), max(limit, 1))
+        return Response(self.get_serializer(results, many=True).data)
+
+    @action(detail=False, methods=['post', 'patch', 'delete'])
+    def bulk(self, request):
+        # Body: daftar item, atau {"items": [...], "all_or_nothing": true}; DELETE berisi daftar id
+        items, all_or_nothing = request.data, False
+        if isinstance(items, dict):
+            items, all_or_nothing = items.get('items'), bool(items.get('all_or_nothing'))
+        if not isinstance(items, list) or not items:
+            return Response({'detail': "Kirim daftar item transaksi."}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > bulk.MAX_BULK_ITEMS:
+            return Response({'detail': f"Maksimal {bulk.MAX_BULK_ITEMS} item per request."},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        writer = bulk.TransactionBulkWriter(request.user, all_or_nothing=all_or_nothing)
+        with db_transaction.atomic():
+            if request.method == 'POST':
+                done = writer.create(items)
+            elif request.method == 'PATCH':
+                done = writer.update(items)
+            else:
+                done = writer.delete(items)
+
+        results = []
+        for index in range(len(items)):
+            if index in writer.errors:
+                results.append({'index': index, 'errors': writer.errors[index]})
+            else:
+                results.append({'index': index, 'id': done[index].pk if index in done else None})
+        if not done:
+            response_status = status.HTTP_400_BAD_REQUEST
+        elif request.method == 'POST':
+            response_status = status.HTTP_201_CREATED
+        else:
+            response_status = status.HTTP_200_OK
+        return Response({'succeeded': len(done), 'failed': len(writer.errors), 'results': results},
+                        status=response_status)
 
 class BudgetViewSet(BaseUserViewSet):
     queryset = Budget.objects.all()
     serializer_class = BudgetSerializer
+    select_related_fields = ('category',)
+    # Nama kategori ikut diserialisasi
+    etag_resources = ('budget', 'category')
+
+    @action(detail=False, methods=['get'])
+    def progress(self, request):
+        budgets = self.get_queryset().order_by('month', 'category__name')
+        month = request.query_params.get('month')
+        if month:
+            try:
+                month = date.fromisoformat(month if len(month) > 7 else f'{month}-01')
+            except ValueError:
+                return Response({'month': 'Format bulan harus YYYY-MM.'}, status=status.HTTP_400_BAD_REQUEST)
+            month = month.replace(day=1)
+            budgets = budgets.filter(month__gte=month, month__lt=(month + timedelta(days=32)).replace(day=1))
+        budgets = [reports.set_budget_progress(budget) for budget in reports.with_budget_spent(budgets, request.user)]
+        return Response(BudgetProgressSerializer(budgets, many=True).data)
 
 class FinancialGoalViewSet(BaseUserViewSet):
     queryset = FinancialGoal.objects.all()
@@ -87,12 +267,16 @@ class FinancialGoalViewSet(BaseUserViewSet):
 class DebtViewSet(BaseUserViewSet):
     queryset = Debt.objects.all()
     serializer_class = DebtSerializer
+    bumps_data_version = True
 
 
 class TransferViewSet(BaseUserViewSet):
     queryset = Transfer.objects.all()
     serializer_class = TransferSerializer
+    select_related_fields = ('from_wallet', 'to_wallet')
+    bumps_data_version = True
 
+    @db_transaction.atomic
     def perform_create(self, serializer):
         from_wallet = serializer.validated_data['from_wallet']
         to_wallet = serializer.validated_data['to_wallet']
@@ -101,12 +285,95 @@ class TransferViewSet(BaseUserViewSet):
 
         if from_wallet == to_wallet:
             raise serializers.ValidationError("Dompet asal dan tujuan tidak boleh sama.")
-        if from_wallet.balance < (amount + admin_fee):
+        try:
+            balances.transfer(from_wallet.pk, to_wallet.pk, amount, admin_fee)
+        except balances.InsufficientFunds:
             raise serializers.ValidationError(f"Saldo di {from_wallet.name} tidak mencukupi.")
 
-        from_wallet.balance -= (amount + admin_fee)
-        to_wallet.balance += amount
-        from_wallet.save()
-        to_wallet.save()
+        serializer.save(user=self.request.user)
+        self.data_changed(from_wallet.user_id, to_wallet.user_id)
+
+class RecurringRuleViewSet(BaseUserViewSet):
+    queryset = RecurringRule.objects.all()
+    serializer_class = RecurringRuleSerializer
+    select_related_fields = ('wallet',)
+
+    def perform_update(self, serializer):
+        rule = serializer.instance
+        since = rule.next_run
+        schedule = (rule.frequency, rule.interval, rule.start_date, rule.end_date)
+        rule = serializer.save()
+        if schedule != (rule.frequency, rule.interval, rule.start_date, rule.end_date):
+            # Kejadian sebelum since sudah dibuat; aturan yang sudah selesai dilanjutkan mulai hari ini
+            recurring.reschedule(rule, since or date.today())
+            rule.save(update_fields=['occurrences', 'next_run'])
+
+    @action(detail=False, methods=['get'])
+    def projection(self, request):
+        params = ProjectionQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return Response(recurring.projection(request.user, **params.validated_data))
+
+class ReportViewSet(viewsets.ViewSet):
+    @action(detail=False, methods=['get'])
+    def cashflow(self, request):
+        params = CashflowQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return Response(reports.cashflow(request.user, **params.validated_data))
+
+    @action(detail=False, methods=['get'], url_path='net-worth')
+    def net_worth(self, request):
+        params = ReportRangeSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return Response(reports.net_worth(request.user, **params.validated_data))
+
+class ExportViewSet(viewsets.ViewSet):
+    """
+    Ekspor NDJSON transaksi, transfer, dan item pembelian, dikompresi gzip saat klien menerimanya. Sinkronisasi
+    berikutnya mengirim updated_since = X-Next-Updated-Since dari respons ini, dan If-None-Match untuk 304 bila
+    tidak ada yang berubah. Baris yang sama bisa muncul di dua ekspor berurutan, jadi klien menimpa menurut id.
+    """
+
+    def list(self, request):
+        params = ExportQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        updated_since = params.validated_data.get('updated_since')
+        # Diambil sebelum data dibaca dan dimundurkan agar baris yang sudah diberi updated_at tetapi baru commit
+        # sesudah ekspor ini ikut di sinkronisasi berikutnya; baris di rentang itu bisa terkirim dua kali
+        watermark = timezone.now() - timedelta(seconds=settings.EXPORT_SYNC_LAG_SECONDS)
+        etag, last_modified = exporters.export_state(request.user, updated_since)
+        last_modified = last_modified and last_modified.timestamp()
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            lines = exporters.iter_export_ndjson(request.user, updated_since)
+            if 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+                response = StreamingHttpResponse(exporters.gzip_stream(lines), content_type='application/x-ndjson')
+                response['Content-Encoding'] = 'gzip'
+            else:
+                response = StreamingHttpResponse(lines, content_type='application/x-ndjson')
+            response['X-Next-Updated-Since'] = watermark.isoformat()
+        response['ETag'] = etag
+        if last_modified:
+            response['Last-Modified'] = http_date(last_modified)
+        patch_vary_headers(response, ['Accept-Encoding'])
+        return response
+
+class JobViewSet(mixins.CreateModelMixin, mixins.ListModelMixin, mixins.RetrieveModelMixin, viewsets.GenericViewSet):
+    """Antrekan impor/ekspor/hitung ulang, pantau status dan progresnya, lalu unduh hasilnya."""
+    serializer_class = JobSerializer
+
+    def get_queryset(self):
+        # Isi berkas hanya dibaca saat diunduh
+        return Job.objects.filter(user=self.request.user).defer('input_data', 'result_data').order_by('-id')
+
+    def perform_create(self, serializer):
+        serializer.save(user=self.request.user)
 
-        serializer.save(user=self.request.user)
\ No newline at end of file
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        job = self.get_object()
+        if not job.result_name:
+            return Response({'detail': "Job ini belum punya hasil."}, status=status.HTTP_404_NOT_FOUND)
+        response = HttpResponse(bytes(job.result_data), content_type=job.result_content_type)
+        response['Content-Disposition'] = f'attachment; filename="{job.result_name}"'
+        return response
@@ -4,3 +4,9 @@ from django.apps import AppConfig
 class TransactionsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'transactions'
+
+    def ready(self):
+        # Sinyal invalidasi cache akses dompet
+        from . import access  # noqa: F401
+        # Sinyal jejak penghapusan untuk ekspor delta dan versi daftar untuk ETag
+        from . import caching, exporters  # noqa: F401
@@ -0,0 +1,144 @@
+from collections import defaultdict
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import BalanceCheckpoint, BalanceEntry, Transaction, Wallet
+
+# Jumlah entri ledger per dompet sebelum checkpoint saldo baru dibuat; membatasi ekor yang dijumlahkan
+LEDGER_CHECKPOINT_INTERVAL = 200
+
+
+class InsufficientFunds(Exception):
+    def __init__(self, wallet_id):
+        super().__init__(f"Saldo dompet {wallet_id} tidak mencukupi.")
+        self.wallet_id = wallet_id
+
+
+def balance_delta(transaction_type, amount, admin_fee):
+    if transaction_type == Transaction.TransactionType.EXPENSE:
+        return -(amount + admin_fee)
+    if transaction_type == Transaction.TransactionType.INCOME:
+        return amount
+    return Decimal(0)
+
+
+def transaction_delta(tx):
+    return balance_delta(tx.transaction_type, tx.amount, tx.admin_fee)
+
+
+@transaction.atomic
+def apply_delta(wallet_id, delta, require_funds=False, kind=BalanceEntry.EntryKind.TRANSACTION):
+    """
+    Ubah saldo dengan satu UPDATE ... SET balance = balance + delta, tanpa membaca-ubah-simpan di Python,
+    lalu catat delta yang sama di ledger. Dengan require_funds, cek saldo cukup dilakukan di statement yang
+    sama dan InsufficientFunds dilempar bila tidak ada baris yang berubah.
+    """
+    if not delta:
+        return
+    wallets = Wallet.objects.filter(pk=wallet_id)
+    if require_funds and delta < 0:
+        wallets = wallets.filter(balance__gte=-delta)
+    if not wallets.update(balance=F('balance') + delta):
+        if require_funds:
+            raise InsufficientFunds(wallet_id)
+        raise Wallet.DoesNotExist(f"Dompet {wallet_id} tidak ditemukan.")
+    record_entry(wallet_id, delta, kind)
+
+
+def record_entry(wallet_id, amount, kind):
+    """
+    Tambahkan entri ledger untuk perubahan saldo yang sudah ditulis ke baris dompet. Pemanggil harus sudah
+    mengunci baris dompet (UPDATE/save) di transaksi yang sama agar checkpoint tidak melewatkan entri lain.
+    """
+    if not amount:
+        return None
+    entry = BalanceEntry.objects.create(wallet_id=wallet_id, amount=amount, kind=kind, recorded_at=timezone.now())
+    checkpoint = _latest_checkpoint(wallet_id)
+    after = checkpoint.last_entry_id if checkpoint else 0
+    tail = BalanceEntry.objects.filter(wallet_id=wallet_id, pk__gt=after)
+    if tail.count() >= LEDGER_CHECKPOINT_INTERVAL:
+        base = checkpoint.balance if checkpoint else Decimal(0)
+        BalanceCheckpoint.objects.create(wallet_id=wallet_id, last_entry_id=entry.pk, recorded_at=entry.recorded_at,
+                                         balance=base + (tail.aggregate(total=Sum('amount'))['total'] or 0))
+    return entry
+
+
+def _latest_checkpoint(wallet_id, until=None):
+    checkpoints = BalanceCheckpoint.objects.filter(wallet_id=wallet_id)
+    if until is not None:
+        checkpoints = checkpoints.filter(recorded_at__lte=until)
+    return checkpoints.order_by('-last_entry_id').first()
+
+
+def _end_of_day(day):
+    return timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min)) - timedelta(microseconds=1)
+
+
+def balance_as_of(wallet_id, when=None):
+    """
+    Saldo dompet menurut ledger pada waktu (atau akhir tanggal) tertentu: checkpoint terdekat ditambah ekor
+    entri sesudahnya, paling banyak LEDGER_CHECKPOINT_INTERVAL baris.
+    """
+    if when is None:
+        when = timezone.now()
+    elif isinstance(when, date) and not isinstance(when, datetime):
+        when = _end_of_day(when)
+    checkpoint = _latest_checkpoint(wallet_id, until=when)
+    base = checkpoint.balance if checkpoint else Decimal(0)
+    tail = BalanceEntry.objects.filter(wallet_id=wallet_id, pk__gt=checkpoint.last_entry_id if checkpoint else 0,
+                                       recorded_at__lte=when)
+    return base + (tail.aggregate(total=Sum('amount'))['total'] or 0)
+
+
+def with_ledger_balance(wallets):
+    # Saldo ledger semua dompet dalam satu query: checkpoint terakhir + jumlah ekor per dompet
+    money = DecimalField(max_digits=15, decimal_places=2)
+    latest = BalanceCheckpoint.objects.filter(wallet=OuterRef('pk')).order_by('-last_entry_id')
+    wallets = wallets.annotate(checkpoint_balance=Subquery(latest.values('balance')[:1], output_field=money),
+                               checkpoint_entry=Subquery(latest.values('last_entry_id')[:1]))
+    tail = (BalanceEntry.objects.filter(wallet=OuterRef('pk'), pk__gt=Coalesce(OuterRef('checkpoint_entry'), 0))
+            .order_by().values('wallet').annotate(total=Sum('amount')).values('total'))
+    return wallets.annotate(ledger_balance=Coalesce('checkpoint_balance', Value(Decimal(0)), output_field=money) +
+                            Coalesce(Subquery(tail, output_field=money), Value(Decimal(0)), output_field=money))
+
+
+def create_checkpoints(wallets):
+    now = timezone.now()
+    checkpoints = []
+    for wallet in with_ledger_balance(wallets).annotate(
+            last_entry=Subquery(BalanceEntry.objects.filter(wallet=OuterRef('pk')).order_by('-pk').values('pk')[:1])):
+        if wallet.last_entry and wallet.last_entry != wallet.checkpoint_entry:
+            checkpoints.append(BalanceCheckpoint(wallet=wallet, last_entry_id=wallet.last_entry,
+                                                 balance=wallet.ledger_balance, recorded_at=now))
+    return BalanceCheckpoint.objects.bulk_create(checkpoints, batch_size=1000)
+
+
+@transaction.atomic
+def apply_deltas(deltas, require_funds=(), kind=BalanceEntry.EntryKind.TRANSACTION):
+    """
+    Terapkan beberapa delta sekaligus. Dompet selalu dikunci (di-UPDATE) dengan urutan id yang sama agar dua
+    operasi yang menyentuh dompet yang sama tidak saling deadlock; gagal di tengah membatalkan semuanya.
+    """
+    merged = defaultdict(Decimal)
+    for wallet_id, delta in deltas:
+        merged[wallet_id] += delta
+    for wallet_id in sorted(merged):
+        apply_delta(wallet_id, merged[wallet_id], require_funds=wallet_id in require_funds, kind=kind)
+
+
+def transfer(from_wallet_id, to_wallet_id, amount, admin_fee=Decimal(0)):
+    apply_deltas([(from_wallet_id, -(amount + admin_fee)), (to_wallet_id, amount)], require_funds={from_wallet_id},
+                 kind=BalanceEntry.EntryKind.TRANSFER)
+
+
+def record_wallet_saved(wallet, old_balance=None):
+    # Saldo yang diisi langsung lewat form/API dompet dicatat sebagai saldo awal atau penyesuaian
+    if old_balance is None:
+        record_entry(wallet.pk, Decimal(wallet.balance), BalanceEntry.EntryKind.OPENING)
+    else:
+        record_entry(wallet.pk, Decimal(wallet.balance) - old_balance, BalanceEntry.EntryKind.ADJUSTMENT)
@@ -0,0 +1,162 @@
+import copy
+from collections import defaultdict
+from decimal import Decimal
+
+from django.utils import timezone
+
+from . import balances
+from .access import accessible_wallet_ids
+from .caching import bump_data_version
+from .models import Category, Payee, Transaction, Wallet
+from .rollups import RollupBatch
+from .serializers import TransactionBulkItemSerializer
+
+MAX_BULK_ITEMS = 1000
+BULK_WRITE_BATCH_SIZE = 500
+
+RELATED_FIELDS = (
+    ('wallet_id', Wallet, "Dompet tidak ditemukan."),
+    ('category_id', Category, "Kategori tidak ditemukan."),
+    ('payee_id', Payee, "Penerima tidak ditemukan."),
+)
+
+
+def _is_id(value):
+    # JSON true/false terbaca sebagai bool, subkelas int, dan akan cocok dengan id 1/0
+    return type(value) is int
+
+
+class TransactionBulkWriter:
+    """
+    Buat, ubah sebagian, atau hapus banyak transaksi sekaligus: semua item divalidasi dalam satu lintasan, relasi
+    dicek dengan satu query per model, data ditulis dengan bulk_create/bulk_update, dan saldo tiap dompet berubah
+    sekali dengan delta bersihnya. Item yang gagal dicatat di errors per indeks; dengan all_or_nothing tidak ada
+    yang ditulis bila satu item saja gagal.
+    Harus dipanggil di dalam transaction.atomic.
+    """
+
+    def __init__(self, user, all_or_nothing=False):
+        self.user = user
+        self.all_or_nothing = all_or_nothing
+        self.errors = {}
+        self.wallet_deltas = defaultdict(Decimal)
+        self.rollups = RollupBatch()
+
+    def _objects(self, items):
+        for index, item in enumerate(items):
+            if isinstance(item, dict):
+                yield index, item
+            else:
+                self.errors[index] = {'non_field_errors': ["Item harus berupa objek."]}
+
+    def _validate(self, entries, partial=False):
+        validated = {}
+        for index, instance, data in entries:
+            serializer = TransactionBulkItemSerializer(instance, data=data, partial=partial)
+            if serializer.is_valid():
+                validated[index] = serializer.validated_data
+            else:
+                self.errors[index] = serializer.errors
+
+        for field, model, message in RELATED_FIELDS:
+            ids = {data[field] for data in validated.values() if data.get(field) is not None}
+            if model is Wallet:
+                # Dompet yang dibagikan ke pengguna juga boleh dipakai, sama seperti form dan API tunggal
+                found = ids.intersection(accessible_wallet_ids(self.user))
+            elif ids:
+                found = set(model.objects.filter(user=self.user, pk__in=ids).values_list('pk', flat=True))
+            else:
+                found = ()
+            for index, data in list(validated.items()):
+                if data.get(field) is not None and data[field] not in found:
+                    self.errors.setdefault(index, {})[field.removesuffix('_id')] = [message]
+                    del validated[index]
+        return validated
+
+    def _load(self, ids):
+        # Dikunci (urut pk agar tidak deadlock) supaya pembalikan saldo dihitung dari baris terbaru
+        return Transaction.objects.select_for_update().filter(
+            user=self.user, pk__in=[pk for pk in ids if _is_id(pk)]).order_by('pk').in_bulk()
+
+    def _can_write(self):
+        return not (self.all_or_nothing and self.errors)
+
+    def _finish(self):
+        owners = set(Wallet.objects.filter(pk__in=self.wallet_deltas).values_list('user_id', flat=True))
+        balances.apply_deltas(self.wallet_deltas.items())
+        self.rollups.apply()
+        bump_data_version(self.user, *owners)
+
+    def create(self, items):
+        validated = self._validate((index, None, item) for index, item in self._objects(items))
+        if not self._can_write():
+            return {}
+        created = {}
+        for index in sorted(validated):
+            data = {'admin_fee': Decimal(0), **validated[index]}
+            created[index] = Transaction(user=self.user, **data)
+        Transaction.objects.bulk_create(created.values(), batch_size=BULK_WRITE_BATCH_SIZE)
+        for tx in created.values():
+            self.wallet_deltas[tx.wallet_id] += balances.transaction_delta(tx)
+            self.rollups.add_transaction(tx)
+        self._finish()
+        return created
+
+    def update(self, items):
+        items = list(self._objects(items))
+        instances = self._load(item.get('id') for _, item in items)
+        entries, seen = [], set()
+        for index, item in items:
+            pk = item.get('id')
+            if not _is_id(pk) or pk not in instances:
+                self.errors[index] = {'id': ["Transaksi tidak ditemukan."]}
+            elif pk in seen:
+                self.errors[index] = {'id': ["Transaksi muncul lebih dari sekali."]}
+            else:
+                seen.add(pk)
+                entries.append((index, instances[pk], {k: v for k, v in item.items() if k != 'id'}))
+        targets = {index: instance for index, instance, _ in entries}
+        validated = self._validate(entries, partial=True)
+        if not self._can_write():
+            return {}
+
+        # bulk_update tidak mengisi auto_now, padahal ekspor delta bergantung pada updated_at
+        updated, fields, now = {}, {'updated_at'}, timezone.now()
+        for index in sorted(validated):
+            tx = targets[index]
+            old = copy.copy(tx)
+            for attr, value in validated[index].items():
+                setattr(tx, attr, value)
+                fields.add(attr)
+            tx.updated_at = now
+            self.wallet_deltas[old.wallet_id] -= balances.transaction_delta(old)
+            self.wallet_deltas[tx.wallet_id] += balances.transaction_delta(tx)
+            self.rollups.add_transaction(old, sign=-1)
+            self.rollups.add_transaction(tx)
+            updated[index] = tx
+        if updated:
+            Transaction.objects.bulk_update(updated.values(), sorted(fields), batch_size=BULK_WRITE_BATCH_SIZE)
+        self._finish()
+        return updated
+
+    def delete(self, ids):
+        instances = self._load(ids)
+        deleted, seen = {}, set()
+        for index, pk in enumerate(ids):
+            if not _is_id(pk) or pk not in instances:
+                self.errors[index] = {'id': ["Transaksi tidak ditemukan."]}
+            elif pk in seen:
+                self.errors[index] = {'id': ["Transaksi muncul lebih dari sekali."]}
+            else:
+                seen.add(pk)
+                deleted[index] = pk
+        if not self._can_write():
+            return {}
+
+        for pk in deleted.values():
+            tx = instances[pk]
+            self.wallet_deltas[tx.wallet_id] -= balances.transaction_delta(tx)
+            self.rollups.add_transaction(tx, sign=-1)
+        Transaction.objects.filter(pk__in=deleted.values()).delete()
+        self._finish()
+        return {index: instances[pk] for index, pk in deleted.items()}
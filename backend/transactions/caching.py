@@ -0,0 +1,122 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.db.models import F, QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Budget, Category, Payee, ResourceVersion, UserDataVersion, Wallet
+
+STATS_KEY = 'user-cache-stats:{name}:{result}'
+# Model yang perubahannya menaikkan versi daftar resource API dengan nama ini
+RESOURCE_MODELS = {Wallet: 'wallet', Category: 'category', Payee: 'payee', Budget: 'budget'}
+
+
+def _user_id(user):
+    return getattr(user, 'pk', user)
+
+
+def get_data_version(user):
+    return UserDataVersion.objects.filter(user_id=_user_id(user)).values_list('version', flat=True).first() or 0
+
+
+def bump_data_version(*users):
+    """
+    Naikkan versi data tiap pengguna setelah perubahan Wallet, Transaction, Debt, atau Transfer. Semua cache
+    per pengguna memakai versi ini di kuncinya, jadi entri lama tidak akan terbaca lagi.
+    """
+    for user_id in {_user_id(user) for user in users if user is not None}:
+        _increment(UserDataVersion, user_id=user_id)
+
+
+def _increment(model, **lookup):
+    if model.objects.filter(**lookup).update(version=F('version') + 1):
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(version=1, **lookup)
+    except IntegrityError:
+        model.objects.filter(**lookup).update(version=F('version') + 1)
+
+
+def get_resource_versions(user, resources):
+    # Satu query lewat indeks unik (user, resource); resource yang belum pernah berubah bernilai 0
+    versions = dict(ResourceVersion.objects.filter(user_id=_user_id(user), resource__in=resources)
+                    .values_list('resource', 'version'))
+    return tuple(versions.get(resource, 0) for resource in resources)
+
+
+def bump_resource_version(resource, *users):
+    """
+    Naikkan versi daftar resource tiap pengguna. Simpan/hapus lewat model sudah ditangani sinyal di bawah; panggil
+    langsung setelah bulk_create atau update() yang melewati sinyal.
+    """
+    for user_id in {_user_id(user) for user in users if user is not None}:
+        _increment(ResourceVersion, user_id=user_id, resource=resource)
+
+
+@receiver(post_save, sender=Wallet)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Payee)
+@receiver(post_save, sender=Budget)
+def _resource_saved(sender, instance, **kwargs):
+    bump_resource_version(RESOURCE_MODELS[sender], instance.user_id)
+
+
+@receiver(post_delete, sender=Wallet)
+@receiver(post_delete, sender=Category)
+@receiver(post_delete, sender=Payee)
+@receiver(post_delete, sender=Budget)
+def _resource_deleted(sender, instance, origin=None, **kwargs):
+    # Saat akun dihapus, versinya ikut terhapus bersama user-nya
+    if isinstance(origin, User) or (isinstance(origin, QuerySet) and origin.model is User):
+        return
+    bump_resource_version(RESOURCE_MODELS[sender], instance.user_id)
+
+
+def _count(name, result):
+    key = STATS_KEY.format(name=name, result=result)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 0, timeout=None)
+        cache.incr(key)
+
+
+def _key(name, user):
+    return f'{name}:{_user_id(user)}:{get_data_version(user)}'
+
+
+def get_or_build(name, user, builder):
+    key = _key(name, user)
+    value = cache.get(key)
+    if value is not None:
+        _count(name, 'hit')
+        return value
+    _count(name, 'miss')
+    value = builder()
+    cache.set(key, value, settings.USER_CACHE_TIMEOUT)
+    return value
+
+
+async def aget_or_build(name, user, builder):
+    # Versi async get_or_build; builder adalah fungsi async
+    key = await sync_to_async(_key)(name, user)
+    value = await cache.aget(key)
+    if value is not None:
+        await sync_to_async(_count)(name, 'hit')
+        return value
+    await sync_to_async(_count)(name, 'miss')
+    value = await builder()
+    await cache.aset(key, value, settings.USER_CACHE_TIMEOUT)
+    return value
+
+
+def cache_stats(name):
+    return {result: cache.get(STATS_KEY.format(name=name, result=result), 0) for result in ('hit', 'miss')}
+
+
+def reset_cache_stats(name):
+    cache.delete_many([STATS_KEY.format(name=name, result=result) for result in ('hit', 'miss')])
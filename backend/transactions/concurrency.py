@@ -0,0 +1,49 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import ExitStack
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+
+_executor = None
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=settings.ASYNC_QUERY_WORKERS, thread_name_prefix='async-query')
+    return _executor
+
+
+def _request_wrappers():
+    return list(connections[DEFAULT_DB_ALIAS].execute_wrappers)
+
+
+def _run(func, wrappers):
+    # Koneksi DB milik thread worker ini; seperti request biasa, dipakai ulang atau ditutup sesuai CONN_MAX_AGE
+    close_old_connections()
+    try:
+        with ExitStack() as stack:
+            for wrapper in wrappers:
+                stack.enter_context(connections[DEFAULT_DB_ALIAS].execute_wrapper(wrapper))
+            return func()
+    finally:
+        close_old_connections()
+
+
+async def gather(*funcs):
+    """
+    Jalankan beberapa fungsi query sinkron yang saling independen dan kembalikan hasilnya sesuai urutan.
+
+    ORM async Django (aaggregate, afirst, ...) menjalankan semua query lewat satu thread sinkron, jadi
+    asyncio.gather atasnya tetap berurutan. Dengan ASYNC_QUERY_WORKERS > 0 tiap fungsi berjalan di thread worker
+    dengan koneksinya sendiri sehingga query benar-benar tumpang tindih di database; query tersebut berada di luar
+    transaksi request, jadi hanya pakai untuk pembacaan. Dengan 0 perilakunya sama dengan ORM async biasa.
+    """
+    if not settings.ASYNC_QUERY_WORKERS:
+        return await asyncio.gather(*(sync_to_async(func)() for func in funcs))
+    # Wrapper execute request (mis. pencatat query PerformanceMiddleware) ikut dipasang di koneksi worker
+    wrappers = await sync_to_async(_request_wrappers)()
+    loop = asyncio.get_running_loop()
+    return await asyncio.gather(*(loop.run_in_executor(_get_executor(), _run, func, wrappers) for func in funcs))
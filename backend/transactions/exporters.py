@@ -0,0 +1,150 @@
+import csv
+import hashlib
+import zlib
+
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import F, QuerySet
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Category, DeletedRecord, Payee, Product, PurchaseItem, Transaction, Transfer, Wallet
+
+EXPORT_CHUNK_SIZE = 2000
+# Jenis data di ekspor NDJSON: model, kolom, dan nama relasi yang diambil dalam query yang sama
+NDJSON_SOURCES = {
+    DeletedRecord.Kind.TRANSACTION: (
+        Transaction, ('id', 'transaction_date', 'transaction_type', 'amount', 'admin_fee', 'wallet_id', 'category_id',
+                      'payee_id', 'notes', 'updated_at'),
+        {'wallet_name': F('wallet__name'), 'category_name': F('category__name'), 'payee_name': F('payee__name')}),
+    DeletedRecord.Kind.TRANSFER: (
+        Transfer, ('id', 'transfer_date', 'from_wallet_id', 'to_wallet_id', 'amount', 'admin_fee', 'notes',
+                   'updated_at'),
+        {'from_wallet_name': F('from_wallet__name'), 'to_wallet_name': F('to_wallet__name')}),
+    DeletedRecord.Kind.PURCHASE_ITEM: (
+        PurchaseItem, ('id', 'transaction_id', 'product_id', 'quantity', 'price', 'updated_at'),
+        {'product_name': F('product__name')}),
+}
+TRACKED_MODELS = {model: kind for kind, (model, _, _) in NDJSON_SOURCES.items()}
+# Model yang namanya ikut diekspor (wallet_name, category_name, ...) beserta baris ekspor dan FK yang merujuknya
+NAMED_RELATIONS = {
+    Wallet: ((Transaction, 'wallet'), (Transfer, 'from_wallet'), (Transfer, 'to_wallet')),
+    Category: ((Transaction, 'category'),),
+    Payee: ((Transaction, 'payee'),),
+    Product: ((PurchaseItem, 'product'),),
+}
+
+
+class Echo:
+    def write(self, value):
+        return value
+
+
+def iter_transaction_csv(user):
+    writer = csv.writer(Echo())
+    # Tulis baris header
+    yield writer.writerow(['Tanggal', 'Tipe', 'Penerima/Tujuan', 'Kategori', 'Jumlah', 'Biaya Admin', 'Dompet', 'Catatan'])
+
+    type_labels = dict(Transaction.TransactionType.choices)
+    # Nama relasi diambil dalam query yang sama dan dibaca per chunk dari server
+    rows = Transaction.objects.filter(user=user).order_by('transaction_date').values_list(
+        'transaction_date', 'transaction_type', 'payee__name', 'category__name', 'amount', 'admin_fee', 'wallet__name',
+        'notes').iterator(chunk_size=EXPORT_CHUNK_SIZE)
+
+    for trans_date, trans_type, payee_name, category_name, amount, admin_fee, wallet_name, notes in rows:
+        yield writer.writerow([trans_date, type_labels.get(trans_type, trans_type), payee_name or '',
+                               category_name or '', amount, admin_fee, wallet_name, notes])
+
+
+def iter_export_ndjson(user, updated_since=None):
+    """
+    Satu objek JSON per baris: transaksi, transfer, lalu item pembelian milik pengguna, masing-masing urut
+    updated_at. Dengan updated_since hanya baris yang berubah sesudahnya, ditambah jejak penghapusan
+    ({"type": "deleted", ...}) agar sinkronisasi bisa menghapus salinannya.
+    """
+    encoder = DjangoJSONEncoder(separators=(',', ':'), ensure_ascii=False)
+    for kind, (model, fields, names) in NDJSON_SOURCES.items():
+        rows = model.objects.filter(user=user)
+        if updated_since:
+            rows = rows.filter(updated_at__gt=updated_since)
+        for row in rows.order_by('updated_at', 'pk').values(*fields, **names).iterator(chunk_size=EXPORT_CHUNK_SIZE):
+            yield encoder.encode({'type': kind, **row}) + '\n'
+    if updated_since:
+        deleted = DeletedRecord.objects.filter(user=user, deleted_at__gt=updated_since).order_by('deleted_at', 'pk')
+        for kind, object_id, deleted_at in deleted.values_list('kind', 'object_id', 'deleted_at').iterator(
+                chunk_size=EXPORT_CHUNK_SIZE):
+            yield encoder.encode({'type': 'deleted', 'kind': kind, 'id': object_id, 'deleted_at': deleted_at}) + '\n'
+
+
+def gzip_stream(chunks, level=6):
+    # Satu aliran gzip untuk seluruh respons; zlib menahan data sampai satu blok penuh sehingga rasio kompresi
+    # sama dengan mengompresi berkas utuh
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    for chunk in chunks:
+        if data := compressor.compress(chunk.encode('utf-8')):
+            yield data
+    yield compressor.flush()
+
+
+def export_state(user, updated_since=None):
+    """
+    (etag, last_modified) isi ekspor pengguna, dari updated_at terbaru per jenis data dan waktu penghapusan
+    terakhir. Masing-masing satu query LIMIT 1 lewat indeks (user, updated_at), tanpa membaca datanya.
+    """
+    latest = [model.objects.filter(user=user).order_by('-updated_at').values_list('updated_at', flat=True).first()
+              for model, _, _ in NDJSON_SOURCES.values()]
+    latest.append(DeletedRecord.objects.filter(user=user).order_by('-deleted_at')
+                  .values_list('deleted_at', flat=True).first())
+    key = '|'.join(str(value) for value in [updated_since, *latest])
+    etag = f'W/"{hashlib.sha1(key.encode()).hexdigest()}"'
+    return etag, max(filter(None, latest), default=None)
+
+
+def _deleted_with_user(origin):
+    return isinstance(origin, User) or (isinstance(origin, QuerySet) and origin.model is User)
+
+
+@receiver(post_delete, sender=Transaction)
+@receiver(post_delete, sender=Transfer)
+@receiver(post_delete, sender=PurchaseItem)
+def _record_deletion(sender, instance, origin=None, **kwargs):
+    # Saat akun dihapus, jejaknya ikut terhapus bersama user-nya
+    if _deleted_with_user(origin):
+        return
+    DeletedRecord.objects.create(user_id=instance.user_id, kind=TRACKED_MODELS[sender], object_id=instance.pk)
+
+
+def _touch_referencing(instance):
+    # Baris yang isinya berubah tanpa disimpan sendiri (nama relasi, FK SET_NULL) diberi updated_at baru
+    now = timezone.now()
+    for model, field in NAMED_RELATIONS[type(instance)]:
+        model.objects.filter(**{field: instance}).update(updated_at=now)
+
+
+@receiver(pre_save, sender=Wallet)
+@receiver(pre_save, sender=Category)
+@receiver(pre_save, sender=Payee)
+@receiver(pre_save, sender=Product)
+def _remember_name(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or instance.pk is None or (update_fields is not None and 'name' not in update_fields):
+        return
+    instance._saved_name = sender.objects.filter(pk=instance.pk).values_list('name', flat=True).first()
+
+
+@receiver(post_save, sender=Wallet)
+@receiver(post_save, sender=Category)
+@receiver(post_save, sender=Payee)
+@receiver(post_save, sender=Product)
+def _touch_renamed(sender, instance, created, **kwargs):
+    old_name = instance.__dict__.pop('_saved_name', None)
+    if not created and old_name is not None and old_name != instance.name:
+        _touch_referencing(instance)
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Payee)
+def _touch_set_null(sender, instance, origin=None, **kwargs):
+    # SET_NULL berjalan sebagai UPDATE queryset yang tidak mengisi auto_now
+    if not _deleted_with_user(origin):
+        _touch_referencing(instance)
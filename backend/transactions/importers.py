@@ -0,0 +1,105 @@
+from collections import defaultdict
+from decimal import Decimal, InvalidOperation
+
+from django.utils.dateparse import parse_date
+
+from .balances import apply_deltas, balance_delta
+from .caching import RESOURCE_MODELS, bump_data_version, bump_resource_version
+from .models import Transaction, Category, Wallet, Payee, BalanceEntry
+from .rollups import RollupBatch
+
+IMPORT_BATCH_SIZE = 1000
+IMPORT_COLUMNS = 8
+
+
+def row_error(row):
+    # Kesalahan format satu baris CSV yang akan membuat impor gagal, atau None
+    if len(row) != IMPORT_COLUMNS:
+        return f"harus berisi {IMPORT_COLUMNS} kolom"
+    trans_date, trans_type, _, _, amount, admin_fee = row[:6]
+    try:
+        if parse_date(trans_date) is None:
+            return f"tanggal {trans_date!r} tidak valid"
+    except ValueError:
+        return f"tanggal {trans_date!r} tidak valid"
+    if trans_type not in Transaction.TransactionType.values:
+        return f"tipe {trans_type!r} tidak dikenal"
+    try:
+        Decimal(amount)
+        Decimal(admin_fee or 0)
+    except InvalidOperation:
+        return "jumlah atau biaya admin bukan angka"
+    return None
+
+
+class TransactionImporter:
+    """
+    Impor baris CSV secara massal: dompet, kategori, dan penerima di-resolve lewat peta nama per impor,
+    transaksi ditulis dengan bulk_create per batch, dan saldo tiap dompet serta ringkasan bulanan diperbarui sekali
+    di akhir.
+    Harus dipanggil di dalam transaction.atomic.
+    """
+
+    def __init__(self, user, batch_size=IMPORT_BATCH_SIZE):
+        self.user = user
+        self.batch_size = batch_size
+        self.wallets = self._load_map(Wallet)
+        self.categories = self._load_map(Category)
+        self.payees = self._load_map(Payee)
+        self.wallet_deltas = defaultdict(Decimal)
+        self.rollups = RollupBatch()
+        self.imported = 0
+
+    def _load_map(self, model):
+        name_map = {}
+        for obj in model.objects.filter(user=self.user).order_by('pk'):
+            name_map.setdefault(obj.name, obj)
+        return name_map
+
+    def _resolve(self, model, name_map, names):
+        missing = [name for name in dict.fromkeys(names) if name not in name_map]
+        if missing:
+            created = model.objects.bulk_create([model(user=self.user, name=name) for name in missing])
+            for obj in created:
+                name_map[obj.name] = obj
+            bump_resource_version(RESOURCE_MODELS[model], self.user)
+
+    def _flush(self, rows):
+        self._resolve(Wallet, self.wallets, [row[6] for row in rows])
+        self._resolve(Category, self.categories, [row[3] for row in rows])
+        self._resolve(Payee, self.payees, [row[2] for row in rows])
+
+        objs = []
+        for trans_date_str, trans_type, payee_name, category_name, amount_str, admin_fee_str, wallet_name, notes in rows:
+            amount = Decimal(amount_str)
+            admin_fee = Decimal(admin_fee_str or 0)
+            wallet = self.wallets[wallet_name]
+            objs.append(Transaction(user=self.user, wallet=wallet, category=self.categories[category_name],
+                                    payee=self.payees[payee_name], amount=amount, admin_fee=admin_fee,
+                                    transaction_type=trans_type, transaction_date=parse_date(trans_date_str),
+                                    notes=notes))
+            self.wallet_deltas[wallet.pk] += balance_delta(trans_type, amount, admin_fee)
+            self.rollups.add_transaction(objs[-1])
+
+        Transaction.objects.bulk_create(objs, batch_size=self.batch_size)
+        self.imported += len(objs)
+
+    def _apply_balances(self):
+        apply_deltas(self.wallet_deltas.items(), kind=BalanceEntry.EntryKind.IMPORT)
+        self.wallet_deltas.clear()
+
+    def import_rows(self, rows):
+        batch = []
+        for row in rows:
+            if not row:
+                continue
+            batch.append(row)
+            if len(batch) >= self.batch_size:
+                self._flush(batch)
+                batch = []
+        if batch:
+            self._flush(batch)
+        self._apply_balances()
+        self.rollups.apply()
+        bump_data_version(self.user)
+        return self.imported
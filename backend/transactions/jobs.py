@@ -0,0 +1,186 @@
+"""
+Antrean job latar belakang berbasis tabel Job di database aplikasi sendiri, tanpa Redis atau broker lain.
+
+Worker (manage.py run_jobs) mengambil job ANTRE tertua dengan UPDATE bersyarat status, sehingga beberapa proses
+bisa mengambil dari antrean yang sama tanpa pernah menjalankan satu job dua kali. Progres dan heartbeat ditulis
+berkala; job BERJALAN yang heartbeat-nya berhenti lebih dari JOB_STALE_SECONDS dikembalikan ke antrean sampai
+JOB_MAX_ATTEMPTS kali, setelah itu ditandai gagal.
+"""
+import csv
+import gzip
+import io
+import logging
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from . import balances, caching, rollups
+from .exporters import iter_transaction_csv
+from .importers import IMPORT_BATCH_SIZE, TransactionImporter, row_error
+from .models import Job, Transaction, Wallet
+
+logger = logging.getLogger(__name__)
+
+HANDLERS = {}
+# Jarak minimum antar-penulisan progres ke database, dalam detik
+PROGRESS_INTERVAL = 0.5
+MAX_REPORTED_ERRORS = 20
+
+
+class JobError(Exception):
+    """Kegagalan yang pesannya aman ditampilkan ke pengguna."""
+
+
+def handler(kind):
+    def register(func):
+        HANDLERS[kind] = func
+        return func
+    return register
+
+
+def enqueue(user, kind, input_name='', input_data=None):
+    return Job.objects.create(user=user, kind=kind, input_name=input_name, input_data=input_data)
+
+
+class Progress:
+    def __init__(self, job):
+        self.job = job
+        self.written_at = 0
+
+    def __call__(self, done, total=None, force=False):
+        now = time.monotonic()
+        if not force and now - self.written_at < PROGRESS_INTERVAL:
+            return
+        self.written_at = now
+        fields = {'progress': done, 'heartbeat_at': timezone.now()}
+        if total is not None:
+            fields['total'] = total
+        Job.objects.filter(pk=self.job.pk).update(**fields)
+
+
+def claim(worker):
+    # Worker lain bisa lebih dulu mengambil kandidat yang sama; UPDATE bersyarat yang gagal = coba kandidat berikutnya
+    while True:
+        pk = Job.objects.filter(status=Job.Status.QUEUED).order_by('pk').values_list('pk', flat=True).first()
+        if pk is None:
+            return None
+        now = timezone.now()
+        if Job.objects.filter(pk=pk, status=Job.Status.QUEUED).update(
+                status=Job.Status.RUNNING, worker=worker, started_at=now, heartbeat_at=now,
+                attempts=F('attempts') + 1):
+            return Job.objects.get(pk=pk)
+
+
+def requeue_stale(now=None):
+    now = now or timezone.now()
+    stale = Job.objects.filter(status=Job.Status.RUNNING,
+                               heartbeat_at__lt=now - timedelta(seconds=settings.JOB_STALE_SECONDS))
+    failed = stale.filter(attempts__gte=settings.JOB_MAX_ATTEMPTS).update(
+        status=Job.Status.FAILED, finished_at=now, error="Worker berhenti sebelum job selesai.")
+    return failed, stale.update(status=Job.Status.QUEUED, worker='')
+
+
+def _fail(job, message):
+    Job.objects.filter(pk=job.pk).update(status=Job.Status.FAILED, error=message, finished_at=timezone.now())
+    return False
+
+
+def run(job):
+    progress = Progress(job)
+    try:
+        outcome = HANDLERS[job.kind](job, progress) or {}
+    except JobError as exc:
+        return _fail(job, str(exc))
+    except Exception:
+        logger.exception("Job %s gagal", job.pk)
+        return _fail(job, "Terjadi kesalahan saat memproses job.")
+    now = timezone.now()
+    Job.objects.filter(pk=job.pk).update(status=Job.Status.DONE, finished_at=now, heartbeat_at=now,
+                                         progress=Coalesce('total', 'progress'), **outcome)
+    return True
+
+
+def work(worker, once=False, poll_interval=None, stop=None):
+    """
+    Loop worker: ambil dan jalankan job sampai stop di-set, atau sampai antrean kosong bila once.
+    Mengembalikan jumlah job yang dijalankan.
+    """
+    poll_interval = settings.JOB_POLL_INTERVAL if poll_interval is None else poll_interval
+    processed = 0
+    while not (stop and stop.is_set()):
+        # Seperti akhir request: koneksi yang kedaluwarsa/rusak diganti; di dalam atomic (mis. test) tetap dipakai
+        if not connection.in_atomic_block:
+            close_old_connections()
+        requeue_stale()
+        job = claim(worker)
+        if job is None:
+            if once:
+                break
+            time.sleep(poll_interval)
+            continue
+        run(job)
+        processed += 1
+    return processed
+
+
+@handler(Job.Kind.IMPORT)
+def import_transactions(job, progress):
+    """
+    Semua baris divalidasi dulu sehingga berkas yang salah format tidak menulis apa pun; baris lalu ditulis per
+    IMPORT_BATCH_SIZE dalam transaksi terpisah agar progres terlihat dari request lain. Progres ditulis di
+    transaksi yang sama dengan batch-nya, jadi job yang diulang setelah worker berhenti melanjutkan dari baris
+    sesudah batch terakhir yang ter-commit tanpa mengimpor ulang baris sebelumnya.
+    """
+    reader = csv.reader(io.StringIO(bytes(job.input_data).decode('utf-8-sig'), newline=''))
+    next(reader, None)
+    rows = [row for row in reader if row]
+    errors = [f"Baris {index}: {message}" for index, row in enumerate(rows, start=2)
+              if (message := row_error(row))]
+    if errors:
+        raise JobError("\n".join(errors[:MAX_REPORTED_ERRORS]))
+
+    committed = job.progress
+    progress(committed, len(rows), force=True)
+    importer = TransactionImporter(job.user)
+    for start in range(committed, len(rows), IMPORT_BATCH_SIZE):
+        with transaction.atomic():
+            importer.import_rows(rows[start:start + IMPORT_BATCH_SIZE])
+            progress(committed + importer.imported, force=True)
+    return {'result': {'imported': committed + importer.imported}}
+
+
+@handler(Job.Kind.EXPORT)
+def export_transactions(job, progress):
+    total = Transaction.objects.filter(user=job.user).count()
+    progress(0, total, force=True)
+    buffer = io.BytesIO()
+    with gzip.GzipFile(fileobj=buffer, mode='wb') as output:
+        # Baris pertama header
+        for index, line in enumerate(iter_transaction_csv(job.user)):
+            output.write(line.encode('utf-8'))
+            progress(index)
+    return {'result': {'exported': total}, 'result_name': 'transaksi.csv.gz',
+            'result_content_type': 'application/gzip', 'result_data': buffer.getvalue()}
+
+
+@handler(Job.Kind.RECOMPUTE)
+def recompute(job, progress):
+    # Bangun ulang ringkasan bulanan dan buat checkpoint saldo; selisih dompet-ledger hanya dilaporkan
+    progress(0, 2, force=True)
+    with transaction.atomic():
+        summaries = rollups.rebuild([job.user])
+        caching.bump_data_version(job.user)
+    progress(1, force=True)
+    wallets = Wallet.objects.filter(user=job.user)
+    drifted = [{'wallet': wallet.pk, 'name': wallet.name, 'balance': str(wallet.balance),
+                'ledger_balance': str(wallet.ledger_balance)}
+               for wallet in balances.with_ledger_balance(wallets).exclude(balance=F('ledger_balance'))
+               .order_by('pk')[:MAX_REPORTED_ERRORS]]
+    with transaction.atomic():
+        checkpoints = balances.create_checkpoints(wallets)
+    return {'result': {'summaries': summaries, 'checkpoints': len(checkpoints), 'drifted': drifted}}
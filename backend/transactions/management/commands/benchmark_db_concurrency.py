@@ -0,0 +1,143 @@
+import threading
+import time
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, connection, connections, transaction
+from django.db.models import Sum
+from django.test import override_settings
+
+from transactions import balances, rollups
+from transactions.caching import bump_data_version
+from transactions.models import Category, Transaction, Wallet
+
+# Perilaku bawaan Django + SQLite sebelum tuning: rollback journal, synchronous=FULL, transaksi DEFERRED, timeout 5 dtk
+SQLITE_DEFAULTS = ({'journal_mode': 'DELETE', 'synchronous': 'FULL'}, {})
+
+
+def _is_locked(exc):
+    return 'locked' in str(exc) or 'busy' in str(exc)
+
+
+class Command(BaseCommand):
+    help = ("Ukur throughput tulis dan jumlah error \"database is locked\" dengan beberapa penulis dan pembaca "
+            "bersamaan, memakai jalur tulis yang sama dengan tambah transaksi (transaksi, saldo, ringkasan, versi data).")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=8)
+        parser.add_argument('--writes', type=int, default=100, help="Jumlah transaksi per penulis.")
+        parser.add_argument('--readers', type=int, default=2)
+        parser.add_argument('--compare-defaults', action='store_true',
+                            help="SQLite: jalankan juga dengan pengaturan bawaan (tanpa tuning) sebagai pembanding.")
+
+    def _setup(self):
+        user = User.objects.create(username=f'__bench_db_{time.time_ns()}')
+        wallets = [Wallet.objects.create(user=user, name=f"Dompet {i}", balance=Decimal('1000000000'))
+                   for i in range(3)]
+        for wallet in wallets:
+            balances.record_wallet_saved(wallet)
+        category = Category.objects.create(user=user, name="Benchmark")
+        return user, [wallet.pk for wallet in wallets], category.pk
+
+    def _write(self, user, wallet_id, category_id):
+        with transaction.atomic():
+            tx = Transaction.objects.create(user=user, wallet_id=wallet_id, category_id=category_id,
+                                            amount=Decimal('12500'), admin_fee=Decimal(0),
+                                            transaction_type=Transaction.TransactionType.EXPENSE,
+                                            transaction_date=date.today())
+            balances.apply_delta(tx.wallet_id, balances.transaction_delta(tx))
+            rollups.record_transaction(tx)
+            bump_data_version(user)
+
+    def _read(self, user):
+        Transaction.objects.filter(user=user).aggregate(total=Sum('amount'))
+        Wallet.objects.filter(user=user).aggregate(total=Sum('balance'))
+
+    def _run(self, user, wallet_ids, category_id, writers, writes, readers):
+        stats = {'committed': 0, 'write_locked': 0, 'reads': 0, 'read_locked': 0}
+        lock, done, failures = threading.Lock(), threading.Event(), []
+
+        def count(key):
+            with lock:
+                stats[key] += 1
+
+        def writer(index):
+            try:
+                for i in range(writes):
+                    try:
+                        self._write(user, wallet_ids[(index + i) % len(wallet_ids)], category_id)
+                        count('committed')
+                    except OperationalError as exc:
+                        if not _is_locked(exc):
+                            raise
+                        count('write_locked')
+            except Exception as exc:
+                failures.append(exc)
+            finally:
+                connection.close()
+
+        def reader():
+            try:
+                while not done.is_set():
+                    try:
+                        self._read(user)
+                        count('reads')
+                    except OperationalError as exc:
+                        if not _is_locked(exc):
+                            raise
+                        count('read_locked')
+            except Exception as exc:
+                failures.append(exc)
+            finally:
+                connection.close()
+
+        writer_threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+        reader_threads = [threading.Thread(target=reader) for _ in range(readers)]
+        started = time.perf_counter()
+        for thread in reader_threads + writer_threads:
+            thread.start()
+        for thread in writer_threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        done.set()
+        for thread in reader_threads:
+            thread.join()
+        if failures:
+            raise CommandError(f"Benchmark gagal: {failures[0]!r}")
+        stats['seconds'] = elapsed
+        return stats
+
+    def _report(self, label, stats):
+        self.stdout.write(
+            f"{label:>8}: {stats['committed']} tulis berhasil dalam {stats['seconds']:.2f} detik "
+            f"({stats['committed'] / stats['seconds']:,.0f}/detik), {stats['write_locked']} tulis gagal terkunci, "
+            f"{stats['reads']} baca ({stats['read_locked']} gagal terkunci)")
+
+    def _sqlite_profile(self, pragmas, options):
+        # Pengaturan dibaca saat koneksi dibuat, jadi semua koneksi ditutup dulu
+        connections.close_all()
+        connection.settings_dict['OPTIONS'] = options
+        return override_settings(SQLITE_PRAGMAS=pragmas)
+
+    def handle(self, *args, **options):
+        if options['compare_defaults'] and connection.vendor != 'sqlite':
+            raise CommandError("--compare-defaults hanya untuk SQLite.")
+        args = (options['writers'], options['writes'], options['readers'])
+
+        user, wallet_ids, category_id = self._setup()
+        tuned_options = dict(connection.settings_dict['OPTIONS'])
+        try:
+            if options['compare_defaults']:
+                with self._sqlite_profile(*SQLITE_DEFAULTS):
+                    self._report('bawaan', self._run(user, wallet_ids, category_id, *args))
+                with self._sqlite_profile(settings.SQLITE_PRAGMAS, tuned_options):
+                    self._report('tuning', self._run(user, wallet_ids, category_id, *args))
+            else:
+                self._report(connection.vendor, self._run(user, wallet_ids, category_id, *args))
+        finally:
+            connections.close_all()
+            connection.settings_dict['OPTIONS'] = tuned_options
+            user.delete()
@@ -0,0 +1,203 @@
+import csv
+import io
+import json
+import logging
+import platform
+import statistics
+import subprocess
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from finance_tracker_app.middleware import QueryRecorder
+from transactions.management.commands.benchmark_import import generate_rows
+from transactions.models import Transaction
+
+# (nama, method, url, kosongkan cache sebelum tiap putaran)
+TARGETS = (
+    ('dashboard', 'get', 'dashboard', False),
+    ('dashboard_cold', 'get', 'dashboard', True),
+    ('budget_list', 'get', 'budget_list', False),
+    ('transaction_list', 'get', 'transaction_list', False),
+    ('transaction_export', 'get', 'transaction_export', False),
+    ('transaction_import', 'post', 'transaction_import', False),
+    ('api_transactions', 'get', '/api/transactions/', False),
+    ('api_budgets', 'get', '/api/budgets/', False),
+    ('api_budget_progress', 'get', '/api/budgets/progress/', False),
+    ('api_transfers', 'get', '/api/transfers/', False),
+    ('api_wallets', 'get', '/api/wallets/', False),
+    ('api_categories', 'get', '/api/categories/', False),
+    ('api_payees', 'get', '/api/payees/', False),
+    ('api_cashflow_daily', 'get', '/api/reports/cashflow/?granularity=day&split=category', False),
+    ('api_net_worth_daily', 'get', '/api/reports/net-worth/?granularity=day', False),
+)
+TARGET_NAMES = tuple(name for name, *_ in TARGETS)
+IMPORT_HEADER = ['Tanggal', 'Tipe', 'Penerima', 'Kategori', 'Jumlah', 'Biaya Admin', 'Dompet', 'Catatan']
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(int(round(fraction * (len(ordered) - 1))), len(ordered) - 1)]
+
+
+def _import_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(IMPORT_HEADER)
+    writer.writerows(generate_rows(rows))
+    return buffer.getvalue().encode()
+
+
+class Command(BaseCommand):
+    help = ("Ukur waktu respons dashboard, anggaran, daftar/ekspor/impor transaksi, dan daftar API utama untuk satu "
+            "pengguna, lalu simpan hasilnya sebagai JSON agar bisa dibandingkan antar-run.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', dest='username',
+                            help="Username yang diukur (default: pengguna dengan transaksi terbanyak).")
+        parser.add_argument('--iterations', type=int, default=5)
+        parser.add_argument('--warmup', type=int, default=1, help="Putaran pemanasan yang tidak dihitung.")
+        parser.add_argument('--only', action='append', choices=TARGET_NAMES, default=[],
+                            help="Hanya ukur target tertentu (bisa diulang).")
+        parser.add_argument('--import-rows', type=int, default=1000,
+                            help="Jumlah baris CSV per putaran impor (impor selalu dibatalkan).")
+        parser.add_argument('--output', help="Berkas JSON hasil (default: benchmarks/hot_paths-<waktu>.json).")
+        parser.add_argument('--compare', help="Berkas JSON run sebelumnya untuk dibandingkan.")
+
+    def _user(self, username):
+        if username:
+            try:
+                return User.objects.get(username=username)
+            except User.DoesNotExist:
+                raise CommandError(f"Pengguna {username} tidak ditemukan.")
+        user = User.objects.annotate(total=Count('transaction')).order_by('-total', 'pk').first()
+        if user is None:
+            raise CommandError("Belum ada pengguna; jalankan seed_synthetic lebih dulu.")
+        return user
+
+    def _request(self, client, method, url, import_rows):
+        if method == 'post':
+            upload = SimpleUploadedFile('benchmark.csv', _import_csv(import_rows), content_type='text/csv')
+            # Data impor dibatalkan agar setiap putaran dan run berikutnya mengukur data yang sama
+            with transaction.atomic():
+                response = client.post(url, {'csv_file': upload})
+                transaction.set_rollback(True)
+            return response
+        response = client.get(url)
+        if response.streaming:
+            b''.join(response.streaming_content)
+        return response
+
+    def _measure(self, client, target, iterations, warmup, import_rows):
+        name, method, url, cold = target
+        url = url if url.startswith('/') else reverse(url)
+        timings, db_timings, queries, status = [], [], [], None
+        for iteration in range(warmup + iterations):
+            if cold:
+                cache.clear()
+            recorder = QueryRecorder()
+            with connection.execute_wrapper(recorder):
+                started = time.perf_counter()
+                response = self._request(client, method, url, import_rows)
+                elapsed = time.perf_counter() - started
+            status = response.status_code
+            if status >= 400:
+                raise CommandError(f"{name}: {url} mengembalikan status {status}.")
+            if iteration >= warmup:
+                timings.append(elapsed * 1000)
+                db_timings.append(recorder.duration * 1000)
+                queries.append(recorder.count)
+        return {
+            'url': url,
+            'status': status,
+            'iterations': iterations,
+            'min_ms': round(min(timings), 2),
+            'median_ms': round(statistics.median(timings), 2),
+            'p95_ms': round(_percentile(timings, 0.95), 2),
+            'max_ms': round(max(timings), 2),
+            'db_median_ms': round(statistics.median(db_timings), 2),
+            'queries': max(queries),
+        }
+
+    def _compare(self, results, path):
+        try:
+            previous = json.loads(Path(path).read_text())['results']
+        except (OSError, ValueError, KeyError) as e:
+            raise CommandError(f"Tidak bisa membaca {path}: {e}")
+        self.stdout.write(f"\nDibandingkan dengan {path}:")
+        for name, result in results.items():
+            before = previous.get(name)
+            if not before:
+                continue
+            ratio = result['median_ms'] / before['median_ms'] if before['median_ms'] else float('inf')
+            line = (f"{name:>22}: {before['median_ms']:>9.2f} -> {result['median_ms']:>9.2f} ms ({ratio:.2f}x), "
+                    f"query {before['queries']} -> {result['queries']}")
+            self.stdout.write(self.style.ERROR(line) if ratio > 1.1 else line)
+
+    def handle(self, *args, **options):
+        if options['iterations'] < 1 or options['warmup'] < 0:
+            raise CommandError("--iterations minimal 1 dan --warmup tidak boleh negatif.")
+        user = self._user(options['username'])
+        targets = [target for target in TARGETS if not options['only'] or target[0] in options['only']]
+
+        client = Client()
+        client.force_login(user)
+        results = {}
+        # Log per request dari PerformanceMiddleware hanya menambah noise dan waktu selama pengukuran
+        quiet = [logging.getLogger(name) for name in ('finance_tracker_app.performance',
+                                                      'finance_tracker_app.slow_requests')]
+        for logger in quiet:
+            logger.disabled = True
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                for target in targets:
+                    results[target[0]] = result = self._measure(client, target, options['iterations'],
+                                                                options['warmup'], options['import_rows'])
+                    self.stdout.write(f"{target[0]:>22}: median {result['median_ms']:>9.2f} ms, "
+                                      f"p95 {result['p95_ms']:>9.2f} ms, {result['queries']} query")
+        finally:
+            for logger in quiet:
+                logger.disabled = False
+
+        report = {
+            'created_at': timezone.now().isoformat(),
+            'git_commit': _git_commit(),
+            'database': connection.vendor,
+            'python': platform.python_version(),
+            'user': user.username,
+            'rows': {
+                'user_transactions': Transaction.objects.filter(user=user).count(),
+                'transactions': Transaction.objects.count(),
+                'users': User.objects.count(),
+            },
+            'iterations': options['iterations'],
+            'warmup': options['warmup'],
+            'import_rows': options['import_rows'],
+            'results': results,
+        }
+        output = Path(options['output'] or Path(settings.BASE_DIR) / 'benchmarks' /
+                      f"hot_paths-{timezone.now():%Y%m%d-%H%M%S}.json")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2))
+        self.stdout.write(self.style.SUCCESS(f"Hasil disimpan di {output}"))
+
+        if options['compare']:
+            self._compare(results, options['compare'])
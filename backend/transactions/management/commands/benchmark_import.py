@@ -0,0 +1,83 @@
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from transactions.importers import TransactionImporter
+from transactions.models import Transaction, Category, Wallet, Payee
+
+WALLET_COUNT = 5
+
+
+def generate_rows(count, seed=0):
+    rng = random.Random(seed)
+    wallets = [f"Dompet {i}" for i in range(WALLET_COUNT)]
+    categories = [f"Kategori {i}" for i in range(30)]
+    payees = [f"Penerima {i}" for i in range(500)]
+    start = date(2020, 1, 1)
+    for _ in range(count):
+        trans_type = 'PEMASUKAN' if rng.random() < 0.1 else 'PENGELUARAN'
+        yield [(start + timedelta(days=rng.randrange(2000))).isoformat(), trans_type, rng.choice(payees),
+               rng.choice(categories), f"{rng.randrange(1000, 5000000)}.00", str(rng.choice([0, 0, 2500, 6500])),
+               rng.choice(wallets), '']
+
+
+def legacy_import(user, rows):
+    # Jalur lama transaction_import: get_or_create + create + wallet.save() per baris
+    for trans_date_str, trans_type, payee_name, category_name, amount_str, admin_fee_str, wallet_name, notes in rows:
+        amount = Decimal(amount_str)
+        admin_fee = Decimal(admin_fee_str or 0)
+
+        wallet, _ = Wallet.objects.get_or_create(name=wallet_name, user=user)
+        category, _ = Category.objects.get_or_create(name=category_name, user=user)
+        payee, _ = Payee.objects.get_or_create(name=payee_name, user=user)
+
+        Transaction.objects.create(user=user, wallet=wallet, category=category, payee=payee, amount=amount,
+                                   admin_fee=admin_fee, transaction_type=trans_type,
+                                   transaction_date=trans_date_str, notes=notes)
+
+        if trans_type == 'PENGELUARAN':
+            wallet.balance -= amount + admin_fee
+        elif trans_type == 'PEMASUKAN':
+            wallet.balance += amount
+        wallet.save()
+
+
+class Command(BaseCommand):
+    help = "Bandingkan throughput (baris/detik) impor CSV massal dengan jalur lama per baris."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10000)
+        parser.add_argument('--legacy-rows', type=int, default=None,
+                            help="Jumlah baris untuk jalur lama (default sama dengan --rows).")
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def _run(self, label, rows, func):
+        rows = list(rows)
+        with transaction.atomic():
+            user = User.objects.create_user(username=f'__bench_import_{label}_{time.time_ns()}')
+            # Dompet dibuat lebih dulu: jalur lama tidak bisa menambah saldo dompet baru (default float)
+            for i in range(WALLET_COUNT):
+                Wallet.objects.create(user=user, name=f"Dompet {i}", balance=Decimal(0))
+            started = time.perf_counter()
+            func(user, rows)
+            elapsed = time.perf_counter() - started
+            # Semua data benchmark dibatalkan
+            transaction.set_rollback(True)
+        rate = len(rows) / elapsed if elapsed else float('inf')
+        self.stdout.write(f"{label:>8}: {len(rows)} baris dalam {elapsed:.2f} detik ({rate:,.0f} baris/detik)")
+        return rate
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        legacy_rows = options['legacy_rows'] or rows
+        batch_size = options['batch_size']
+
+        bulk_rate = self._run('bulk', generate_rows(rows),
+                              lambda user, data: TransactionImporter(user, batch_size=batch_size).import_rows(data))
+        legacy_rate = self._run('legacy', generate_rows(legacy_rows), legacy_import)
+        self.stdout.write(self.style.SUCCESS(f"Percepatan: {bulk_rate / legacy_rate:.1f}x"))
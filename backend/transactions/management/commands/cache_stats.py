@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+
+from transactions import caching
+
+
+class Command(BaseCommand):
+    help = "Tampilkan jumlah hit/miss cache per pengguna (mis. dasbor)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('names', nargs='*', default=['dashboard'])
+        parser.add_argument('--reset', action='store_true', help="Nolkan penghitung setelah ditampilkan.")
+
+    def handle(self, *args, **options):
+        for name in options['names']:
+            stats = caching.cache_stats(name)
+            total = stats['hit'] + stats['miss']
+            ratio = stats['hit'] / total * 100 if total else 0
+            self.stdout.write(f"{name}: {stats['hit']} hit, {stats['miss']} miss ({ratio:.1f}% hit)")
+            if options['reset']:
+                caching.reset_cache_stats(name)
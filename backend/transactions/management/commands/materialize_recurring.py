@@ -0,0 +1,32 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from transactions import recurring
+
+
+class Command(BaseCommand):
+    help = ("Buat transaksi dari semua aturan berulang yang jatuh tempo di semua pengguna. Aman dijalankan berulang "
+            "(mis. dari cron setiap jam): kejadian yang sudah dibuat tidak dibuat lagi.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help="Buat kejadian sampai tanggal ini, YYYY-MM-DD (default: hari ini).")
+        parser.add_argument('--batch-size', type=int, default=recurring.MATERIALIZE_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            today = date.fromisoformat(options['date']) if options['date'] else date.today()
+        except ValueError:
+            raise CommandError("Format --date harus YYYY-MM-DD.")
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size harus positif.")
+
+        total_rules = total_created = 0
+        # Satu run biasanya cukup; run tambahan hanya untuk aturan yang tertinggal lebih dari MAX_CATCH_UP kejadian
+        while True:
+            rules, created = recurring.materialize(today, batch_size=options['batch_size'])
+            total_rules, total_created = total_rules + rules, total_created + created
+            if not created:
+                break
+        self.stdout.write(self.style.SUCCESS(
+            f"{total_created} transaksi dibuat dari {total_rules} aturan jatuh tempo sampai {today:%Y-%m-%d}."))
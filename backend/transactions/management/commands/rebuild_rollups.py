@@ -0,0 +1,41 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from transactions import rollups
+
+
+class Command(BaseCommand):
+    help = "Bangun ulang dan/atau verifikasi tabel MonthlySummary dari data Transaction."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', dest='usernames', default=[],
+                            help="Batasi ke username tertentu (bisa diulang).")
+        parser.add_argument('--verify-only', action='store_true',
+                            help="Hanya laporkan selisih, jangan bangun ulang.")
+
+    def handle(self, *args, **options):
+        users = None
+        if options['usernames']:
+            users = list(User.objects.filter(username__in=options['usernames']))
+            if len(users) != len(set(options['usernames'])):
+                raise CommandError("Sebagian username tidak ditemukan.")
+
+        mismatches = rollups.verify(users)
+        for key, expected, actual in mismatches:
+            user_id, wallet_id, category_id, month, transaction_type = key
+            self.stdout.write(f"user={user_id} wallet={wallet_id} category={category_id} month={month:%Y-%m} "
+                              f"type={transaction_type}: seharusnya {expected}, tercatat {actual}")
+
+        if options['verify_only']:
+            if mismatches:
+                raise CommandError(f"{len(mismatches)} ringkasan tidak cocok.")
+            self.stdout.write(self.style.SUCCESS("Semua ringkasan cocok."))
+            return
+
+        with transaction.atomic():
+            count = rollups.rebuild(users)
+            remaining = rollups.verify(users)
+        if remaining:
+            raise CommandError(f"{len(remaining)} ringkasan masih tidak cocok setelah dibangun ulang.")
+        self.stdout.write(self.style.SUCCESS(f"{count} ringkasan dibangun ulang ({len(mismatches)} sebelumnya selisih)."))
@@ -0,0 +1,19 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from transactions import search
+
+
+class Command(BaseCommand):
+    help = "Pasang ulang trigger pencarian dan tulis ulang dokumen pencarian semua transaksi."
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with transaction.atomic():
+            count = search.rebuild(connection)
+        if count is None:
+            raise CommandError(f"Pencarian full-text belum didukung untuk {connection.vendor}.")
+        self.stdout.write(self.style.SUCCESS(
+            f"{count} dokumen pencarian ditulis ulang dalam {time.perf_counter() - started:.2f} detik."))
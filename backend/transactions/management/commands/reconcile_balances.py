@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F
+
+from transactions import balances, caching
+from transactions.models import BalanceEntry, Wallet
+
+
+class Command(BaseCommand):
+    help = "Cari selisih antara Wallet.balance dan saldo ledger untuk semua dompet."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', action='append', dest='usernames', default=[],
+                            help="Batasi ke dompet milik username tertentu (bisa diulang).")
+        parser.add_argument('--fix', choices=['ledger', 'wallet'],
+                            help="ledger: set saldo dompet sesuai ledger; wallet: catat penyesuaian di ledger "
+                                 "agar sama dengan saldo dompet.")
+        parser.add_argument('--checkpoint', action='store_true',
+                            help="Buat checkpoint saldo baru untuk semua dompet setelah rekonsiliasi.")
+
+    def handle(self, *args, **options):
+        wallets = Wallet.objects.all()
+        if options['usernames']:
+            wallets = wallets.filter(user__username__in=options['usernames'])
+
+        with transaction.atomic():
+            drifted = list(balances.with_ledger_balance(wallets.select_for_update())
+                           .exclude(balance=F('ledger_balance')).order_by('pk'))
+            for wallet in drifted:
+                self.stdout.write(f"{wallet.pk} {wallet.name} (user={wallet.user_id}): dompet {wallet.balance}, "
+                                  f"ledger {wallet.ledger_balance}, selisih {wallet.balance - wallet.ledger_balance}")
+
+            if options['fix'] == 'ledger':
+                for wallet in drifted:
+                    Wallet.objects.filter(pk=wallet.pk).update(balance=wallet.ledger_balance)
+                caching.bump_data_version(*(wallet.user_id for wallet in drifted))
+            elif options['fix'] == 'wallet':
+                for wallet in drifted:
+                    balances.record_entry(wallet.pk, wallet.balance - wallet.ledger_balance,
+                                          BalanceEntry.EntryKind.ADJUSTMENT)
+
+            if options['checkpoint']:
+                created = balances.create_checkpoints(wallets)
+                self.stdout.write(f"{len(created)} checkpoint dibuat.")
+
+        if drifted and not options['fix']:
+            raise CommandError(f"{len(drifted)} dompet tidak cocok dengan ledger.")
+        self.stdout.write(self.style.SUCCESS(f"{len(drifted)} dompet selisih"
+                                             f"{' diperbaiki' if options['fix'] and drifted else ''}."))
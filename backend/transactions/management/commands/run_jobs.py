@@ -0,0 +1,71 @@
+import multiprocessing
+import os
+import signal
+import socket
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from transactions import jobs
+
+
+def _process_main(name, once, poll_interval, stop):
+    # Sesudah fork setup() tidak melakukan apa-apa; dengan spawn aplikasi Django dimuat ulang di proses anak
+    django.setup()
+    # Ctrl+C menghentikan lewat proses induk, sehingga job yang sedang berjalan diselesaikan dulu
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    connections.close_all()
+    try:
+        jobs.work(name, once=once, poll_interval=poll_interval, stop=stop)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = ("Jalankan worker antrean job (impor, ekspor, hitung ulang) dengan beberapa proses. Antrean disimpan di "
+            "database aplikasi; cukup jalankan perintah ini di samping server web.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int, default=settings.JOB_WORKER_PROCESSES,
+                            help="Jumlah proses worker (0 = jalankan di proses ini).")
+        parser.add_argument('--once', action='store_true', help="Berhenti setelah antrean kosong.")
+        parser.add_argument('--poll-interval', type=float, default=settings.JOB_POLL_INTERVAL,
+                            help="Jeda (detik) sebelum memeriksa antrean lagi saat kosong.")
+
+    def handle(self, *args, **options):
+        if options['processes'] < 0 or options['poll_interval'] < 0:
+            raise CommandError("--processes dan --poll-interval tidak boleh negatif.")
+        prefix = f"{socket.gethostname()}:{os.getpid()}"
+        if options['processes'] == 0:
+            count = jobs.work(prefix, once=options['once'], poll_interval=options['poll_interval'])
+            self.stdout.write(self.style.SUCCESS(f"{count} job dijalankan."))
+            return
+
+        # Koneksi induk tidak boleh diwarisi proses anak
+        connections.close_all()
+        context = multiprocessing.get_context()
+        stop = context.Event()
+        processes = [context.Process(target=_process_main, name=f'job-worker-{index}',
+                                     args=(f"{prefix}/{index}", options['once'], options['poll_interval'], stop))
+                     for index in range(options['processes'])]
+        for process in processes:
+            process.start()
+        previous = signal.signal(signal.SIGTERM, lambda signum, frame: stop.set())
+        self.stdout.write(f"{len(processes)} proses worker berjalan.")
+        try:
+            for process in processes:
+                while process.is_alive():
+                    process.join(timeout=1)
+        except KeyboardInterrupt:
+            self.stdout.write("Menunggu job yang sedang berjalan selesai...")
+            stop.set()
+            for process in processes:
+                process.join()
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+        failed = [process.name for process in processes if process.exitcode]
+        if failed:
+            raise CommandError(f"Proses worker berhenti dengan error: {', '.join(failed)}")
+        self.stdout.write(self.style.SUCCESS("Worker berhenti."))
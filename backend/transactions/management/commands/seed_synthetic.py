@@ -0,0 +1,208 @@
+import random
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from transactions import access, balances, rollups
+from transactions.caching import bump_data_version
+from transactions.models import (BalanceEntry, Budget, Category, Payee, Product, PurchaseItem, Transaction, Transfer,
+                                 Wallet)
+
+WALLETS = (
+    ('Rekening BCA', Wallet.WalletType.ASSET), ('Rekening Mandiri', Wallet.WalletType.ASSET),
+    ('Dompet Tunai', Wallet.WalletType.ASSET), ('GoPay', Wallet.WalletType.ASSET), ('OVO', Wallet.WalletType.ASSET),
+    ('Kartu Kredit', Wallet.WalletType.LIABILITY), ('Paylater', Wallet.WalletType.LIABILITY),
+)
+EXPENSE_CATEGORIES = ('Makanan', 'Transportasi', 'Belanja Bulanan', 'Tagihan', 'Hiburan', 'Kesehatan', 'Pendidikan',
+                      'Pakaian', 'Rumah Tangga', 'Donasi', 'Langganan', 'Perawatan Kendaraan')
+INCOME_CATEGORIES = ('Gaji', 'Bonus', 'Usaha Sampingan', 'Bunga Bank')
+PAYEES = ('Indomaret', 'Alfamart', 'Tokopedia', 'Shopee', 'Gojek', 'Grab', 'PLN', 'Telkomsel', 'PDAM', 'Pertamina',
+          'Superindo', 'Hypermart', 'Apotek K24', 'Kimia Farma', 'Netflix', 'Spotify', 'Kantor', 'Bank')
+PRODUCTS = ('Beras 5kg', 'Minyak Goreng 2L', 'Gula Pasir 1kg', 'Telur 1kg', 'Susu UHT', 'Kopi Bubuk', 'Teh Celup',
+            'Sabun Mandi', 'Sampo', 'Pasta Gigi', 'Deterjen', 'Air Mineral', 'Mi Instan', 'Roti Tawar', 'Tisu')
+NOTES = ('Makan siang', 'Belanja mingguan', 'Bayar tagihan bulan ini', 'Isi bensin', 'Langganan bulanan',
+         'Hadiah ulang tahun', 'Servis motor', 'Obat flu', 'Nonton bioskop', 'Ongkos parkir')
+
+
+def month_starts(months, today):
+    first = today.replace(day=1)
+    for offset in range(months):
+        year, month = divmod(first.year * 12 + first.month - 1 - offset, 12)
+        yield date(year, month + 1, 1)
+
+
+class SyntheticSeeder:
+    """
+    Data sintetis yang mirip pemakaian nyata: beberapa dompet per pengguna (sebagian dibagikan ke pengguna lain),
+    kategori, penerima, produk, transaksi dengan jumlah condong ke nominal kecil, transfer, anggaran bulanan, dan
+    item pembelian. Semua ditulis dengan bulk_create per batch; saldo dompet, ledger, dan ringkasan bulanan
+    disesuaikan di akhir tiap pengguna sehingga reconcile_balances dan rebuild_rollups --verify-only tetap bersih.
+    """
+
+    def __init__(self, users=10, transactions_per_user=1000, months=24, seed=0, prefix='synth', batch_size=5000,
+                 share_every=3, today=None):
+        self.users = users
+        self.transactions_per_user = transactions_per_user
+        self.months = months
+        self.rng = random.Random(seed)
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.share_every = share_every
+        self.today = today or date.today()
+        self.counts = defaultdict(int)
+
+    def _create(self, model, objects):
+        created = model.objects.bulk_create(objects, batch_size=self.batch_size)
+        self.counts[model._meta.model_name] += len(created)
+        return created
+
+    def _amount(self, low, high):
+        # Kebanyakan pengeluaran kecil, sesekali besar
+        value = min(max(self.rng.lognormvariate(11, 1.2), low), high)
+        return Decimal(int(value) // 500 * 500 or low).quantize(Decimal('0.01'))
+
+    def _date(self):
+        return self.today - timedelta(days=self.rng.randrange(self.months * 30))
+
+    def seed(self):
+        existing = User.objects.filter(username__startswith=f'{self.prefix}_').count()
+        names = [f'{self.prefix}_{existing + i + 1}' for i in range(self.users)]
+        users = []
+        for name in names:
+            user = User(username=name, email=f'{name}@example.com')
+            user.set_unusable_password()
+            users.append(user)
+        users = self._create(User, users)
+
+        wallets_by_user = {}
+        for user in users:
+            with transaction.atomic():
+                wallets_by_user[user.pk] = self._seed_user(user)
+
+        with transaction.atomic():
+            self._share_wallets(users, wallets_by_user)
+            self.counts['monthlysummary'] = rollups.rebuild(users)
+            bump_data_version(*users)
+        return users
+
+    def _seed_user(self, user):
+        rng = self.rng
+        wallets = self._create(Wallet, [
+            Wallet(user=user, name=name, wallet_type=wallet_type,
+                   balance=Decimal(0) if wallet_type == Wallet.WalletType.LIABILITY else self._amount(100000, 50000000))
+            for name, wallet_type in rng.sample(WALLETS, rng.randint(2, 5))])
+        now = timezone.now()
+        self._create(BalanceEntry, [BalanceEntry(wallet=wallet, amount=wallet.balance,
+                                                 kind=BalanceEntry.EntryKind.OPENING, recorded_at=now)
+                                    for wallet in wallets])
+
+        expense_categories = self._create(Category, [Category(user=user, name=name) for name in EXPENSE_CATEGORIES])
+        income_categories = self._create(Category, [Category(user=user, name=name) for name in INCOME_CATEGORIES])
+        payees = self._create(Payee, [Payee(user=user, name=name) for name in PAYEES] +
+                              [Payee(user=user, name=f'Warung {i + 1}') for i in range(rng.randint(5, 40))])
+        products = self._create(Product, [Product(user=user, name=name, category=rng.choice(expense_categories[:3]))
+                                          for name in PRODUCTS])
+
+        deltas = defaultdict(Decimal)
+        remaining = self.transactions_per_user
+        while remaining > 0:
+            batch = []
+            for _ in range(min(remaining, self.batch_size)):
+                wallet = rng.choice(wallets)
+                if rng.random() < 0.1:
+                    tx = Transaction(user=user, wallet=wallet, category=rng.choice(income_categories),
+                                     payee=payees[PAYEES.index('Kantor')], amount=self._amount(1000000, 30000000),
+                                     admin_fee=Decimal(0), transaction_type=Transaction.TransactionType.INCOME,
+                                     transaction_date=self._date())
+                else:
+                    tx = Transaction(user=user, wallet=wallet, category=rng.choice(expense_categories),
+                                     payee=rng.choice(payees), amount=self._amount(1000, 10000000),
+                                     admin_fee=Decimal(rng.choice((0, 0, 0, 1000, 2500, 6500))),
+                                     transaction_type=Transaction.TransactionType.EXPENSE,
+                                     transaction_date=self._date())
+                tx.notes = rng.choice(NOTES) if rng.random() < 0.3 else None
+                batch.append(tx)
+            self._create(Transaction, batch)
+            items = []
+            for tx in batch:
+                deltas[tx.wallet_id] += balances.transaction_delta(tx)
+                if tx.transaction_type == Transaction.TransactionType.EXPENSE and rng.random() < 0.2:
+                    items.extend(PurchaseItem(user=user, transaction=tx, product=rng.choice(products),
+                                              quantity=Decimal(rng.randint(1, 5)), price=self._amount(1000, 200000))
+                                 for _ in range(rng.randint(1, 3)))
+            self._create(PurchaseItem, items)
+            remaining -= len(batch)
+
+        transfers = []
+        if len(wallets) > 1:
+            for _ in range(self.transfers_per_user):
+                from_wallet, to_wallet = rng.sample(wallets, 2)
+                transfer = Transfer(user=user, from_wallet=from_wallet, to_wallet=to_wallet,
+                                    amount=self._amount(10000, 5000000), admin_fee=Decimal(rng.choice((0, 2500, 6500))),
+                                    transfer_date=self._date())
+                deltas[from_wallet.pk] -= transfer.amount + transfer.admin_fee
+                deltas[to_wallet.pk] += transfer.amount
+                transfers.append(transfer)
+        self._create(Transfer, transfers)
+
+        self._create(Budget, [Budget(user=user, category=category, month=month, amount=self._amount(200000, 5000000))
+                              for month in month_starts(self.months, self.today)
+                              for category in rng.sample(expense_categories, 6)])
+
+        balances.apply_deltas(deltas.items(), kind=BalanceEntry.EntryKind.IMPORT)
+        return wallets
+
+    @property
+    def transfers_per_user(self):
+        return max(self.transactions_per_user // 20, 1)
+
+    def _share_wallets(self, users, wallets_by_user):
+        # Tiap pengguna ke-N membagikan satu dompetnya ke pengguna berikutnya
+        through = Wallet.shared_with.through
+        rows = []
+        for index, user in enumerate(users):
+            if self.share_every and index % self.share_every == 0 and len(users) > 1:
+                target = users[(index + 1) % len(users)]
+                rows.append(through(wallet=self.rng.choice(wallets_by_user[user.pk]), user=target))
+        self._create(through, rows)
+        # bulk_create tidak memicu m2m_changed
+        access.invalidate(*(row.user_id for row in rows))
+
+
+class Command(BaseCommand):
+    help = ("Isi database dengan data sintetis (pengguna, dompet bersama, kategori, penerima, transaksi, transfer, "
+            "anggaran, item pembelian) untuk pengujian performa.")
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--transactions', type=int, default=1000, help="Jumlah transaksi per pengguna.")
+        parser.add_argument('--months', type=int, default=24, help="Rentang tanggal data dan anggaran, dalam bulan.")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--prefix', default='synth', help="Awalan username pengguna sintetis.")
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--share-every', type=int, default=3,
+                            help="Setiap pengguna ke-N membagikan satu dompet (0 = tidak ada).")
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['transactions'] < 0 or options['months'] < 1 or options['batch_size'] < 1:
+            raise CommandError("--users, --months, dan --batch-size harus positif; --transactions tidak boleh negatif.")
+
+        seeder = SyntheticSeeder(users=options['users'], transactions_per_user=options['transactions'],
+                                 months=options['months'], seed=options['seed'], prefix=options['prefix'],
+                                 batch_size=options['batch_size'], share_every=options['share_every'])
+        started = time.perf_counter()
+        users = seeder.seed()
+        elapsed = time.perf_counter() - started
+
+        for model, count in sorted(seeder.counts.items()):
+            self.stdout.write(f"{model:>16}: {count:,}")
+        total = sum(seeder.counts.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"{len(users)} pengguna ({users[0].username} .. {users[-1].username}), {total:,} baris dalam "
+            f"{elapsed:.1f} detik ({total / elapsed if elapsed else 0:,.0f} baris/detik)."))
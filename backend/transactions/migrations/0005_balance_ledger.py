@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 20:28
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def record_opening_balances(apps, schema_editor):
+    Wallet = apps.get_model('transactions', 'Wallet')
+    BalanceEntry = apps.get_model('transactions', 'BalanceEntry')
+    now = timezone.now()
+    BalanceEntry.objects.bulk_create(
+        [BalanceEntry(wallet_id=wallet_id, amount=balance, kind='SALDO_AWAL', recorded_at=now)
+         for wallet_id, balance in Wallet.objects.exclude(balance=0).values_list('pk', 'balance').iterator()],
+        batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0004_user_data_version'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BalanceCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_entry_id', models.BigIntegerField()),
+                ('balance', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('recorded_at', models.DateTimeField()),
+                ('wallet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_checkpoints', to='transactions.wallet')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['wallet', '-last_entry_id'], name='checkpoint_wallet_entry_idx'), models.Index(fields=['wallet', '-recorded_at'], name='checkpoint_wallet_time_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BalanceEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=15)),
+                ('kind', models.CharField(choices=[('SALDO_AWAL', 'Saldo Awal'), ('PENYESUAIAN', 'Penyesuaian'), ('TRANSAKSI', 'Transaksi'), ('TRANSFER', 'Transfer'), ('IMPOR', 'Impor')], max_length=12)),
+                ('recorded_at', models.DateTimeField()),
+                ('wallet', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='balance_entries', to='transactions.wallet')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['wallet', 'id'], name='entry_wallet_id_idx')],
+            },
+        ),
+        migrations.RunPython(record_opening_balances, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0009_recurring_rule'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Job',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('IMPOR', 'Impor transaksi'), ('EKSPOR', 'Ekspor transaksi'), ('HITUNG_ULANG', 'Hitung ulang ringkasan dan saldo')], max_length=20)),
+                ('status', models.CharField(choices=[('ANTRE', 'Dalam antrean'), ('BERJALAN', 'Berjalan'), ('SELESAI', 'Selesai'), ('GAGAL', 'Gagal')], default='ANTRE', max_length=10)),
+                ('input_name', models.CharField(blank=True, max_length=255)),
+                ('input_data', models.BinaryField(blank=True, null=True)),
+                ('result_name', models.CharField(blank=True, max_length=255)),
+                ('result_content_type', models.CharField(blank=True, max_length=100)),
+                ('result_data', models.BinaryField(blank=True, null=True)),
+                ('result', models.JSONField(blank=True, null=True)),
+                ('error', models.TextField(blank=True)),
+                ('progress', models.PositiveIntegerField(default=0)),
+                ('total', models.PositiveIntegerField(blank=True, null=True)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('worker', models.CharField(blank=True, max_length=100)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['user', '-id'], name='job_user_id_idx'), models.Index(condition=models.Q(('status', 'ANTRE')), fields=['id'], name='job_queued_idx'), models.Index(condition=models.Q(('status', 'BERJALAN')), fields=['heartbeat_at'], name='job_running_heartbeat_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-18 21:48
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def uninstall_search_index(apps, schema_editor):
+    from transactions import search
+
+    # Tabel penerima dibuat ulang di SQLite; trigger pencarian yang merujuknya dilepas dulu
+    search.uninstall(schema_editor.connection)
+
+
+def rebuild_search_index(apps, schema_editor):
+    from transactions import search
+
+    search.rebuild(schema_editor.connection)
+
+
+def count_payee_usage(apps, schema_editor):
+    Payee = apps.get_model('transactions', 'Payee')
+    Transaction = apps.get_model('transactions', 'Transaction')
+    usage = Transaction.objects.filter(payee=OuterRef('pk')).order_by().values('payee')
+    Payee.objects.update(transaction_count=Coalesce(Subquery(usage.annotate(count=Count('pk')).values('count')), 0),
+                         last_used=Subquery(usage.annotate(last=Max('transaction_date')).values('last')))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0012_resource_version'),
+    ]
+
+    operations = [
+        migrations.RunPython(uninstall_search_index, rebuild_search_index),
+        migrations.AddField(
+            model_name='payee',
+            name='last_used',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='payee',
+            name='transaction_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(count_payee_usage, migrations.RunPython.noop),
+        migrations.RunPython(rebuild_search_index, uninstall_search_index),
+    ]
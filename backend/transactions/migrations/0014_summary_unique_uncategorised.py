@@ -0,0 +1,45 @@
+# Generated by Django 5.2.18 on 2026-10-18 22:06
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+KEY_FIELDS = ('user_id', 'wallet_id', 'month', 'transaction_type')
+
+
+def merge_uncategorised_duplicates(apps, schema_editor):
+    # unique_together lama tidak mencegah baris kembar dengan kategori NULL; gabungkan sebelum constraint dipasang
+    MonthlySummary = apps.get_model('transactions', 'MonthlySummary')
+    uncategorised = MonthlySummary.objects.filter(category__isnull=True)
+    duplicates = (uncategorised.values(*KEY_FIELDS)
+                  .annotate(rows=Count('pk'), keep=Min('pk'), amount=Sum('total_amount'), fee=Sum('total_admin_fee'),
+                            count=Sum('transaction_count'))
+                  .filter(rows__gt=1).order_by())
+    for row in duplicates:
+        group = uncategorised.filter(**{field: row[field] for field in KEY_FIELDS})
+        group.exclude(pk=row['keep']).delete()
+        group.update(total_amount=row['amount'], total_admin_fee=row['fee'], transaction_count=row['count'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('transactions', '0013_payee_usage'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_uncategorised_duplicates, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='monthlysummary',
+            unique_together=set(),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlysummary',
+            constraint=models.UniqueConstraint(condition=models.Q(('category__isnull', False)), fields=('user', 'wallet', 'category', 'month', 'transaction_type'), name='summary_unique_key'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlysummary',
+            constraint=models.UniqueConstraint(condition=models.Q(('category__isnull', True)), fields=('user', 'wallet', 'month', 'transaction_type'), name='summary_unique_uncategorised'),
+        ),
+    ]
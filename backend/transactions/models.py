@@ -28,6 +28,9 @@ class Wallet(models.Model):
 class Payee(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     name = models.CharField(max_length=100)
+    # Penghitung pemakaian untuk urutan saran penerima, dijaga bersama ringkasan bulanan (rollups.RollupBatch)
+    transaction_count = models.IntegerField(default=0)
+    last_used = models.DateField(null=True, blank=True)
 
     def __str__(self):
         return self.name
@@ -48,6 +51,26 @@ class Transaction(models.Model):
     transaction_type = models.CharField(max_length=12, choices=TransactionType.choices)
     transaction_date = models.DateField()
     notes = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Daftar transaksi (keyset tanggal + id), transaksi terakhir di dashboard, ekspor
+            models.Index(fields=['user', '-transaction_date', '-id'], name='tx_user_date_id_idx'),
+            # Transaksi di dompet yang dibagikan, halaman demi halaman; filter dompet di API
+            models.Index(fields=['wallet', '-transaction_date', '-id'], name='tx_wallet_date_id_idx'),
+            # Filter kategori/penerima per periode dan urut/rentang jumlah di API
+            models.Index(fields=['category', '-transaction_date', '-id'], name='tx_category_date_id_idx'),
+            models.Index(fields=['payee', '-transaction_date', '-id'], name='tx_payee_date_id_idx'),
+            models.Index(fields=['user', 'amount', 'id'], name='tx_user_amount_id_idx'),
+            # Pemasukan/pengeluaran per periode di dashboard
+            models.Index(fields=['user', 'transaction_type', 'transaction_date'], name='tx_user_type_date_idx'),
+            # Realisasi anggaran: hanya pengeluaran per dompet, kategori, dan bulan
+            models.Index(fields=['wallet', 'category', 'transaction_date'], name='tx_expense_wallet_cat_date_idx',
+                         condition=models.Q(transaction_type='PENGELUARAN')),
+            # Ekspor delta (updated_since)
+            models.Index(fields=['user', 'updated_at'], name='tx_user_updated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.payee} - {self.amount}"
@@ -60,6 +83,9 @@ class Budget(models.Model):
 
     class Meta:
         unique_together = ('user', 'category', 'month')
+        indexes = [
+            models.Index(fields=['user', 'month'], name='budget_user_month_idx'),
+        ]
 
     def __str__(self):
         return f"Budget for {self.category.name} in {self.month.strftime('%B %Y')}"
@@ -107,10 +133,60 @@ class Transfer(models.Model):
     admin_fee = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)
     transfer_date = models.DateField()
     notes = models.TextField(blank=True, null=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-transfer_date'], name='transfer_user_date_idx'),
+            models.Index(fields=['from_wallet', '-transfer_date'], name='transfer_from_date_idx'),
+            models.Index(fields=['to_wallet', '-transfer_date'], name='transfer_to_date_idx'),
+            models.Index(fields=['user', 'updated_at'], name='transfer_user_updated_idx'),
+        ]
 
     def __str__(self):
         return f"Transfer from {self.from_wallet.name} to {self.to_wallet.name}"
 
+class RecurringRule(models.Model):
+    class Frequency(models.TextChoices):
+        DAILY = 'HARIAN', 'Harian'
+        WEEKLY = 'MINGGUAN', 'Mingguan'
+        MONTHLY = 'BULANAN', 'Bulanan'
+        YEARLY = 'TAHUNAN', 'Tahunan'
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name='recurring_rules')
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True)
+    payee = models.ForeignKey(Payee, on_delete=models.SET_NULL, null=True, blank=True)
+
+    amount = models.DecimalField(max_digits=15, decimal_places=2)
+    admin_fee = models.DecimalField(max_digits=15, decimal_places=2, default=0.00)
+    transaction_type = models.CharField(max_length=12, choices=Transaction.TransactionType.choices)
+    notes = models.TextField(blank=True, null=True)
+
+    frequency = models.CharField(max_length=10, choices=Frequency.choices, default=Frequency.MONTHLY)
+    interval = models.PositiveSmallIntegerField(default=1)
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)
+    # Jumlah kejadian yang sudah dibuat dan tanggal kejadian berikutnya (kosong bila sudah selesai)
+    occurrences = models.PositiveIntegerField(default=0)
+    next_run = models.DateField(null=True, blank=True)
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        indexes = [
+            # Aturan jatuh tempo yang dicari penjadwal di semua pengguna
+            models.Index(fields=['next_run'], name='recurring_next_run_idx', condition=models.Q(is_active=True)),
+        ]
+
+    def __str__(self):
+        return f"{self.payee or self.category} - {self.amount} ({self.get_frequency_display()})"
+
+    def save(self, *args, **kwargs):
+        if self._state.adding and self.next_run is None and not self.occurrences:
+            self.next_run = self.start_date
+        super().save(*args, **kwargs)
+
+
 class Product(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     name = models.CharField(max_length=200)
@@ -125,6 +201,167 @@ class PurchaseItem(models.Model):
     product = models.ForeignKey(Product, on_delete=models.CASCADE)
     quantity = models.DecimalField(max_digits=10, decimal_places=2, default=1.00)
     price = models.DecimalField(max_digits=15, decimal_places=2)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'updated_at'], name='item_user_updated_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.quantity} of {self.product.name} in transaction {self.transaction.id}"
+
+class MonthlySummary(models.Model):
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name='monthly_summaries')
+    category = models.ForeignKey(Category, on_delete=models.SET_NULL, null=True, blank=True)
+    month = models.DateField()
+    transaction_type = models.CharField(max_length=12, choices=Transaction.TransactionType.choices)
+    total_amount = models.DecimalField(max_digits=17, decimal_places=2, default=0)
+    total_admin_fee = models.DecimalField(max_digits=17, decimal_places=2, default=0)
+    transaction_count = models.IntegerField(default=0)
+
+    class Meta:
+        # NULL tidak dianggap sama oleh indeks unik biasa, jadi baris tanpa kategori punya constraint sendiri
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'wallet', 'category', 'month', 'transaction_type'],
+                                    condition=models.Q(category__isnull=False), name='summary_unique_key'),
+            models.UniqueConstraint(fields=['user', 'wallet', 'month', 'transaction_type'],
+                                    condition=models.Q(category__isnull=True), name='summary_unique_uncategorised'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'month', 'transaction_type'], name='summary_user_month_type_idx'),
+            models.Index(fields=['wallet', 'category', 'month'], name='summary_wallet_cat_month_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_transaction_type_display()} {self.month.strftime('%B %Y')}: {self.total_amount}"
+
+
+class UserDataVersion(models.Model):
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='data_version')
+    version = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user} v{self.version}"
+
+
+class ResourceVersion(models.Model):
+    """Versi daftar resource API per pengguna (dompet, kategori, ...), dipakai sebagai ETag daftar."""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='resource_versions')
+    resource = models.CharField(max_length=30)
+    version = models.PositiveBigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'resource'], name='resource_version_unique'),
+        ]
+
+    def __str__(self):
+        return f"{self.user} {self.resource} v{self.version}"
+
+
+class BalanceEntry(models.Model):
+    class EntryKind(models.TextChoices):
+        OPENING = 'SALDO_AWAL', 'Saldo Awal'
+        ADJUSTMENT = 'PENYESUAIAN', 'Penyesuaian'
+        TRANSACTION = 'TRANSAKSI', 'Transaksi'
+        TRANSFER = 'TRANSFER', 'Transfer'
+        IMPORT = 'IMPOR', 'Impor'
+
+    wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name='balance_entries')
+    amount = models.DecimalField(max_digits=15, decimal_places=2)
+    kind = models.CharField(max_length=12, choices=EntryKind.choices)
+    recorded_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['wallet', 'id'], name='entry_wallet_id_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} {self.amount} ({self.wallet_id})"
+
+
+class BalanceCheckpoint(models.Model):
+    wallet = models.ForeignKey(Wallet, on_delete=models.CASCADE, related_name='balance_checkpoints')
+    last_entry_id = models.BigIntegerField()
+    balance = models.DecimalField(max_digits=15, decimal_places=2)
+    recorded_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['wallet', '-last_entry_id'], name='checkpoint_wallet_entry_idx'),
+            models.Index(fields=['wallet', '-recorded_at'], name='checkpoint_wallet_time_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.wallet_id} @ {self.last_entry_id}: {self.balance}"
+
+
+class Job(models.Model):
+    class Kind(models.TextChoices):
+        IMPORT = 'IMPOR', 'Impor transaksi'
+        EXPORT = 'EKSPOR', 'Ekspor transaksi'
+        RECOMPUTE = 'HITUNG_ULANG', 'Hitung ulang ringkasan dan saldo'
+
+    class Status(models.TextChoices):
+        QUEUED = 'ANTRE', 'Dalam antrean'
+        RUNNING = 'BERJALAN', 'Berjalan'
+        DONE = 'SELESAI', 'Selesai'
+        FAILED = 'GAGAL', 'Gagal'
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='jobs')
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    status = models.CharField(max_length=10, choices=Status.choices, default=Status.QUEUED)
+    # Berkas masukan dan hasil disimpan di database agar web dan worker cukup berbagi database
+    input_name = models.CharField(max_length=255, blank=True)
+    input_data = models.BinaryField(null=True, blank=True)
+    result_name = models.CharField(max_length=255, blank=True)
+    result_content_type = models.CharField(max_length=100, blank=True)
+    result_data = models.BinaryField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+
+    progress = models.PositiveIntegerField(default=0)
+    total = models.PositiveIntegerField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    worker = models.CharField(max_length=100, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-id'], name='job_user_id_idx'),
+            # Antrean yang diambil worker (urut id) dan job berjalan yang worker-nya berhenti
+            models.Index(fields=['id'], name='job_queued_idx', condition=models.Q(status='ANTRE')),
+            models.Index(fields=['heartbeat_at'], name='job_running_heartbeat_idx',
+                         condition=models.Q(status='BERJALAN')),
+        ]
+
+    def __str__(self):
+        return f"{self.get_kind_display()} #{self.pk} ({self.get_status_display()})"
+
+
+class DeletedRecord(models.Model):
+    """Jejak penghapusan untuk ekspor delta (/api/export/?updated_since=...)."""
+
+    class Kind(models.TextChoices):
+        TRANSACTION = 'transaction', 'Transaksi'
+        TRANSFER = 'transfer', 'Transfer'
+        PURCHASE_ITEM = 'purchase_item', 'Item pembelian'
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='deleted_records')
+    kind = models.CharField(max_length=20, choices=Kind.choices)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'deleted_at'], name='deleted_user_time_idx'),
+        ]
 
     def __str__(self):
-        return f"{self.quantity} of {self.product.name} in transaction {self.transaction.id}"
\ No newline at end of file
+        return f"{self.kind} {self.object_id} dihapus"
@@ -0,0 +1,111 @@
+import base64
+import binascii
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from .models import Transaction
+
+TRANSACTION_PAGE_SIZE = 50
+MAX_TRANSACTION_PAGE_SIZE = 200
+# Urutan yang bisa dipakai keyset: satu kolom terindeks, id sebagai pemutus seri dengan arah yang sama
+TRANSACTION_ORDERINGS = ('-transaction_date', 'transaction_date', '-amount', 'amount')
+TRANSACTION_ORDERING = '-transaction_date'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(transaction, ordering=TRANSACTION_ORDERING):
+    raw = f"{ordering}|{getattr(transaction, ordering.lstrip('-'))}|{transaction.pk}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, ordering=TRANSACTION_ORDERING):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)).decode()
+        cursor_ordering, value, pk = raw.split('|')
+        if cursor_ordering != ordering:
+            raise ValueError(cursor_ordering)
+        return Transaction._meta.get_field(ordering.lstrip('-')).to_python(value), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError, ValidationError) as e:
+        raise InvalidCursor("Cursor tidak valid.") from e
+
+
+class KeysetPage:
+    def __init__(self, items, next_cursor):
+        self.object_list = items
+        self.next_cursor = next_cursor
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def keyset_page(queryset, cursor=None, page_size=TRANSACTION_PAGE_SIZE, ordering=TRANSACTION_ORDERING):
+    """
+    Satu halaman transaksi urut (kolom ordering, id), dimulai tepat setelah cursor. Halaman dalam dibaca lewat
+    rentang indeks, bukan OFFSET, sehingga biayanya sama dengan halaman pertama.
+    """
+    field, descending = ordering.lstrip('-'), ordering.startswith('-')
+    queryset = queryset.order_by(ordering, '-id' if descending else 'id')
+    if cursor:
+        value, pk = decode_cursor(cursor, ordering)
+        after, bound = ('lt', 'lte') if descending else ('gt', 'gte')
+        # Batas lte/gte bisa dipakai indeks; OR-nya hanya memangkas baris dengan nilai yang sama
+        queryset = queryset.filter(Q(**{f'{field}__{after}': value}) | Q(**{field: value, f'pk__{after}': pk}),
+                                   **{f'{field}__{bound}': value})
+    items = list(queryset[:page_size + 1])
+    next_cursor = encode_cursor(items[page_size - 1], ordering) if len(items) > page_size else None
+    return KeysetPage(items[:page_size], next_cursor)
+
+
+class TransactionCursorPagination(BasePagination):
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        try:
+            page_size = min(int(request.query_params.get(self.page_size_query_param, TRANSACTION_PAGE_SIZE)),
+                            MAX_TRANSACTION_PAGE_SIZE)
+        except ValueError:
+            page_size = TRANSACTION_PAGE_SIZE
+        try:
+            self.page = keyset_page(queryset, request.query_params.get(self.cursor_query_param), max(page_size, 1),
+                                    getattr(view, 'ordering', TRANSACTION_ORDERING))
+        except InvalidCursor as e:
+            raise NotFound(str(e))
+        return self.page.object_list
+
+    def get_next_link(self):
+        if not self.page.has_next():
+            return None
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, self.page.next_cursor)
+
+    def get_first_link(self):
+        return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+
+    def get_paginated_response(self, data):
+        return Response({'next': self.get_next_link(), 'first': self.get_first_link(), 'results': data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'first': {'type': 'string', 'format': 'uri'},
+                'results': schema,
+            },
+        }
@@ -0,0 +1,128 @@
+from calendar import monthrange
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from django.db import transaction
+from django.db.models import Q
+
+from . import balances
+from .caching import bump_data_version
+from .models import RecurringRule, Transaction, Wallet
+from .reports import bucket_range, bucket_start
+from .rollups import RollupBatch
+
+MATERIALIZE_BATCH_SIZE = 500
+# Batas kejadian susulan per aturan per run; sisanya dibuat di run berikutnya
+MAX_CATCH_UP = 400
+# Perkiraan hari terpanjang per satuan, untuk menebak indeks kejadian dari selisih tanggal
+MAX_UNIT_DAYS = {RecurringRule.Frequency.DAILY: 1, RecurringRule.Frequency.WEEKLY: 7,
+                 RecurringRule.Frequency.MONTHLY: 31, RecurringRule.Frequency.YEARLY: 366}
+
+
+def add_months(day, months):
+    year, month = divmod(day.month - 1 + months, 12)
+    year, month = day.year + year, month + 1
+    return day.replace(year=year, month=month, day=min(day.day, monthrange(year, month)[1]))
+
+
+def occurrence(rule, index):
+    """
+    Tanggal kejadian ke-index (mulai 0), selalu dihitung dari start_date agar tanggal 31 tetap kembali ke 31
+    sesudah bulan pendek.
+    """
+    steps = index * rule.interval
+    if rule.frequency == RecurringRule.Frequency.DAILY:
+        return rule.start_date + timedelta(days=steps)
+    if rule.frequency == RecurringRule.Frequency.WEEKLY:
+        return rule.start_date + timedelta(weeks=steps)
+    if rule.frequency == RecurringRule.Frequency.MONTHLY:
+        return add_months(rule.start_date, steps)
+    return add_months(rule.start_date, steps * 12)
+
+
+def scheduled(rule, index):
+    # Tanggal kejadian ke-index, atau None bila sudah lewat end_date
+    day = occurrence(rule, index)
+    return None if rule.end_date and day > rule.end_date else day
+
+
+def first_index_from(rule, day):
+    if day <= rule.start_date:
+        return 0
+    index = (day - rule.start_date).days // (MAX_UNIT_DAYS[rule.frequency] * rule.interval)
+    while occurrence(rule, index) < day:
+        index += 1
+    return index
+
+
+def reschedule(rule, since):
+    # Setelah jadwal diubah: lanjut dari kejadian pertama pada/sesudah since tanpa mengulang yang sudah dibuat
+    rule.occurrences = first_index_from(rule, since)
+    rule.next_run = scheduled(rule, rule.occurrences)
+
+
+def _build(rule, day):
+    return Transaction(user_id=rule.user_id, wallet_id=rule.wallet_id, category_id=rule.category_id,
+                       payee_id=rule.payee_id, amount=rule.amount, admin_fee=rule.admin_fee,
+                       transaction_type=rule.transaction_type, transaction_date=day, notes=rule.notes)
+
+
+@transaction.atomic
+def materialize(today=None, batch_size=MATERIALIZE_BATCH_SIZE):
+    """
+    Buat semua kejadian yang jatuh tempo sampai today untuk semua pengguna: satu bulk_create transaksi, satu
+    UPDATE saldo bersih per dompet, satu batch ringkasan bulanan, dan satu bulk_update jadwal aturan, semuanya
+    dalam satu transaksi database. Kejadian dan next_run maju bersama, jadi run kedua di hari yang sama tidak membuat
+    apa-apa; di PostgreSQL aturan yang sedang diproses run lain dilewati (SKIP LOCKED).
+    """
+    today = today or date.today()
+    rules = list(RecurringRule.objects.select_for_update(skip_locked=True).filter(
+        is_active=True, next_run__lte=today).order_by('pk'))
+    created, deltas, rollups = [], defaultdict(Decimal), RollupBatch()
+    for rule in rules:
+        index = rule.occurrences
+        while (day := scheduled(rule, index)) and day <= today and index - rule.occurrences < MAX_CATCH_UP:
+            created.append(tx := _build(rule, day))
+            deltas[tx.wallet_id] += balances.transaction_delta(tx)
+            rollups.add_transaction(tx)
+            index += 1
+        rule.occurrences, rule.next_run = index, scheduled(rule, index)
+
+    Transaction.objects.bulk_create(created, batch_size=batch_size)
+    balances.apply_deltas(deltas.items())
+    rollups.apply()
+    RecurringRule.objects.bulk_update(rules, ['occurrences', 'next_run'], batch_size=batch_size)
+    owners = set(Wallet.objects.filter(pk__in=deltas).values_list('user_id', flat=True))
+    users = owners | {rule.user_id for rule in rules}
+    if users:
+        bump_data_version(*users)
+    return len(rules), len(created)
+
+
+def projection(user, date_from, date_to, granularity='month'):
+    """
+    Proyeksi arus kas dari aturan aktif milik pengguna: kejadian yang belum dibuat di [date_from, date_to]
+    dijumlahkan per periode, ditambah saldo aset yang diproyeksikan dari total saldo dompet ASET saat ini.
+    """
+    buckets, end = bucket_range(date_from, date_to, granularity)
+    position = {bucket: index for index, bucket in enumerate(buckets)}
+    income, expense, fees = ([Decimal(0)] * len(buckets) for _ in range(3))
+    rules = RecurringRule.objects.filter(user=user, is_active=True, next_run__lte=end).filter(
+        Q(end_date__isnull=True) | Q(end_date__gte=buckets[0]))
+    for rule in rules:
+        index = max(rule.occurrences, first_index_from(rule, buckets[0]))
+        while (day := scheduled(rule, index)) and day <= end:
+            bucket = position[bucket_start(day, granularity)]
+            if rule.transaction_type == Transaction.TransactionType.INCOME:
+                income[bucket] += rule.amount
+            else:
+                expense[bucket] += rule.amount
+                fees[bucket] += rule.admin_fee
+            index += 1
+    net = [i - e - f for i, e, f in zip(income, expense, fees)]
+    assets = Wallet.objects.filter(user=user, wallet_type=Wallet.WalletType.ASSET).values_list('balance', flat=True)
+    projected = list(accumulate(net, initial=sum(assets, Decimal(0))))[1:]
+    return {'granularity': granularity, 'date_from': buckets[0], 'date_to': end, 'buckets': buckets,
+            'income': income, 'expense': expense, 'fees': fees, 'net': net, 'balance': projected}
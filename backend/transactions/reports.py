@@ -0,0 +1,257 @@
+from collections import defaultdict
+from datetime import timedelta
+from decimal import Decimal
+from itertools import accumulate
+
+from asgiref.sync import async_to_sync
+from django.db.models import DateField, DecimalField, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Trunc, TruncMonth
+
+from . import concurrency
+from .access import accessible_wallet_ids
+from .balances import balance_delta
+from .models import Category, Debt, MonthlySummary, Transaction, Transfer, Wallet
+
+DEBT_PAYMENT_CATEGORY = 'Pembayaran Utang'
+GRANULARITIES = ('day', 'week', 'month', 'year')
+CASHFLOW_SPLITS = ('wallet', 'category')
+# Satu dekade harian, dengan sedikit kelonggaran
+MAX_REPORT_BUCKETS = 4000
+
+
+def with_budget_spent(budgets, user):
+    # Realisasi semua anggaran dihitung dalam satu query lewat subquery ke ringkasan bulanan
+    spent = (MonthlySummary.objects.filter(wallet_id__in=accessible_wallet_ids(user), category=OuterRef('category'),
+                                           transaction_type=Transaction.TransactionType.EXPENSE,
+                                           month=OuterRef('month_start'))
+             .order_by().values('category').annotate(total=Sum('total_amount')).values('total'))
+    money = DecimalField(max_digits=17, decimal_places=2)
+    return budgets.annotate(month_start=TruncMonth('month')).annotate(
+        spent=Coalesce(Subquery(spent, output_field=money), Value(Decimal(0)), output_field=money))
+
+
+def set_budget_progress(budget):
+    budget.remaining = budget.amount - budget.spent
+    budget.percentage = int((budget.spent / budget.amount) * 100) if budget.amount > 0 else 0
+    return budget
+
+
+def bucket_start(day, granularity):
+    if granularity == 'week':
+        return day - timedelta(days=day.weekday())
+    if granularity == 'month':
+        return day.replace(day=1)
+    if granularity == 'year':
+        return day.replace(month=1, day=1)
+    return day
+
+
+def next_bucket(start, granularity):
+    if granularity == 'week':
+        return start + timedelta(days=7)
+    if granularity == 'month':
+        return (start + timedelta(days=32)).replace(day=1)
+    if granularity == 'year':
+        return start.replace(year=start.year + 1)
+    return start + timedelta(days=1)
+
+
+def bucket_count(date_from, date_to, granularity):
+    start, end = bucket_start(date_from, granularity), bucket_start(date_to, granularity)
+    if granularity == 'day':
+        return (end - start).days + 1
+    if granularity == 'week':
+        return (end - start).days // 7 + 1
+    if granularity == 'month':
+        return (end.year - start.year) * 12 + end.month - start.month + 1
+    return end.year - start.year + 1
+
+
+def bucket_range(date_from, date_to, granularity):
+    # Periode utuh yang beririsan dengan [date_from, date_to], beserta hari terakhir periode terakhir
+    buckets = [bucket_start(date_from, granularity)]
+    while (following := next_bucket(buckets[-1], granularity)) <= date_to:
+        buckets.append(following)
+    return buckets, next_bucket(buckets[-1], granularity) - timedelta(days=1)
+
+
+def _truncated(queryset, field, granularity):
+    if granularity == 'day':
+        return queryset.annotate(bucket=F(field))
+    return queryset.annotate(bucket=Trunc(field, granularity, output_field=DateField()))
+
+
+def _cashflow_rows(user, start, end, granularity, split, filters):
+    """
+    Satu GROUP BY di database per (periode, kelompok, jenis). Periode bulanan/tahunan dibaca dari ringkasan
+    bulanan; harian/mingguan dari transaksi lewat indeks (wallet, tanggal).
+    """
+    wallet_ids = accessible_wallet_ids(user)
+    if granularity in ('month', 'year'):
+        rows = MonthlySummary.objects.filter(wallet_id__in=wallet_ids, month__range=(start, end), **filters)
+        period, amount, fee = 'month', 'total_amount', 'total_admin_fee'
+    else:
+        rows = Transaction.objects.filter(wallet_id__in=wallet_ids, transaction_date__range=(start, end), **filters)
+        period, amount, fee = 'transaction_date', 'amount', 'admin_fee'
+    if granularity != ('month' if period == 'month' else 'day'):
+        rows = rows.annotate(bucket=Trunc(period, granularity, output_field=DateField()))
+        period = 'bucket'
+    group = [period, 'transaction_type'] + ([f'{split}_id'] if split else [])
+    return period, rows.values(*group).annotate(total=Sum(amount), fees=Sum(fee)).order_by()
+
+
+def _series_names(split, keys):
+    if split == 'wallet':
+        names = dict(Wallet.objects.filter(pk__in=keys).values_list('pk', 'name'))
+    elif split == 'category':
+        names = dict(Category.objects.filter(pk__in=[key for key in keys if key]).values_list('pk', 'name'))
+        names[None] = "Tanpa kategori"
+    else:
+        names = {None: "Total"}
+    return names
+
+
+def cashflow(user, date_from, date_to, granularity='month', split=None, wallet=None, category=None):
+    """
+    Pemasukan, pengeluaran, biaya admin (pengeluaran), dan arus bersih per periode utuh yang beririsan dengan
+    [date_from, date_to], untuk semua dompet yang bisa diakses pengguna atau dipisah per dompet/kategori.
+    Periode tanpa transaksi bernilai 0. Hasil berbentuk kolom: satu daftar periode dan satu larik per ukuran di tiap
+    seri, sehingga pengolahan di Python sebanding dengan jumlah baris hasil GROUP BY, bukan jumlah transaksi.
+    """
+    buckets, end = bucket_range(date_from, date_to, granularity)
+    start = buckets[0]
+
+    filters = {key: value for key, value in (('wallet_id', wallet), ('category_id', category)) if value is not None}
+    period, rows = _cashflow_rows(user, start, end, granularity, split, filters)
+
+    position = {bucket: index for index, bucket in enumerate(buckets)}
+    zero = [Decimal(0)] * len(buckets)
+    columns = {}
+    for row in rows:
+        key = row[f'{split}_id'] if split else None
+        income, expense, fees = columns.setdefault(key, (zero[:], zero[:], zero[:]))
+        index = position[row[period]]
+        if row['transaction_type'] == Transaction.TransactionType.INCOME:
+            income[index] += row['total']
+        else:
+            expense[index] += row['total']
+            fees[index] += row['fees']
+
+    names = _series_names(split, list(columns))
+    series = []
+    for key, (income, expense, fees) in sorted(columns.items(), key=lambda item: str(names.get(item[0], ''))):
+        net = [i - e - f for i, e, f in zip(income, expense, fees)]
+        series.append({'key': key, 'name': names.get(key, ''), 'income': income, 'expense': expense, 'fees': fees,
+                       'net': net})
+    totals = {measure: sum((sum(item[measure]) for item in series), Decimal(0))
+              for measure in ('income', 'expense', 'fees', 'net')}
+    return {'granularity': granularity, 'split': split, 'date_from': start, 'date_to': end, 'buckets': buckets,
+            'series': series, 'totals': totals}
+
+
+class _BucketDeltas:
+    """Perubahan saldo per kunci per periode, ditambah total perubahan sesudah periode terakhir (ekor)."""
+
+    def __init__(self, buckets):
+        self.position = {bucket: index for index, bucket in enumerate(buckets)}
+        self.size = len(buckets)
+        self.deltas = defaultdict(lambda: [Decimal(0)] * self.size)
+        self.tail = defaultdict(Decimal)
+
+    def add(self, key, bucket, amount):
+        index = self.position.get(bucket)
+        if index is None:
+            self.tail[key] += amount
+        else:
+            self.deltas[key][index] += amount
+
+    def balances(self, key, current):
+        """
+        Saldo di akhir tiap periode = saldo sekarang - semua perubahan bertanggal sesudahnya, dihitung sebagai
+        jumlah kumulatif dari belakang atas larik perubahan.
+        """
+        deltas = self.deltas.get(key) or [Decimal(0)] * self.size
+        after = list(accumulate(reversed(deltas), initial=self.tail.get(key, Decimal(0))))
+        return [current - after[self.size - 1 - index] for index in range(self.size)]
+
+
+async def anet_worth(user, date_from, date_to, granularity='month'):
+    """
+    Riwayat kekayaan bersih per akhir periode, direkonstruksi mundur dari saldo dompet dan utang saat ini.
+    Perubahan saldo (transaksi termasuk biaya admin, transfer masuk/keluar, pembayaran utang) dijumlahkan di database
+    per dompet per periode, lalu tiap dompet diubah menjadi deret saldo lewat jumlah kumulatif. Seperti dashboard,
+    aset = dompet ASET milik pengguna dan kewajiban = sisa utang; deret per dompet mencakup semua dompet miliknya.
+    Keenam query agregat saling independen (dompet dirujuk lewat subquery), jadi dijalankan bersamaan.
+    """
+    buckets, end = bucket_range(date_from, date_to, granularity)
+    start = buckets[0]
+    owned = Wallet.objects.filter(user=user)
+    wallet_ids = owned.values('pk')
+
+    # Hanya perubahan sesudah awal periode pertama yang memengaruhi deret
+    transactions = _truncated(Transaction.objects.filter(wallet_id__in=wallet_ids, transaction_date__gte=start),
+                              'transaction_date', granularity)
+    transfers = _truncated(Transfer.objects.filter(transfer_date__gte=start), 'transfer_date', granularity)
+    wallets, transaction_rows, outgoing, incoming, debts, payments = await concurrency.gather(
+        lambda: list(owned.order_by('name', 'pk').values('pk', 'name', 'wallet_type', 'balance')),
+        lambda: list(transactions.values('wallet_id', 'bucket', 'transaction_type').annotate(
+            amount=Sum('amount'), fee=Sum('admin_fee')).order_by()),
+        lambda: list(transfers.filter(from_wallet_id__in=wallet_ids).values('from_wallet_id', 'bucket').annotate(
+            amount=Sum('amount'), fee=Sum('admin_fee')).order_by()),
+        lambda: list(transfers.filter(to_wallet_id__in=wallet_ids).values('to_wallet_id', 'bucket').annotate(
+            amount=Sum('amount')).order_by()),
+        lambda: list(Debt.objects.filter(user=user).values('lender_name', 'current_balance', 'initial_amount')),
+        lambda: list(_debt_payment_rows(user, start, granularity)),
+    )
+
+    changes = _BucketDeltas(buckets)
+    for row in transaction_rows:
+        changes.add(row['wallet_id'], row['bucket'], balance_delta(row['transaction_type'], row['amount'], row['fee']))
+    for row in outgoing:
+        changes.add(row['from_wallet_id'], row['bucket'], -(row['amount'] + row['fee']))
+    for row in incoming:
+        changes.add(row['to_wallet_id'], row['bucket'], row['amount'])
+
+    series, assets = [], [Decimal(0)] * len(buckets)
+    for wallet in wallets:
+        values = changes.balances(wallet['pk'], wallet['balance'])
+        series.append({'id': wallet['pk'], 'name': wallet['name'], 'wallet_type': wallet['wallet_type'],
+                       'balance': values})
+        if wallet['wallet_type'] == Wallet.WalletType.ASSET:
+            assets = [total + value for total, value in zip(assets, values)]
+
+    liabilities = _debt_balances(debts, payments, buckets)
+    return {'granularity': granularity, 'date_from': start, 'date_to': end, 'buckets': buckets, 'assets': assets,
+            'liabilities': liabilities, 'net_worth': [a - b for a, b in zip(assets, liabilities)], 'wallets': series}
+
+
+def net_worth(user, date_from, date_to, granularity='month'):
+    return async_to_sync(anet_worth)(user, date_from, date_to, granularity)
+
+
+def _debt_payment_rows(user, start, granularity):
+    # Pembayaran lewat pay_debt tercatat sebagai pengeluaran kategori "Pembayaran Utang" ke penerima = pemberi utang
+    rows = _truncated(Transaction.objects.filter(
+        user=user, category__name=DEBT_PAYMENT_CATEGORY,
+        payee__name__in=Debt.objects.filter(user=user).values('lender_name'),
+        transaction_type=Transaction.TransactionType.EXPENSE, transaction_date__gte=start),
+        'transaction_date', granularity)
+    return rows.values('payee__name', 'bucket').annotate(amount=Sum('amount')).order_by()
+
+
+def _debt_balances(debts, payment_rows, buckets):
+    lenders = {}
+    for debt in debts:
+        current, initial = lenders.get(debt['lender_name'], (Decimal(0), Decimal(0)))
+        lenders[debt['lender_name']] = (current + debt['current_balance'], initial + debt['initial_amount'])
+    payments = _BucketDeltas(buckets)
+    for row in payment_rows:
+        # Sisa utang di masa lalu = sisa sekarang + pembayaran sesudahnya
+        payments.add(row['payee__name'], row['bucket'], -row['amount'])
+
+    total = [Decimal(0)] * len(buckets)
+    for lender, (current, initial) in lenders.items():
+        # Tanggal utang dicatat tidak disimpan, jadi sisa utang dibatasi jumlah awalnya
+        values = payments.balances(lender, current)
+        total = [sum_ + min(value, initial) for sum_, value in zip(total, values)]
+    return total
@@ -0,0 +1,200 @@
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce, Greatest, TruncMonth
+
+from .models import MonthlySummary, Payee, Transaction
+
+SUMMARY_FIELDS = ('total_amount', 'total_admin_fee', 'transaction_count')
+KEY_FIELDS = ('user_id', 'wallet_id', 'category_id', 'month', 'transaction_type')
+APPLY_BATCH_SIZE = 500
+
+
+def as_date(day):
+    return Transaction._meta.get_field('transaction_date').to_python(day)
+
+
+def month_start(day):
+    return as_date(day).replace(day=1)
+
+
+class RollupBatch:
+    """
+    Kumpulan delta MonthlySummary dan penghitung pemakaian Payee yang diterapkan sekaligus. Panggil apply() di
+    dalam transaksi DB yang sama dengan perubahan Transaction-nya.
+    """
+
+    def __init__(self):
+        self.deltas = defaultdict(lambda: [Decimal(0), Decimal(0), 0])
+        # Per penerima: [selisih jumlah transaksi, tanggal transaksi terbaru yang ditambahkan]
+        self.payees = defaultdict(lambda: [0, None])
+
+    def add(self, user_id, wallet_id, category_id, transaction_date, transaction_type, amount, admin_fee, sign=1):
+        key = (user_id, wallet_id, category_id, month_start(transaction_date), transaction_type)
+        delta = self.deltas[key]
+        delta[0] += sign * Decimal(amount)
+        delta[1] += sign * Decimal(admin_fee or 0)
+        delta[2] += sign
+
+    def add_transaction(self, tx, sign=1):
+        self.add(tx.user_id, tx.wallet_id, tx.category_id, tx.transaction_date, tx.transaction_type, tx.amount,
+                 tx.admin_fee, sign)
+        if tx.payee_id:
+            self.add_payee(tx.payee_id, tx.transaction_date, sign)
+
+    def add_payee(self, payee_id, transaction_date, sign=1):
+        # last_used tidak dimundurkan saat transaksi dihapus; cukup untuk mengurutkan saran
+        usage = self.payees[payee_id]
+        usage[0] += sign
+        if sign > 0:
+            day = as_date(transaction_date)
+            usage[1] = max(usage[1] or day, day)
+
+    def apply(self):
+        self._apply_payees()
+        self._apply_summaries()
+
+    def _apply_payees(self):
+        rows = []
+        # Urut pk seperti dompet di balances.apply_deltas, agar batch yang menyentuh penerima sama tidak deadlock
+        for pk, (count, last_used) in sorted(self.payees.items()):
+            if not count and last_used is None:
+                continue
+            row = Payee(pk=pk)
+            row.transaction_count = F('transaction_count') + count
+            row.last_used = F('last_used')
+            if last_used:
+                row.last_used = Greatest(Coalesce('last_used', Value(last_used)), Value(last_used))
+            rows.append(row)
+        self.payees.clear()
+        Payee.objects.bulk_update(rows, ['transaction_count', 'last_used'], batch_size=APPLY_BATCH_SIZE)
+
+    def _apply_summaries(self):
+        """
+        Baris yang sudah ada dinaikkan dengan satu bulk_update berbasis F() (aman dipakai bersamaan), baris baru
+        dibuat dengan satu bulk_create; jika request lain lebih dulu membuat salah satunya, kembali ke jalur per kunci.
+        """
+        deltas = {key: delta for key, delta in self.deltas.items() if any(delta)}
+        self.deltas.clear()
+        if len(deltas) <= 1:
+            # Satu transaksi: UPDATE langsung lebih murah daripada SELECT lalu UPDATE
+            for key, delta in deltas.items():
+                _apply_delta(key, *delta)
+            return
+        existing = {}
+        rows = MonthlySummary.objects.filter(user_id__in={key[0] for key in deltas},
+                                             wallet_id__in={key[1] for key in deltas},
+                                             month__in={key[3] for key in deltas})
+        for pk, *key in rows.values_list('pk', *KEY_FIELDS):
+            if tuple(key) in deltas:
+                existing[tuple(key)] = MonthlySummary(pk=pk)
+
+        for key, row in existing.items():
+            amount, admin_fee, count = deltas[key]
+            row.total_amount = F('total_amount') + amount
+            row.total_admin_fee = F('total_admin_fee') + admin_fee
+            row.transaction_count = F('transaction_count') + count
+        MonthlySummary.objects.bulk_update(existing.values(), SUMMARY_FIELDS, batch_size=APPLY_BATCH_SIZE)
+
+        missing = [key for key in deltas if key not in existing]
+        if not missing:
+            return
+        try:
+            with transaction.atomic():
+                MonthlySummary.objects.bulk_create(
+                    [MonthlySummary(**dict(zip(KEY_FIELDS, key)), total_amount=deltas[key][0],
+                                    total_admin_fee=deltas[key][1], transaction_count=deltas[key][2])
+                     for key in missing], batch_size=APPLY_BATCH_SIZE)
+        except IntegrityError:
+            for key in missing:
+                _apply_delta(key, *deltas[key])
+
+
+def _apply_delta(key, amount, admin_fee, count):
+    user_id, wallet_id, category_id, month, transaction_type = key
+    rows = MonthlySummary.objects.filter(user_id=user_id, wallet_id=wallet_id, category_id=category_id, month=month,
+                                         transaction_type=transaction_type)
+    changes = {'total_amount': F('total_amount') + amount, 'total_admin_fee': F('total_admin_fee') + admin_fee,
+               'transaction_count': F('transaction_count') + count}
+    if rows.update(**changes):
+        return
+    try:
+        with transaction.atomic():
+            MonthlySummary.objects.create(user_id=user_id, wallet_id=wallet_id, category_id=category_id, month=month,
+                                          transaction_type=transaction_type, total_amount=amount,
+                                          total_admin_fee=admin_fee, transaction_count=count)
+    except IntegrityError:
+        # Baris yang sama baru saja dibuat oleh request lain
+        rows.update(**changes)
+
+
+def record_transaction(tx, sign=1):
+    batch = RollupBatch()
+    batch.add_transaction(tx, sign)
+    batch.apply()
+
+
+def fold_category(category):
+    # Transaksi kategori yang dihapus menjadi tanpa kategori (SET_NULL), begitu juga ringkasannya
+    batch = RollupBatch()
+    rows = MonthlySummary.objects.filter(category=category)
+    for row in rows:
+        key = (row.user_id, row.wallet_id, None, row.month, row.transaction_type)
+        delta = batch.deltas[key]
+        delta[0] += row.total_amount
+        delta[1] += row.total_admin_fee
+        delta[2] += row.transaction_count
+    rows.delete()
+    batch.apply()
+
+
+def _expected_rows(transactions):
+    return (transactions.annotate(month=TruncMonth('transaction_date'))
+            .values('user_id', 'wallet_id', 'category_id', 'month', 'transaction_type')
+            .annotate(total_amount=Sum('amount'), total_admin_fee=Sum('admin_fee'), transaction_count=Count('id'))
+            .order_by())
+
+
+def rebuild_payee_usage(users=None):
+    payees = Payee.objects.all() if users is None else Payee.objects.filter(user__in=users)
+    usage = Transaction.objects.filter(payee=OuterRef('pk')).order_by().values('payee')
+    return payees.update(transaction_count=Coalesce(Subquery(usage.annotate(count=Count('pk')).values('count')), 0),
+                         last_used=Subquery(usage.annotate(last=Max('transaction_date')).values('last')))
+
+
+def rebuild(users=None):
+    transactions = Transaction.objects.all()
+    summaries = MonthlySummary.objects.all()
+    if users is not None:
+        transactions = transactions.filter(user__in=users)
+        summaries = summaries.filter(user__in=users)
+    summaries.delete()
+    rebuild_payee_usage(users)
+    created = MonthlySummary.objects.bulk_create(
+        [MonthlySummary(**row) for row in _expected_rows(transactions).iterator()], batch_size=1000)
+    return len(created)
+
+
+def verify(users=None):
+    transactions = Transaction.objects.all()
+    summaries = MonthlySummary.objects.all()
+    if users is not None:
+        transactions = transactions.filter(user__in=users)
+        summaries = summaries.filter(user__in=users)
+
+    zero = (Decimal(0), Decimal(0), 0)
+    expected = {tuple(row[f] for f in KEY_FIELDS): tuple(row[f] for f in SUMMARY_FIELDS)
+                for row in _expected_rows(transactions).iterator()}
+    actual = defaultdict(lambda: zero)
+    for row in summaries.values(*KEY_FIELDS, *SUMMARY_FIELDS).iterator():
+        key = tuple(row[f] for f in KEY_FIELDS)
+        actual[key] = tuple(a + row[f] for a, f in zip(actual[key], SUMMARY_FIELDS))
+
+    mismatches = []
+    for key in expected.keys() | actual.keys():
+        want, have = expected.get(key, zero), actual.get(key, zero)
+        if want != have:
+            mismatches.append((key, want, have))
+    return sorted(mismatches, key=lambda item: tuple(str(part) for part in item[0]))
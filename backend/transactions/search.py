@@ -0,0 +1,199 @@
+import re
+
+from django.db import connection as default_connection
+from django.db.models import Q
+
+from .models import Category, Payee, Product, PurchaseItem, Transaction
+
+SEARCH_TABLE = 'transactions_search'
+SEARCH_LIMIT = 50
+MAX_SEARCH_TERMS = 8
+
+TX = Transaction._meta.db_table
+PAYEE = Payee._meta.db_table
+CATEGORY = Category._meta.db_table
+PRODUCT = Product._meta.db_table
+ITEM = PurchaseItem._meta.db_table
+
+
+def search_terms(query):
+    return re.findall(r'\w+', (query or '').lower())[:MAX_SEARCH_TERMS]
+
+
+# Dokumen pencarian satu transaksi: catatan, nama penerima, kategori, dan produk yang dibeli
+def _document_parts(product_names):
+    products = (f'SELECT {product_names} FROM {ITEM} i JOIN {PRODUCT} p ON p.id = i.product_id '
+                f'WHERE i.transaction_id = t.id')
+    return ['t.notes', f'(SELECT name FROM {PAYEE} WHERE id = t.payee_id)',
+            f'(SELECT name FROM {CATEGORY} WHERE id = t.category_id)', f'({products})']
+
+
+SQLITE_DOCUMENT = " || ' ' || ".join("coalesce(%s, '')" % part for part in _document_parts("group_concat(p.name, ' ')"))
+POSTGRES_DOCUMENT = "to_tsvector('simple', concat_ws(' ', %s))" % ', '.join(_document_parts("string_agg(p.name, ' ')"))
+
+
+def _sqlite_refresh(ids, deleted=None):
+    """
+    Isi trigger SQLite yang menulis ulang dokumen transaksi ids (potongan SQL: daftar ekspresi atau SELECT).
+    deleted: ekspresi rowid yang dihapus satu per satu; DELETE ... rowid = x memakai indeks FTS5, sedangkan
+    rowid IN (SELECT ...) tidak, jadi bentuk IN hanya dipakai untuk penggantian nama yang jarang.
+    """
+    if deleted is None:
+        deletes = [f"DELETE FROM {SEARCH_TABLE} WHERE rowid IN ({ids});"]
+    else:
+        deletes = [f"DELETE FROM {SEARCH_TABLE} WHERE rowid = {rowid};" for rowid in deleted]
+    insert = (f"INSERT INTO {SEARCH_TABLE}(rowid, owner, body) SELECT t.id, 'u' || t.user_id, {SQLITE_DOCUMENT} "
+              f"FROM {TX} t WHERE t.id IN ({ids});") if ids else ''
+    return ' '.join(deletes) + ' ' + insert
+
+
+SQLITE_TRIGGERS = {
+    'tx_insert': (f'AFTER INSERT ON {TX}', _sqlite_refresh('NEW.id', deleted=())),
+    'tx_update': (f'AFTER UPDATE OF notes, payee_id, category_id, user_id ON {TX}',
+                  _sqlite_refresh('NEW.id', deleted=('OLD.id', 'NEW.id'))),
+    'tx_delete': (f'AFTER DELETE ON {TX}', _sqlite_refresh('', deleted=('OLD.id',))),
+    'payee_update': (f'AFTER UPDATE OF name ON {PAYEE}',
+                     _sqlite_refresh(f'SELECT id FROM {TX} WHERE payee_id = NEW.id')),
+    'category_update': (f'AFTER UPDATE OF name ON {CATEGORY}',
+                        _sqlite_refresh(f'SELECT id FROM {TX} WHERE category_id = NEW.id')),
+    'product_update': (f'AFTER UPDATE OF name ON {PRODUCT}',
+                       _sqlite_refresh(f'SELECT transaction_id FROM {ITEM} WHERE product_id = NEW.id')),
+    'item_insert': (f'AFTER INSERT ON {ITEM}', _sqlite_refresh('NEW.transaction_id', deleted=('NEW.transaction_id',))),
+    'item_update': (f'AFTER UPDATE OF product_id, transaction_id ON {ITEM}',
+                    _sqlite_refresh('OLD.transaction_id, NEW.transaction_id',
+                                    deleted=('OLD.transaction_id', 'NEW.transaction_id'))),
+    'item_delete': (f'AFTER DELETE ON {ITEM}',
+                    _sqlite_refresh('OLD.transaction_id', deleted=('OLD.transaction_id',))),
+}
+
+POSTGRES_SYNC_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION {SEARCH_TABLE}_refresh(ids bigint[]) RETURNS void AS $$
+BEGIN
+    DELETE FROM {SEARCH_TABLE} WHERE transaction_id = ANY(ids);
+    INSERT INTO {SEARCH_TABLE} (transaction_id, user_id, document)
+    SELECT t.id, t.user_id, {POSTGRES_DOCUMENT} FROM {TX} t WHERE t.id = ANY(ids);
+END
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION {SEARCH_TABLE}_sync() RETURNS trigger AS $$
+DECLARE
+    ids bigint[] := ARRAY[]::bigint[];
+BEGIN
+    IF TG_TABLE_NAME = '{TX}' THEN
+        IF TG_OP <> 'INSERT' THEN ids := ids || OLD.id::bigint; END IF;
+        IF TG_OP <> 'DELETE' THEN ids := ids || NEW.id::bigint; END IF;
+    ELSIF TG_TABLE_NAME = '{ITEM}' THEN
+        IF TG_OP <> 'INSERT' THEN ids := ids || OLD.transaction_id::bigint; END IF;
+        IF TG_OP <> 'DELETE' THEN ids := ids || NEW.transaction_id::bigint; END IF;
+    ELSIF TG_TABLE_NAME = '{PAYEE}' THEN
+        ids := ARRAY(SELECT id FROM {TX} WHERE payee_id = NEW.id);
+    ELSIF TG_TABLE_NAME = '{CATEGORY}' THEN
+        ids := ARRAY(SELECT id FROM {TX} WHERE category_id = NEW.id);
+    ELSIF TG_TABLE_NAME = '{PRODUCT}' THEN
+        ids := ARRAY(SELECT transaction_id FROM {ITEM} WHERE product_id = NEW.id);
+    END IF;
+    PERFORM {SEARCH_TABLE}_refresh(ids);
+    RETURN NULL;
+END
+$$ LANGUAGE plpgsql;
+"""
+
+POSTGRES_TRIGGERS = {
+    'tx': (TX, 'INSERT OR DELETE OR UPDATE OF notes, payee_id, category_id, user_id'),
+    'payee': (PAYEE, 'UPDATE OF name'),
+    'category': (CATEGORY, 'UPDATE OF name'),
+    'product': (PRODUCT, 'UPDATE OF name'),
+    'item': (ITEM, 'INSERT OR DELETE OR UPDATE OF product_id, transaction_id'),
+}
+
+
+def install(connection=default_connection):
+    """
+    Buat indeks pencarian (FTS5 di SQLite, tsvector + GIN di Postgres) beserta trigger yang menjaganya tetap
+    sinkron untuk setiap penulisan, termasuk bulk_create/update dan penggantian nama penerima/kategori/produk.
+    Aman dipanggil ulang.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f"CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5("
+                           f"owner, body, tokenize = 'unicode61 remove_diacritics 2')")
+            for name, (event, body) in SQLITE_TRIGGERS.items():
+                cursor.execute(f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_{name}")
+                cursor.execute(f"CREATE TRIGGER {SEARCH_TABLE}_{name} {event} BEGIN {body} END")
+        elif connection.vendor == 'postgresql':
+            cursor.execute(f"CREATE TABLE IF NOT EXISTS {SEARCH_TABLE} (transaction_id bigint PRIMARY KEY, "
+                           f"user_id integer NOT NULL, document tsvector NOT NULL)")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_document_idx ON {SEARCH_TABLE} "
+                           f"USING gin (document)")
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {SEARCH_TABLE}_user_idx ON {SEARCH_TABLE} (user_id)")
+            cursor.execute(POSTGRES_SYNC_FUNCTION)
+            for name, (table, events) in POSTGRES_TRIGGERS.items():
+                cursor.execute(f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_{name} ON {table}")
+                cursor.execute(f"CREATE TRIGGER {SEARCH_TABLE}_{name} AFTER {events} ON {table} "
+                               f"FOR EACH ROW EXECUTE FUNCTION {SEARCH_TABLE}_sync()")
+
+
+def uninstall(connection=default_connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            for name in SQLITE_TRIGGERS:
+                cursor.execute(f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_{name}")
+        elif connection.vendor == 'postgresql':
+            for name, (table, _) in POSTGRES_TRIGGERS.items():
+                cursor.execute(f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_{name} ON {table}")
+            cursor.execute(f"DROP FUNCTION IF EXISTS {SEARCH_TABLE}_sync()")
+            cursor.execute(f"DROP FUNCTION IF EXISTS {SEARCH_TABLE}_refresh(bigint[])")
+        if connection.vendor in ('sqlite', 'postgresql'):
+            cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+def rebuild(connection=default_connection):
+    # Tulis ulang semua dokumen, mis. setelah migrasi yang membuat ulang tabel transaksi di SQLite
+    install(connection)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+            cursor.execute(f"INSERT INTO {SEARCH_TABLE}(rowid, owner, body) "
+                           f"SELECT t.id, 'u' || t.user_id, {SQLITE_DOCUMENT} FROM {TX} t")
+        elif connection.vendor == 'postgresql':
+            cursor.execute(f"TRUNCATE {SEARCH_TABLE}")
+            cursor.execute(f"INSERT INTO {SEARCH_TABLE} (transaction_id, user_id, document) "
+                           f"SELECT t.id, t.user_id, {POSTGRES_DOCUMENT} FROM {TX} t")
+        else:
+            return None
+        cursor.execute(f"SELECT count(*) FROM {SEARCH_TABLE}")
+        return cursor.fetchone()[0]
+
+
+def _ranked_ids(user_id, terms, limit, connection):
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            # Kolom owner ikut di-MATCH agar FTS5 memotong daftar dokumen per pengguna di dalam indeks
+            match = 'owner : "u%d" AND body : (%s)' % (user_id, ' '.join(f'"{term}"*' for term in terms))
+            cursor.execute(f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s "
+                           f"ORDER BY rank, rowid DESC LIMIT %s", [match, limit])
+        else:
+            tsquery = ' & '.join(f'{term}:*' for term in terms)
+            cursor.execute(f"SELECT transaction_id FROM {SEARCH_TABLE} "
+                           f"WHERE user_id = %s AND document @@ to_tsquery('simple', %s) "
+                           f"ORDER BY ts_rank(document, to_tsquery('simple', %s)) DESC, transaction_id DESC LIMIT %s",
+                           [user_id, tsquery, tsquery, limit])
+        return [row[0] for row in cursor.fetchall()]
+
+
+def search_transactions(user, query, limit=SEARCH_LIMIT, connection=default_connection):
+    """Transaksi milik pengguna yang cocok dengan semua kata di query (awalan kata), urut relevansi."""
+    terms = search_terms(query)
+    if not terms:
+        return []
+    transactions = Transaction.objects.filter(user=user).select_related('wallet', 'category', 'payee')
+    if connection.vendor not in ('sqlite', 'postgresql'):
+        # Tanpa mesin full-text: cocokkan tiap kata dengan LIKE, urut tanggal
+        for term in terms:
+            transactions = transactions.filter(Q(notes__icontains=term) | Q(payee__name__icontains=term) |
+                                               Q(category__name__icontains=term) |
+                                               Q(items__product__name__icontains=term))
+        return list(transactions.distinct().order_by('-transaction_date', '-id')[:limit])
+    ids = _ranked_ids(user.pk, terms, limit, connection)
+    found = transactions.in_bulk(ids)
+    return [found[pk] for pk in ids if pk in found]
@@ -1,6 +1,13 @@
+from datetime import date, timedelta
+
 from django.contrib.auth.models import User
 from rest_framework import serializers
-from .models import Category, Wallet, Payee, Transaction, Budget, FinancialGoal, Debt, Transfer
+from rest_framework.reverse import reverse
+from .access import accessible_wallet_ids
+from .models import Category, Wallet, Payee, Transaction, Budget, FinancialGoal, Debt, Transfer, RecurringRule, Job
+from .pagination import TRANSACTION_ORDERING, TRANSACTION_ORDERINGS
+from .reports import CASHFLOW_SPLITS, GRANULARITIES, MAX_REPORT_BUCKETS, bucket_count
+from .suggestions import MAX_SUGGEST_LIMIT, SUGGEST_LIMIT
 
 class UserSerializer(serializers.ModelSerializer):
     class Meta:
@@ -17,11 +24,21 @@ class WalletSerializer(serializers.ModelSerializer):
         model = Wallet
         fields = ['id', 'name', 'wallet_type', 'balance']
 
+class WalletBalanceSerializer(serializers.Serializer):
+    wallet = serializers.IntegerField()
+    date = serializers.DateField(allow_null=True)
+    balance = serializers.DecimalField(max_digits=15, decimal_places=2)
+    current_balance = serializers.DecimalField(max_digits=15, decimal_places=2)
+
 class PayeeSerializer(serializers.ModelSerializer):
     class Meta:
         model = Payee
         fields = ['id', 'name']
 
+class PayeeSuggestQuerySerializer(serializers.Serializer):
+    q = serializers.CharField(required=False, allow_blank=True, trim_whitespace=False, default='')
+    limit = serializers.IntegerField(required=False, min_value=1, max_value=MAX_SUGGEST_LIMIT, default=SUGGEST_LIMIT)
+
 class TransactionSerializer(serializers.ModelSerializer):
     wallet = serializers.StringRelatedField(read_only=True)
     category = serializers.StringRelatedField(read_only=True)
@@ -31,11 +48,84 @@ class TransactionSerializer(serializers.ModelSerializer):
         model = Transaction
         fields = '__all__'
 
+class TransactionBulkItemSerializer(serializers.ModelSerializer):
+    # Id relasi divalidasi sekaligus untuk satu batch oleh bulk.TransactionBulkWriter, bukan per item
+    wallet = serializers.IntegerField(source='wallet_id')
+    category = serializers.IntegerField(source='category_id', allow_null=True, required=False)
+    payee = serializers.IntegerField(source='payee_id', allow_null=True, required=False)
+
+    class Meta:
+        model = Transaction
+        fields = ['wallet', 'category', 'payee', 'amount', 'admin_fee', 'transaction_type', 'transaction_date', 'notes']
+
+class TransactionFilterSerializer(serializers.Serializer):
+    # Parameter query daftar transaksi API; tiap filter punya indeks pendukung di Transaction.Meta
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    wallet = serializers.IntegerField(required=False)
+    category = serializers.IntegerField(required=False)
+    payee = serializers.IntegerField(required=False)
+    type = serializers.ChoiceField(choices=Transaction.TransactionType.choices, required=False)
+    amount_min = serializers.DecimalField(max_digits=15, decimal_places=2, required=False)
+    amount_max = serializers.DecimalField(max_digits=15, decimal_places=2, required=False)
+    ordering = serializers.ChoiceField(choices=TRANSACTION_ORDERINGS, default=TRANSACTION_ORDERING)
+
+    lookups = {'date_from': 'transaction_date__gte', 'date_to': 'transaction_date__lte', 'wallet': 'wallet_id',
+               'category': 'category_id', 'payee': 'payee_id', 'type': 'transaction_type',
+               'amount_min': 'amount__gte', 'amount_max': 'amount__lte'}
+
+    def filters(self):
+        return {self.lookups[name]: value for name, value in self.validated_data.items() if name in self.lookups}
+
+class ReportRangeSerializer(serializers.Serializer):
+    # Tanpa rentang: 12 bulan terakhir sampai hari ini, atau hari ini sampai 12 bulan ke depan bila forward
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    granularity = serializers.ChoiceField(choices=GRANULARITIES, default='month')
+    forward = False
+
+    def validate(self, data):
+        if self.forward:
+            data['date_from'] = data.get('date_from') or date.today()
+            data['date_to'] = data.get('date_to') or (data['date_from'] + timedelta(days=365))
+        else:
+            data['date_to'] = data.get('date_to') or date.today()
+            data['date_from'] = data.get('date_from') or (data['date_to'] - timedelta(days=365))
+        if data['date_from'] > data['date_to']:
+            raise serializers.ValidationError({'date_from': "Tanggal awal harus sebelum tanggal akhir."})
+        if bucket_count(data['date_from'], data['date_to'], data['granularity']) > MAX_REPORT_BUCKETS:
+            raise serializers.ValidationError(
+                {'granularity': f"Rentang terlalu panjang; maksimal {MAX_REPORT_BUCKETS} periode."})
+        return data
+
+class CashflowQuerySerializer(ReportRangeSerializer):
+    split = serializers.ChoiceField(choices=CASHFLOW_SPLITS, required=False)
+    wallet = serializers.IntegerField(required=False)
+    category = serializers.IntegerField(required=False)
+
+class ProjectionQuerySerializer(ReportRangeSerializer):
+    forward = True
+
+class ExportQuerySerializer(serializers.Serializer):
+    updated_since = serializers.DateTimeField(required=False)
+
 class BudgetSerializer(serializers.ModelSerializer):
+    category_name = serializers.CharField(source='category.name', read_only=True)
+
     class Meta:
         model = Budget
         fields = '__all__'
 
+class BudgetProgressSerializer(serializers.ModelSerializer):
+    category_name = serializers.CharField(source='category.name', read_only=True)
+    spent = serializers.DecimalField(max_digits=17, decimal_places=2, read_only=True)
+    remaining = serializers.DecimalField(max_digits=17, decimal_places=2, read_only=True)
+    percentage = serializers.IntegerField(read_only=True)
+
+    class Meta:
+        model = Budget
+        fields = ['id', 'category', 'category_name', 'month', 'amount', 'spent', 'remaining', 'percentage']
+
 class FinancialGoalSerializer(serializers.ModelSerializer):
     class Meta:
         model = FinancialGoal
@@ -47,6 +137,63 @@ class DebtSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 class TransferSerializer(serializers.ModelSerializer):
+    from_wallet_name = serializers.CharField(source='from_wallet.name', read_only=True)
+    to_wallet_name = serializers.CharField(source='to_wallet.name', read_only=True)
+
     class Meta:
         model = Transfer
-        fields = '__all__'
\ No newline at end of file
+        fields = '__all__'
+
+class RecurringRuleSerializer(serializers.ModelSerializer):
+    wallet_name = serializers.CharField(source='wallet.name', read_only=True)
+
+    class Meta:
+        model = RecurringRule
+        exclude = ['user']
+        read_only_fields = ['occurrences', 'next_run']
+        extra_kwargs = {'interval': {'min_value': 1}}
+
+    def validate(self, data):
+        user = self.context['request'].user
+        wallet = data.get('wallet')
+        if wallet is not None and wallet.pk not in accessible_wallet_ids(user):
+            raise serializers.ValidationError({'wallet': "Dompet tidak ditemukan."})
+        for field in ('category', 'payee'):
+            if data.get(field) is not None and data[field].user_id != user.pk:
+                raise serializers.ValidationError({field: "Tidak ditemukan."})
+        start_date = data.get('start_date', getattr(self.instance, 'start_date', None))
+        end_date = data.get('end_date', getattr(self.instance, 'end_date', None))
+        if end_date and start_date and end_date < start_date:
+            raise serializers.ValidationError({'end_date': "Tanggal akhir harus sesudah tanggal mulai."})
+        return data
+
+class JobSerializer(serializers.ModelSerializer):
+    file = serializers.FileField(write_only=True, required=False)
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Job
+        fields = ['id', 'kind', 'status', 'input_name', 'progress', 'total', 'result', 'error', 'download_url',
+                  'created_at', 'started_at', 'finished_at', 'file']
+        read_only_fields = ['status', 'input_name', 'progress', 'total', 'result', 'error', 'created_at',
+                            'started_at', 'finished_at']
+
+    def get_download_url(self, job):
+        if not job.result_name:
+            return None
+        return reverse('job-download', kwargs={'pk': job.pk}, request=self.context.get('request'))
+
+    def validate(self, data):
+        upload = data.get('file')
+        if data['kind'] == Job.Kind.IMPORT:
+            if upload is None or not upload.name.endswith('.csv'):
+                raise serializers.ValidationError({'file': "Kirim file CSV untuk diimpor."})
+        elif upload is not None:
+            raise serializers.ValidationError({'file': "Job ini tidak menerima file."})
+        return data
+
+    def create(self, validated_data):
+        upload = validated_data.pop('file', None)
+        if upload is not None:
+            validated_data.update(input_name=upload.name, input_data=upload.read())
+        return super().create(validated_data)
@@ -0,0 +1,95 @@
+"""
+Saran penerima (autocomplete) dari indeks awalan kata per pengguna di memori proses.
+
+Indeks dibangun dari satu query (id, nama, penghitung pemakaian) dan dipakai ulang selama versi daftar penerima
+dan versi data pengguna tidak berubah. Keduanya naik setiap kali penerima atau transaksi berubah, sehingga tiap
+proses web membangun ulang indeksnya sendiri hanya saat dibutuhkan; mengetik kata kunci tidak menyentuh tabel
+penerima. Urutan saran: jumlah transaksi yang diluruhkan menurut umur pemakaian terakhir.
+"""
+import re
+import threading
+import unicodedata
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import date
+
+from . import caching
+from .models import Payee
+
+SUGGEST_LIMIT = 10
+MAX_SUGGEST_LIMIT = 50
+# Bobot pemakaian berkurang separuh setiap sekian hari sejak transaksi terakhir
+RECENCY_HALF_LIFE_DAYS = 30
+MAX_INDEXED_USERS = 1000
+
+_indexes = OrderedDict()
+_lock = threading.Lock()
+
+
+def words(text):
+    # Huruf kecil tanpa diakritik, dipecah per kata: "Café Ñoño" -> ["cafe", "nono"]
+    text = ''.join(ch for ch in unicodedata.normalize('NFKD', text.casefold()) if not unicodedata.combining(ch))
+    return re.findall(r'\w+', text)
+
+
+def score(transaction_count, last_used, today):
+    if transaction_count <= 0 or last_used is None:
+        return 0
+    return transaction_count * 0.5 ** (max((today - last_used).days, 0) / RECENCY_HALF_LIFE_DAYS)
+
+
+class PayeeIndex:
+    """
+    Penerima diurutkan sekali menurut skor saat indeks dibangun; setiap kata nama disimpan sebagai (kata, peringkat)
+    dalam daftar terurut, sehingga pencarian awalan = dua bisect lalu mengambil peringkat terkecil yang cocok.
+    """
+
+    def __init__(self, rows, today):
+        self.payees = sorted(rows, key=lambda row: (-score(row[2], row[3], today), row[1].casefold(), row[0]))
+        self.words = [words(row[1]) for row in self.payees]
+        entries = sorted({(word, rank) for rank, name_words in enumerate(self.words) for word in name_words})
+        self.keys = [word for word, _ in entries]
+        self.ranks = [rank for _, rank in entries]
+
+    def search(self, query, limit=SUGGEST_LIMIT):
+        terms = words(query)
+        if not terms:
+            return self.payees[:limit]
+        # Kata terpanjang paling selektif; kata lain dicek pada kandidatnya
+        longest = max(terms, key=len)
+        start = bisect_left(self.keys, longest)
+        end = bisect_left(self.keys, longest + chr(0x10FFFF), start)
+        found = []
+        for rank in sorted(set(self.ranks[start:end])):
+            if all(any(word.startswith(term) for word in self.words[rank]) for term in terms):
+                found.append(self.payees[rank])
+                if len(found) == limit:
+                    break
+        return found
+
+
+def get_index(user):
+    key = (*caching.get_resource_versions(user, ('payee',)), caching.get_data_version(user), date.today())
+    with _lock:
+        cached = _indexes.get(user.pk)
+        if cached and cached[0] == key:
+            _indexes.move_to_end(user.pk)
+            return cached[1]
+    rows = Payee.objects.filter(user=user).values_list('pk', 'name', 'transaction_count', 'last_used')
+    index = PayeeIndex(list(rows), key[-1])
+    with _lock:
+        _indexes[user.pk] = (key, index)
+        _indexes.move_to_end(user.pk)
+        while len(_indexes) > MAX_INDEXED_USERS:
+            _indexes.popitem(last=False)
+    return index
+
+
+def clear():
+    with _lock:
+        _indexes.clear()
+
+
+def suggest(user, query, limit=SUGGEST_LIMIT):
+    return [{'id': pk, 'name': name, 'transaction_count': count, 'last_used': last_used}
+            for pk, name, count, last_used in get_index(user).search(query, limit)]
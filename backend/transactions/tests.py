@@ -1,15 +1,45 @@
-from datetime import date
+import gzip
+import io
+import json
+import logging
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from datetime import date, datetime, timedelta
 from decimal import Decimal
+from unittest import mock
 
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
 from django.contrib.auth.models import User
-from django.db.utils import IntegrityError
-from django.test import TestCase
-from django.urls import reverse
-
-from .models import Category, Wallet, Payee, Transaction, Budget, Transfer
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command, CommandError
+from django.db import connection, transaction as db_transaction
+from django.db.utils import IntegrityError, OperationalError
+from django.db.models import Q, Sum
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse, reverse_lazy
+from django.utils import timezone
+
+from finance_tracker_app import database
+from finance_tracker_app.middleware import PerformanceMiddleware
+from . import access, balances, caching, concurrency, jobs, pagination, recurring, rollups, search, suggestions
+from .models import (Category, Wallet, Payee, Transaction, Budget, Transfer, MonthlySummary, PurchaseItem, BalanceEntry,
+                     BalanceCheckpoint, FinancialGoal, Debt, Product, RecurringRule, Job, DeletedRecord)
+from .exporters import iter_transaction_csv
+from .importers import TransactionImporter
+from .serializers import TransactionFilterSerializer
+from .views import TransactionListView, BudgetListView, TransferListView
 
 class BaseViewTest(TestCase):
     def setUp(self):
+        cache.clear()
         self.user = User.objects.create_user(username='testuser', password='password')
         self.client.login(username='testuser', password='password')
 
@@ -95,6 +125,33 @@ class TransactionViewTests(BaseViewTest):
         self.assertContains(response, "Warung Padang")  # Cek apakah data payee muncul
         self.assertEqual(len(response.context['transactions']), 1)
 
+    def test_transaction_list_keyset_pagination(self):
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, wallet=self.wallet, payee=self.payee, amount=Decimal(i + 1),
+                        transaction_type='PENGELUARAN', transaction_date=date(2025, 7, 1 + i % 3))
+            for i in range(120)])
+        expected = list(Transaction.objects.order_by('-transaction_date', '-id').values_list('pk', flat=True))
+
+        seen, url = [], reverse('transaction_list')
+        while url:
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(url)
+            self.assertFalse(any('OFFSET' in q['sql'] for q in ctx.captured_queries))
+            seen += [tx.pk for tx in response.context['transactions']]
+            page = response.context['page_obj']
+            url = f"{reverse('transaction_list')}?cursor={page.next_cursor}" if page.has_next() else None
+        self.assertEqual(seen, expected)
+
+        seen, url = [], '/api/transactions/?page_size=25'
+        while url:
+            data = self.client.get(url).json()
+            seen += [row['id'] for row in data['results']]
+            url = data['next']
+        self.assertEqual(seen, expected)
+
+        self.assertEqual(self.client.get(reverse('transaction_list') + '?cursor=rusak').status_code, 404)
+        self.assertEqual(self.client.get('/api/transactions/?cursor=rusak').status_code, 404)
+
     def test_add_transaction(self):
         initial_transaction_count = Transaction.objects.filter(user=self.user).count()
 
@@ -149,6 +206,1468 @@ class TransactionViewTests(BaseViewTest):
             self.assertEqual(self.wallet.balance, Decimal('925000'))
 
 
+class TransactionImportTests(BaseViewTest):
+    HEADER = "Tanggal,Tipe,Penerima,Kategori,Jumlah,Biaya Admin,Dompet,Catatan\n"
+
+    def setUp(self):
+        super().setUp()
+        self.wallet = Wallet.objects.create(user=self.user, name="BCA", balance=Decimal('1000000'))
+
+    def _upload(self, lines):
+        csv_file = SimpleUploadedFile('import.csv', (self.HEADER + ''.join(lines)).encode('UTF-8'))
+        return self.client.post(reverse('transaction_import'), {'csv_file': csv_file})
+
+    def test_import_creates_transactions_and_updates_balances(self):
+        response = self._upload([
+            "2025-07-01,PEMASUKAN,Kantor,Gaji,5000000,0,BCA,Gaji Juli\n",
+            "2025-07-02,PENGELUARAN,Supermarket,Makanan,150000,2500,BCA,\n",
+            "2025-07-03,PENGELUARAN,Supermarket,Makanan,50000,0,GoPay,\n",
+        ])
+
+        self.assertRedirects(response, reverse('transaction_list'))
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 3)
+        self.assertEqual(Wallet.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(Category.objects.filter(user=self.user).count(), 2)
+        self.assertEqual(Payee.objects.filter(user=self.user).count(), 2)
+
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal('5847500'))
+        self.assertEqual(Wallet.objects.get(user=self.user, name="GoPay").balance, Decimal('-50000'))
+
+    def test_import_query_count_does_not_grow_with_rows(self):
+        Category.objects.create(user=self.user, name="Makanan")
+        Payee.objects.create(user=self.user, name="Warung")
+
+        def count_queries(rows):
+            with CaptureQueriesContext(connection) as ctx:
+                self._upload([f"2025-07-{i % 28 + 1:02d},PENGELUARAN,Warung,Makanan,1000,0,BCA,\n"
+                              for i in range(rows)])
+            return len(ctx.captured_queries)
+
+        count_queries(1)
+        # 90 baris x 10 kolom masih muat dalam satu INSERT (batas 999 parameter SQLite)
+        self.assertEqual(count_queries(5), count_queries(90))
+
+
+class TransactionExportTests(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        self.wallet = Wallet.objects.create(user=self.user, name="BCA", balance=Decimal('1000000'))
+        self.category = Category.objects.create(user=self.user, name="Makanan")
+        self.payee = Payee.objects.create(user=self.user, name="Warung Padang")
+
+    def _create(self, count):
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, wallet=self.wallet, category=self.category, payee=self.payee,
+                        amount=Decimal('25000'), transaction_type='PENGELUARAN', transaction_date=date(2025, 7, 1))
+            for _ in range(count)])
+
+    def _export(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('transaction_export'))
+            content = b''.join(response.streaming_content).decode('UTF-8')
+        return response, content, len(ctx.captured_queries)
+
+    def test_export_streams_csv_with_related_names(self):
+        self._create(1)
+        Transaction.objects.create(user=self.user, wallet=self.wallet, amount=Decimal('5000000'),
+                                   transaction_type='PEMASUKAN', transaction_date=date(2025, 7, 2))
+
+        response, content, _ = self._export()
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="transaksi.csv"')
+        lines = content.splitlines()
+        self.assertEqual(len(lines), 3)
+        self.assertEqual(lines[1], '2025-07-01,Pengeluaran,Warung Padang,Makanan,25000.00,0.00,BCA,')
+        self.assertEqual(lines[2], '2025-07-02,Pemasukan,,,5000000.00,0.00,BCA,')
+
+    def test_export_query_count_is_constant(self):
+        self._create(3)
+        _, _, small = self._export()
+        self._create(300)
+        _, content, large = self._export()
+
+        self.assertEqual(len(content.splitlines()), 304)
+        self.assertEqual(small, large)
+
+
+class ExportApiTests(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        self.wallet = Wallet.objects.create(user=self.user, name="BCA", balance=Decimal('1000000'))
+        self.cash = Wallet.objects.create(user=self.user, name="Tunai", balance=Decimal('0'))
+        self.payee = Payee.objects.create(user=self.user, name="Indomaret")
+        self.product = Product.objects.create(user=self.user, name="Beras 5kg")
+        self.groceries = self._transaction(Decimal('75000'))
+        self.item = PurchaseItem.objects.create(user=self.user, transaction=self.groceries, product=self.product,
+                                                quantity=1, price=Decimal('75000'))
+        self.snack = self._transaction(Decimal('12000'))
+        Transfer.objects.create(user=self.user, from_wallet=self.wallet, to_wallet=self.cash, amount=Decimal('50000'),
+                                transfer_date=date(2025, 7, 3))
+
+    def _transaction(self, amount):
+        return Transaction.objects.create(user=self.user, wallet=self.wallet, payee=self.payee, amount=amount,
+                                          transaction_type='PENGELUARAN', transaction_date=date(2025, 7, 2))
+
+    def _export(self, params=None, **headers):
+        response = self.client.get('/api/export/', params or {}, **headers)
+        content = b''.join(response.streaming_content) if response.status_code == 200 else b''
+        if response.get('Content-Encoding') == 'gzip':
+            content = gzip.decompress(content)
+        return response, [json.loads(line) for line in content.decode('utf-8').splitlines()]
+
+    def test_full_export_streams_gzip_ndjson(self):
+        response, lines = self._export(HTTP_ACCEPT_ENCODING='gzip, deflate')
+
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual([line['type'] for line in lines],
+                         ['transaction', 'transaction', 'transfer', 'purchase_item'])
+        self.assertEqual((lines[0]['id'], lines[0]['amount'], lines[0]['payee_name'], lines[0]['wallet_name']),
+                         (self.groceries.pk, '75000.00', "Indomaret", "BCA"))
+        self.assertEqual((lines[2]['from_wallet_name'], lines[2]['to_wallet_name']), ("BCA", "Tunai"))
+        self.assertEqual((lines[3]['transaction_id'], lines[3]['product_name']), (self.groceries.pk, "Beras 5kg"))
+
+        plain, plain_lines = self._export()
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertEqual(plain_lines, lines)
+
+    def test_unchanged_export_returns_not_modified(self):
+        with self.settings(EXPORT_SYNC_LAG_SECONDS=0):
+            response, _ = self._export()
+        etag = response['ETag']
+
+        self.assertEqual(self._export(HTTP_IF_NONE_MATCH=etag)[0].status_code, 304)
+        since = {'updated_since': response['X-Next-Updated-Since']}
+        delta, lines = self._export(since)
+        self.assertEqual(lines, [])
+        self.assertEqual(self._export(since, HTTP_IF_NONE_MATCH=delta['ETag'])[0].status_code, 304)
+
+        self.snack.notes = "Camilan"
+        self.snack.save()
+        self.assertEqual(self._export(HTTP_IF_NONE_MATCH=etag)[0].status_code, 200)
+
+    def test_delta_export_contains_changes_and_deletions(self):
+        with self.settings(EXPORT_SYNC_LAG_SECONDS=0):
+            response, _ = self._export()
+        since = {'updated_since': response['X-Next-Updated-Since']}
+
+        patched = self.client.patch('/api/transactions/bulk/', [{'id': self.snack.pk, 'notes': "Camilan"}],
+                                    content_type='application/json')
+        self.assertEqual(patched.status_code, 200, patched.content)
+        groceries_pk = self.groceries.pk
+        self.groceries.delete()
+        _, lines = self._export(since)
+
+        self.assertEqual((lines[0]['type'], lines[0]['id'], lines[0]['notes']),
+                         ('transaction', self.snack.pk, "Camilan"))
+        self.assertEqual(sorted((line['type'], line['kind'], line['id']) for line in lines[1:]),
+                         [('deleted', 'purchase_item', self.item.pk), ('deleted', 'transaction', groceries_pk)])
+
+    def test_watermark_covers_rows_committed_after_the_export(self):
+        started = timezone.now()
+        response, _ = self._export()
+        self.assertLess(datetime.fromisoformat(response['X-Next-Updated-Since']),
+                        started - timedelta(seconds=settings.EXPORT_SYNC_LAG_SECONDS - 1))
+        # Diberi updated_at sebelum ekspor di atas membaca data, tetapi baru commit sesudahnya
+        late = self._transaction(Decimal('5000'))
+        Transaction.objects.filter(pk=late.pk).update(updated_at=started - timedelta(seconds=1))
+
+        _, lines = self._export({'updated_since': response['X-Next-Updated-Since']})
+        self.assertIn(late.pk, [line['id'] for line in lines if line['type'] == 'transaction'])
+
+    def test_renames_and_set_null_deletions_are_exported_as_changes(self):
+        category = Category.objects.create(user=self.user, name="Belanja")
+        Transaction.objects.filter(pk=self.snack.pk).update(category=category)
+        with self.settings(EXPORT_SYNC_LAG_SECONDS=0):
+            response, _ = self._export()
+        since = {'updated_since': response['X-Next-Updated-Since']}
+        self.assertEqual(self._export(since)[1], [])
+
+        self.payee.name = "Indomaret Point"
+        self.payee.save()
+        self.product.name = "Beras 10kg"
+        self.product.save()
+        _, lines = self._export(since)
+        self.assertEqual(sorted((line['type'], line['id']) for line in lines),
+                         [('purchase_item', self.item.pk), ('transaction', self.groceries.pk),
+                          ('transaction', self.snack.pk)])
+        self.assertEqual({line.get('payee_name') for line in lines if line['type'] == 'transaction'},
+                         {"Indomaret Point"})
+
+        with self.settings(EXPORT_SYNC_LAG_SECONDS=0):
+            response, _ = self._export()
+        since = {'updated_since': response['X-Next-Updated-Since']}
+        category.delete()
+        _, lines = self._export(since)
+        self.assertEqual([(line['id'], line['category_id']) for line in lines], [(self.snack.pk, None)])
+
+    def test_deleting_user_skips_tombstones(self):
+        self.groceries.delete()
+        self.assertEqual(DeletedRecord.objects.filter(user=self.user).count(), 2)
+
+        self.user.delete()
+        self.assertFalse(DeletedRecord.objects.exists())
+        self.assertFalse(Transaction.objects.exists())
+
+
+class TransactionFilterApiTests(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        self.wallet = Wallet.objects.create(user=self.user, name="BCA", balance=Decimal('1000000'))
+        self.other = Wallet.objects.create(user=self.user, name="GoPay", balance=Decimal('0'))
+        self.food = Category.objects.create(user=self.user, name="Makanan")
+        self.salary = Category.objects.create(user=self.user, name="Gaji")
+        self.payee = Payee.objects.create(user=self.user, name="Warung")
+        rows = []
+        for i in range(60):
+            income = i % 10 == 0
+            rows.append(Transaction(user=self.user, wallet=self.other if i % 3 == 0 else self.wallet,
+                                    category=self.salary if income else self.food,
+                                    payee=self.payee if i % 2 else None, amount=Decimal(1000 * (i % 7 + 1)),
+                                    transaction_type='PEMASUKAN' if income else 'PENGELUARAN',
+                                    transaction_date=date(2025, 1 + i % 6, 1 + i % 28)))
+        Transaction.objects.bulk_create(rows)
+
+    def _ids(self, query):
+        seen, url = [], f'/api/transactions/?page_size=7&{query}'
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, response.content)
+            seen += [row['id'] for row in response.json()['results']]
+            url = response.json()['next']
+        return seen
+
+    def test_filters_match_orm(self):
+        cases = [
+            ('date_from=2025-03-01&date_to=2025-03-31',
+             Q(transaction_date__gte=date(2025, 3, 1), transaction_date__lte=date(2025, 3, 31))),
+            (f'wallet={self.other.pk}', Q(wallet=self.other)),
+            (f'category={self.salary.pk}&type=PEMASUKAN', Q(category=self.salary, transaction_type='PEMASUKAN')),
+            (f'payee={self.payee.pk}&amount_min=3000&amount_max=5000',
+             Q(payee=self.payee, amount__gte=3000, amount__lte=5000)),
+        ]
+        for query, condition in cases:
+            with self.subTest(query=query):
+                expected = Transaction.objects.filter(condition).order_by('-transaction_date', '-id')
+                self.assertEqual(self._ids(query), list(expected.values_list('pk', flat=True)))
+
+    def test_whitelisted_ordering_pages_by_keyset(self):
+        for ordering in ('amount', '-amount', 'transaction_date'):
+            with self.subTest(ordering=ordering):
+                expected = Transaction.objects.order_by(ordering, '-id' if ordering.startswith('-') else 'id')
+                self.assertEqual(self._ids(f'ordering={ordering}&type=PENGELUARAN'),
+                                 list(expected.filter(transaction_type='PENGELUARAN').values_list('pk', flat=True)))
+
+    def test_invalid_parameters_are_rejected(self):
+        for query in ('ordering=notes', 'date_from=kemarin', 'type=HIBAH', 'amount_min=banyak'):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f'/api/transactions/?{query}').status_code, 400)
+        next_url = self.client.get('/api/transactions/?page_size=5').json()['next']
+        self.assertEqual(self.client.get(next_url + '&ordering=amount').status_code, 404)
+
+
+class TransactionSearchTests(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        self.wallet = Wallet.objects.create(user=self.user, name="BCA", balance=Decimal('1000000'))
+        self.category = Category.objects.create(user=self.user, name="Belanja Online")
+        self.tokopedia = Payee.objects.create(user=self.user, name="Tokopedia")
+        self.refund = self._tx("Refund sepatu", payee=self.tokopedia, transaction_type='PEMASUKAN')
+        self.order = self._tx("Pesanan sepatu lari", payee=self.tokopedia)
+        self.coffee = self._tx("Kopi susu", payee=Payee.objects.create(user=self.user, name="Kedai Kopi"))
+        other = User.objects.create_user(username='orang_lain')
+        Transaction.objects.create(user=other, wallet=Wallet.objects.create(user=other, name="X"), amount=Decimal('1'),
+                                   notes="Refund Tokopedia", transaction_type='PEMASUKAN',
+                                   transaction_date=date.today())
+
+    def _tx(self, notes, transaction_type='PENGELUARAN', **extra):
+        return Transaction.objects.create(user=self.user, wallet=self.wallet, category=self.category, notes=notes,
+                                          amount=Decimal('10000'), transaction_type=transaction_type,
+                                          transaction_date=date.today(), **extra)
+
+    def _search(self, query):
+        return [tx.pk for tx in search.search_transactions(self.user, query)]
+
+    def test_ranked_prefix_search_over_notes_and_names(self):
+        self.assertEqual(self._search("tokopedia refund"), [self.refund.pk])
+        self.assertEqual(set(self._search("Tokop")), {self.refund.pk, self.order.pk})
+        self.assertEqual(set(self._search("belanja")), {self.refund.pk, self.order.pk, self.coffee.pk})
+        self.assertEqual(self._search("sepatu lari")[0], self.order.pk)
+        self.assertEqual(self._search("kedai"), [self.coffee.pk])
+        self.assertEqual(self._search("  ' \" OR *"), [])
+
+    def test_index_follows_writes(self):
+        Payee.objects.filter(pk=self.tokopedia.pk).update(name="Tokped")
+        self.assertEqual(set(self._search("tokped")), {self.refund.pk, self.order.pk})
+        self.assertEqual(self._search("tokopedia"), [])
+
+        product = Product.objects.create(user=self.user, name="Sepatu Ventela")
+        PurchaseItem.objects.create(user=self.user, transaction=self.coffee, product=product, price=Decimal('1'))
+        self.assertEqual(self._search("ventela"), [self.coffee.pk])
+        Product.objects.filter(pk=product.pk).update(name="Sandal Jepit")
+        self.assertEqual(self._search("jepit"), [self.coffee.pk])
+
+        Transaction.objects.filter(pk=self.refund.pk).update(notes="Pengembalian dana")
+        self.assertEqual(self._search("pengembalian"), [self.refund.pk])
+        self.order.delete()
+        self.assertEqual(self._search("tokped"), [self.refund.pk])
+
+        TransactionImporter(self.user).import_rows([['2025-07-01', 'PENGELUARAN', 'Shopee', 'Belanja Online',
+                                                     '5000', '0', 'BCA', 'Casing HP']])
+        self.assertEqual(len(self._search("casing shopee")), 1)
+
+    def test_search_views_and_rebuild_command(self):
+        response = self.client.get(reverse('transaction_list'), {'q': 'refund'})
+        self.assertEqual([tx.pk for tx in response.context['transactions']], [self.refund.pk])
+        self.assertContains(response, 'value="refund"')
+
+        data = self.client.get('/api/transactions/search/', {'q': 'sepatu', 'limit': 1}).json()
+        self.assertEqual(len(data), 1)
+        self.assertEqual(data[0]['payee'], "Tokopedia")
+
+        out = io.StringIO()
+        call_command('rebuild_search_index', stdout=out)
+        self.assertIn("4 dokumen", out.getvalue())
+        self.assertEqual(self._search("tokopedia refund"), [self.refund.pk])
+
+
+class TransactionBulkApiTests(BaseViewTest):
+    url = '/api/transactions/bulk/'
+
+    def setUp(self):
+        super().setUp()
+        self.wallet = Wallet.objects.create(user=self.user, name="BCA", balance=Decimal('1000000'))
+        self.other = Wallet.objects.create(user=self.user, name="GoPay", balance=Decimal('0'))
+        self.category = Category.objects.create(user=self.user, name="Makanan")
+        self.foreign_wallet = Wallet.objects.create(user=User.objects.create_user(username='orang_lain'), name="X")
+        for wallet in (self.wallet, self.other, self.foreign_wallet):
+            balances.record_wallet_saved(wallet)
+
+    def _send(self, method, payload):
+        return getattr(self.client, method)(self.url, data=json.dumps(payload), content_type='application/json')
+
+    def _item(self, amount, **extra):
+        return {'wallet': self.wallet.pk, 'category': self.category.pk, 'amount': amount,
+                'transaction_type': 'PENGELUARAN', 'transaction_date': '2025-07-01', **extra}
+
+    def _assert_consistent(self):
+        self.assertEqual(rollups.verify(), [])
+        call_command('reconcile_balances', stdout=io.StringIO())
+
+    def test_bulk_create_reports_item_errors_and_applies_net_delta(self):
+        payload = [self._item('10000', admin_fee='500'), self._item('abc'),
+                   self._item('5000', wallet=self.foreign_wallet.pk),
+                   self._item('200000', transaction_type='PEMASUKAN')]
+        response = self._send('post', payload)
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual((data['succeeded'], data['failed']), (2, 2))
+        self.assertIn('amount', data['results'][1]['errors'])
+        self.assertIn('wallet', data['results'][2]['errors'])
+        self.assertEqual(Transaction.objects.count(), 2)
+
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal('1189500'))
+        self.assertEqual(BalanceEntry.objects.filter(wallet=self.wallet, kind='TRANSAKSI').count(), 1)
+        self._assert_consistent()
+
+        with CaptureQueriesContext(connection) as small:
+            self._send('post', [self._item(str(1000 + i)) for i in range(5)])
+        with CaptureQueriesContext(connection) as bigger:
+            self._send('post', [self._item(str(1000 + i)) for i in range(40)])
+        self.assertEqual(len(bigger.captured_queries), len(small.captured_queries))
+
+    def test_bulk_all_or_nothing_writes_nothing_on_error(self):
+        response = self._send('post', {'items': [self._item('10000'), self._item('-')], 'all_or_nothing': True})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['results'][0], {'index': 0, 'id': None})
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_bulk_update_and_delete(self):
+        ids = [row['id'] for row in self._send('post', [self._item('10000'), self._item('20000')]).json()['results']]
+
+        response = self._send('patch', [{'id': ids[0], 'wallet': self.other.pk, 'transaction_type': 'PEMASUKAN'},
+                                        {'id': ids[1], 'amount': '25000'}, {'id': 999999, 'amount': '1'}])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['failed'], 1)
+        self.wallet.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual((self.wallet.balance, self.other.balance), (Decimal('975000'), Decimal('10000')))
+        self._assert_consistent()
+
+        response = self._send('delete', ids + [ids[0]])
+        self.assertEqual(response.json()['succeeded'], 2)
+        self.assertFalse(Transaction.objects.exists())
+        self.wallet.refresh_from_db()
+        self.other.refresh_from_db()
+        self.assertEqual((self.wallet.balance, self.other.balance), (Decimal('1000000'), Decimal('0')))
+        self._assert_consistent()
+
+    def test_bulk_rejects_boolean_ids(self):
+        first = Transaction.objects.create(user=self.user, wallet=self.wallet, category=self.category, pk=1,
+                                           amount=Decimal('10000'), transaction_type='PENGELUARAN',
+                                           transaction_date=date(2025, 7, 1))
+        response = self._send('patch', [{'id': True, 'amount': '1'}])
+        self.assertEqual((response.json()['succeeded'], response.json()['failed']), (0, 1))
+        response = self._send('delete', [True])
+        self.assertEqual(response.json()['results'][0]['errors'], {'id': ["Transaksi tidak ditemukan."]})
+        first.refresh_from_db()
+        self.assertEqual(first.amount, Decimal('10000'))
+
+    def test_bulk_create_accepts_shared_wallet(self):
+        self.foreign_wallet.shared_with.add(self.user)
+        response = self._send('post', [self._item('5000', wallet=self.foreign_wallet.pk)])
+        self.assertEqual(response.json()['succeeded'], 1)
+        self.foreign_wallet.refresh_from_db()
+        self.assertEqual(self.foreign_wallet.balance, Decimal('-5000'))
+
+
+class ApiQueryCountTests(BaseViewTest):
+    """Jumlah query daftar tiap endpoint API tidak boleh bertambah dengan jumlah baris."""
+
+    def setUp(self):
+        super().setUp()
+        self.wallet = Wallet.objects.create(user=self.user, name="BCA", balance=Decimal('1000000'))
+        self.other = Wallet.objects.create(user=self.user, name="GoPay", balance=Decimal('0'))
+
+    def _create(self, endpoint, i):
+        user = self.user
+        if endpoint == 'categories':
+            Category.objects.create(user=user, name=f"Kategori {i}")
+        elif endpoint == 'wallets':
+            Wallet.objects.create(user=user, name=f"Dompet {i}")
+        elif endpoint == 'payees':
+            Payee.objects.create(user=user, name=f"Penerima {i}")
+        elif endpoint == 'transactions':
+            Transaction.objects.create(user=user, wallet=self.wallet, amount=Decimal(i + 1),
+                                       category=Category.objects.create(user=user, name=f"Tx {i}"),
+                                       payee=Payee.objects.create(user=user, name=f"Tx {i}"),
+                                       transaction_type='PENGELUARAN', transaction_date=date.today())
+        elif endpoint == 'budgets':
+            Budget.objects.create(user=user, category=Category.objects.create(user=user, name=f"Anggaran {i}"),
+                                  amount=Decimal('100000'), month=date(2025, 7, 1))
+        elif endpoint == 'goals':
+            FinancialGoal.objects.create(user=user, name=f"Tujuan {i}", target_amount=Decimal('100000'))
+        elif endpoint == 'debts':
+            Debt.objects.create(user=user, lender_name=f"Pemberi {i}", initial_amount=Decimal('100000'),
+                                current_balance=Decimal('100000'))
+        elif endpoint == 'transfers':
+            Transfer.objects.create(user=user, from_wallet=self.wallet, to_wallet=self.other, amount=Decimal(i + 1),
+                                    transfer_date=date.today())
+
+    def _list_queries(self, url):
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries)
+
+    def test_list_query_count_is_constant(self):
+        endpoints = ['categories', 'wallets', 'payees', 'transactions', 'budgets', 'goals', 'debts', 'transfers',
+                     'budgets/progress']
+        for endpoint in endpoints:
+            with self.subTest(endpoint=endpoint):
+                url = f'/api/{endpoint}/'
+                self._create(endpoint.split('/')[0], 0)
+                few = self._list_queries(url)
+                for i in range(1, 15):
+                    self._create(endpoint.split('/')[0], i)
+                self.assertEqual(self._list_queries(url), few)
+
+
+class ConditionalListTests(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        self.wallet = Wallet.objects.create(user=self.user, name="BCA", balance=Decimal('1000000'))
+        self.category = Category.objects.create(user=self.user, name="Makanan")
+        Budget.objects.create(user=self.user, category=self.category, amount=Decimal('500000'), month=date(2025, 7, 1))
+
+    def _etag(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('private', response['Cache-Control'])
+        return response['ETag']
+
+    def test_matching_etag_returns_not_modified_without_list_query(self):
+        for endpoint, table in [('wallets', 'wallet'), ('categories', 'category'), ('payees', 'payee'),
+                                ('budgets', 'budget')]:
+            with self.subTest(endpoint=endpoint):
+                url = f'/api/{endpoint}/'
+                etag = self._etag(url)
+                with CaptureQueriesContext(connection) as ctx:
+                    response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, 304)
+                self.assertEqual(response.content, b'')
+                self.assertEqual(response['ETag'], etag)
+                self.assertFalse([q for q in ctx.captured_queries if f'"transactions_{table}"."id"' in q['sql']])
+                self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH='W/"lama"').status_code, 200)
+
+    def test_etag_changes_with_list_contents(self):
+        wallets, budgets, payees = (self._etag(f'/api/{name}/') for name in ('wallets', 'budgets', 'payees'))
+
+        # Saldo berubah lewat transaksi, bukan lewat penyimpanan dompet
+        response = self.client.post('/api/transactions/bulk/', [{
+            'wallet': self.wallet.pk, 'amount': '25000', 'transaction_type': 'PENGELUARAN',
+            'transaction_date': '2025-07-02'}], content_type='application/json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertNotEqual(self._etag('/api/wallets/'), wallets)
+
+        self.category.name = "Makan"
+        self.category.save()
+        self.assertNotEqual(self._etag('/api/budgets/'), budgets)
+
+        # Penerima baru dari impor dibuat dengan bulk_create
+        TransactionImporter(self.user).import_rows([['2025-07-03', 'PENGELUARAN', 'Warung', 'Makan', '15000', '0',
+                                                     'BCA', '']])
+        self.assertNotEqual(self._etag('/api/payees/'), payees)
+
+    def test_etag_differs_per_user_and_query(self):
+        etag = self._etag('/api/categories/')
+        self.assertNotEqual(self._etag('/api/categories/?format=json'), etag)
+        User.objects.create_user(username='lain', password='password')
+        self.client.login(username='lain', password='password')
+        self.assertEqual(self.client.get('/api/categories/', HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+
+class MonthlySummaryTests(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        self.wallet = Wallet.objects.create(user=self.user, name="BCA", balance=Decimal('1000000'))
+        self.category = Category.objects.create(user=self.user, name="Makanan")
+        self.payee = Payee.objects.create(user=self.user, name="Warung Padang")
+
+    def _summary(self, **filters):
+        return MonthlySummary.objects.filter(user=self.user, **filters).aggregate(
+            amount=Sum('total_amount'), fee=Sum('total_admin_fee'), count=Sum('transaction_count'))
+
+    def _add(self, amount, trans_type='PENGELUARAN', trans_date='2025-07-15', admin_fee='0'):
+        self.client.post(reverse('transaction_add'), {
+            'wallet': self.wallet.pk, 'category': self.category.pk, 'payee': self.payee.name, 'amount': amount,
+            'admin_fee': admin_fee, 'transaction_type': trans_type, 'transaction_date': trans_date})
+        return Transaction.objects.filter(user=self.user).latest('pk')
+
+    def test_add_update_delete_keep_summary_in_sync(self):
+        expense = self._add('100000', admin_fee='2500')
+        self._add('5000000', trans_type='PEMASUKAN')
+        self.assertEqual(self._summary(transaction_type='PENGELUARAN', month=date(2025, 7, 1)),
+                         {'amount': Decimal('100000'), 'fee': Decimal('2500'), 'count': 1})
+
+        self.client.post(reverse('transaction_update', kwargs={'pk': expense.pk}), {
+            'wallet': self.wallet.pk, 'category': self.category.pk, 'payee': self.payee.pk, 'amount': '75000',
+            'admin_fee': '0', 'transaction_type': 'PENGELUARAN', 'transaction_date': '2025-08-01'})
+        self.assertEqual(self._summary(transaction_type='PENGELUARAN', month=date(2025, 7, 1))['amount'], Decimal(0))
+        self.assertEqual(self._summary(transaction_type='PENGELUARAN', month=date(2025, 8, 1))['amount'],
+                         Decimal('75000'))
+
+        self.client.post(reverse('transaction_delete', kwargs={'pk': expense.pk}))
+        self.assertEqual(self._summary(transaction_type='PENGELUARAN')['count'], 0)
+        self.assertEqual(rollups.verify([self.user]), [])
+
+    def test_uncategorised_key_is_unique(self):
+        key = {'user': self.user, 'wallet': self.wallet, 'category': None, 'month': date(2025, 7, 1),
+               'transaction_type': 'PENGELUARAN'}
+        MonthlySummary.objects.create(**key, total_amount=Decimal('1000'), transaction_count=1)
+        with self.assertRaises(IntegrityError), db_transaction.atomic():
+            MonthlySummary.objects.create(**key, total_amount=Decimal('2000'), transaction_count=1)
+
+        rollups._apply_delta((self.user.pk, self.wallet.pk, None, date(2025, 7, 1), 'PENGELUARAN'),
+                             Decimal('500'), Decimal(0), 1)
+        self.assertEqual(self._summary(category=None), {'amount': Decimal('1500'), 'fee': Decimal('0.00'), 'count': 2})
+
+    def test_purchase_items_and_import_keep_summary_in_sync(self):
+        expense = self._add('0')
+        self.client.post(reverse('transaction_detail', kwargs={'pk': expense.pk}),
+                         {'product_name': 'Beras', 'quantity': '2', 'price': '15000'})
+        item = PurchaseItem.objects.get(transaction=expense)
+        self.client.post(reverse('purchase_item_update', kwargs={'pk': item.pk}),
+                         {'product_name': 'Beras', 'quantity': '3', 'price': '15000'})
+        self.assertEqual(self._summary(transaction_type='PENGELUARAN')['amount'], Decimal('45000'))
+
+        csv_file = SimpleUploadedFile('import.csv', (TransactionImportTests.HEADER +
+                                                     "2025-07-02,PENGELUARAN,Pasar,Makanan,10000,0,BCA,\n").encode())
+        self.client.post(reverse('transaction_import'), {'csv_file': csv_file})
+        self.assertEqual(self._summary(transaction_type='PENGELUARAN')['amount'], Decimal('55000'))
+
+        self.client.post(reverse('purchase_item_delete', kwargs={'pk': item.pk}))
+        self.assertEqual(self._summary(transaction_type='PENGELUARAN')['amount'], Decimal('10000'))
+        self.assertEqual(rollups.verify([self.user]), [])
+
+    def test_batch_apply_updates_and_creates_in_constant_queries(self):
+        self._add('100000', trans_date='2025-07-15')
+        batch = rollups.RollupBatch()
+        for month in range(1, 13):
+            batch.add(self.user.pk, self.wallet.pk, self.category.pk, date(2025, month, 3), 'PENGELUARAN', '1000',
+                      '500')
+        with CaptureQueriesContext(connection) as queries:
+            batch.apply()
+        # SELECT baris yang ada, satu UPDATE, satu INSERT (plus savepoint)
+        self.assertLessEqual(len(queries), 5)
+        self.assertEqual(self._summary(month=date(2025, 7, 1)),
+                         {'amount': Decimal('101000'), 'fee': Decimal('500'), 'count': 2})
+        self.assertEqual(self._summary(month=date(2025, 12, 1))['count'], 1)
+
+    def test_dashboard_reads_summary(self):
+        self._add('100000')
+        self._add('5000000', trans_type='PEMASUKAN')
+
+        response = self.client.get(reverse('dashboard'))
+
+        self.assertEqual(response.context['income_this_month'], Decimal('5000000'))
+        self.assertEqual(response.context['expense_this_month'], Decimal('100000'))
+
+    def test_rebuild_rollups_command_repairs_drift(self):
+        self._add('100000')
+        MonthlySummary.objects.filter(user=self.user).update(total_amount=Decimal('1'))
+        self.assertEqual(len(rollups.verify([self.user])), 1)
+
+        call_command('rebuild_rollups', stdout=io.StringIO())
+
+        self.assertEqual(rollups.verify(), [])
+
+
+class CashflowReportTests(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        self.bca = Wallet.objects.create(user=self.user, name="BCA", balance=Decimal('1000000'))
+        self.gopay = Wallet.objects.create(user=self.user, name="GoPay", balance=Decimal('0'))
+        self.food = Category.objects.create(user=self.user, name="Makanan")
+        self.salary = Category.objects.create(user=self.user, name="Gaji")
+        other = User.objects.create_user(username='other', password='password')
+        hidden = Wallet.objects.create(user=other, name="Rahasia", balance=Decimal('0'))
+        rows = [Transaction(user=other, wallet=hidden, amount=Decimal('999'), transaction_type='PENGELUARAN',
+                            transaction_date=date(2025, 2, 3))]
+        for i in range(80):
+            income = i % 8 == 0
+            rows.append(Transaction(user=self.user, wallet=self.gopay if i % 3 == 0 else self.bca,
+                                    category=self.salary if income else (self.food if i % 5 else None),
+                                    amount=Decimal(1000 * (i % 7 + 1)), admin_fee=Decimal(500 * (i % 2)),
+                                    transaction_type='PEMASUKAN' if income else 'PENGELUARAN',
+                                    transaction_date=date(2025, 1, 1) + timedelta(days=i * 4)))
+        Transaction.objects.bulk_create(rows)
+        rollups.rebuild([self.user, other])
+
+    def _report(self, query):
+        response = self.client.get(f'/api/reports/cashflow/?{query}')
+        self.assertEqual(response.status_code, 200, response.content)
+        return response.json()
+
+    def _expected(self, start, end, split):
+        expected = {}
+        for tx in Transaction.objects.filter(user=self.user, transaction_date__range=(start, end)):
+            key = getattr(tx, f'{split}_id') if split else None
+            income, expense, fees = expected.get(key, (0, 0, 0))
+            if tx.transaction_type == 'PEMASUKAN':
+                income += tx.amount
+            else:
+                expense, fees = expense + tx.amount, fees + tx.admin_fee
+            expected[key] = (income, expense, fees)
+        return expected
+
+    def test_buckets_match_transactions(self):
+        for granularity in ('day', 'week', 'month', 'year'):
+            for split in ('', 'wallet', 'category'):
+                with self.subTest(granularity=granularity, split=split):
+                    report = self._report(f'date_from=2025-01-10&date_to=2025-10-20&granularity={granularity}'
+                                          + (f'&split={split}' if split else ''))
+                    buckets = [date.fromisoformat(bucket) for bucket in report['buckets']]
+                    self.assertEqual(len(buckets), len(set(buckets)))
+                    self.assertEqual(buckets[0], date.fromisoformat(report['date_from']))
+                    self.assertLessEqual(buckets[-1], date(2025, 10, 20))
+                    for series in report['series']:
+                        self.assertEqual(len(series['income']), len(buckets))
+                    for bucket_index in (0, len(buckets) // 2, len(buckets) - 1):
+                        start = buckets[bucket_index]
+                        end = (buckets[bucket_index + 1] if bucket_index + 1 < len(buckets)
+                               else date.fromisoformat(report['date_to']) + timedelta(days=1)) - timedelta(days=1)
+                        expected = self._expected(start, end, split)
+                        for series in report['series']:
+                            income, expense, fees = expected.get(series['key'], (0, 0, 0))
+                            self.assertEqual(
+                                [Decimal(str(series[name][bucket_index]))
+                                 for name in ('income', 'expense', 'fees', 'net')],
+                                [income, expense, fees, income - expense - fees])
+                    expected = self._expected(date.fromisoformat(report['date_from']),
+                                              date.fromisoformat(report['date_to']), split)
+                    self.assertEqual(Decimal(str(report['totals']['net'])),
+                                     sum((i - e - f for i, e, f in expected.values()), Decimal(0)))
+
+    def test_split_names_and_filters(self):
+        report = self._report('date_from=2025-01-01&date_to=2025-12-31&split=category')
+        self.assertEqual({series['name'] for series in report['series']}, {"Makanan", "Gaji", "Tanpa kategori"})
+        report = self._report(f'date_from=2025-01-01&date_to=2025-12-31&split=wallet&wallet={self.gopay.pk}')
+        self.assertEqual([series['name'] for series in report['series']], ["GoPay"])
+        self.assertEqual(len(report['buckets']), 12)
+
+    def test_invalid_parameters_are_rejected(self):
+        for query in ('granularity=hour', 'split=payee', 'date_from=2025-02-01&date_to=2025-01-01',
+                      'granularity=day&date_from=2000-01-01&date_to=2025-01-01'):
+            with self.subTest(query=query):
+                self.assertEqual(self.client.get(f'/api/reports/cashflow/?{query}').status_code, 400)
+
+    def test_ten_year_daily_range_uses_constant_queries(self):
+        call_command('seed_synthetic', '--users', '1', '--transactions', '2000', '--months', '120', '--prefix',
+                     'cashflow', stdout=io.StringIO())
+        self.client.force_login(User.objects.get(username='cashflow_1'))
+        today = date.today()
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            report = self._report(f'date_from={today.replace(year=today.year - 10)}&date_to={today}'
+                                  f'&granularity=day&split=category')
+            elapsed = time.perf_counter() - started
+        self.assertGreater(len(report['buckets']), 3650)
+        self.assertEqual(Decimal(str(report['totals']['expense'])), Transaction.objects.filter(
+            user__username='cashflow_1', transaction_type='PENGELUARAN').aggregate(total=Sum('amount'))['total'])
+        self.assertLessEqual(len(queries), 6)
+        self.assertLess(elapsed, 1)
+
+class NetWorthReportTests(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        self.bca = Wallet.objects.create(user=self.user, name="BCA", balance=Decimal('1000000'))
+        self.cash = Wallet.objects.create(user=self.user, name="Tunai", balance=Decimal('200000'))
+        self.card = Wallet.objects.create(user=self.user, name="Kartu Kredit", balance=Decimal('0'),
+                                          wallet_type='LIABILITAS')
+        self.debt = Debt.objects.create(user=self.user, lender_name="Koperasi", initial_amount=Decimal('500000'),
+                                        current_balance=Decimal('500000'))
+        self.opening = {self.bca.pk: Decimal('1000000'), self.cash.pk: Decimal('200000'), self.card.pk: Decimal(0)}
+        self._transaction(self.bca, '3000000', 'PEMASUKAN', date(2025, 1, 25))
+        self._transaction(self.bca, '150000', 'PENGELUARAN', date(2025, 2, 3), fee='6500')
+        self._transaction(self.card, '400000', 'PENGELUARAN', date(2025, 3, 10))
+        self._transaction(self.cash, '25000', 'PENGELUARAN', date(2025, 3, 31))
+        transfer = Transfer.objects.create(user=self.user, from_wallet=self.bca, to_wallet=self.cash,
+                                           amount=Decimal('300000'), admin_fee=Decimal('2500'),
+                                           transfer_date=date(2025, 2, 14))
+        balances.transfer(self.bca.pk, self.cash.pk, transfer.amount, transfer.admin_fee)
+        self.client.post(reverse('pay_debt', kwargs={'pk': self.debt.pk}),
+                         {'amount': '200000', 'source_wallet': self.bca.pk})
+        Transaction.objects.filter(category__name='Pembayaran Utang').update(transaction_date=date(2025, 4, 2))
+
+    def _transaction(self, wallet, amount, trans_type, day, fee='0'):
+        tx = Transaction.objects.create(user=self.user, wallet=wallet, amount=Decimal(amount), admin_fee=Decimal(fee),
+                                        transaction_type=trans_type, transaction_date=day)
+        balances.apply_delta(wallet.pk, balances.transaction_delta(tx))
+
+    def _balance(self, wallet_id, day):
+        balance = self.opening[wallet_id]
+        for tx in Transaction.objects.filter(wallet_id=wallet_id, transaction_date__lte=day):
+            balance += balances.transaction_delta(tx)
+        for transfer in Transfer.objects.filter(transfer_date__lte=day):
+            if transfer.from_wallet_id == wallet_id:
+                balance -= transfer.amount + transfer.admin_fee
+            if transfer.to_wallet_id == wallet_id:
+                balance += transfer.amount
+        return balance
+
+    def test_series_replays_history(self):
+        for granularity in ('day', 'week', 'month'):
+            with self.subTest(granularity=granularity):
+                response = self.client.get(f'/api/reports/net-worth/?date_from=2025-01-01&date_to=2025-05-31'
+                                           f'&granularity={granularity}')
+                self.assertEqual(response.status_code, 200, response.content)
+                report = response.json()
+                ends = [date.fromisoformat(bucket) - timedelta(days=1) for bucket in report['buckets'][1:]]
+                ends.append(date.fromisoformat(report['date_to']))
+                for series in report['wallets']:
+                    self.assertEqual([Decimal(str(value)) for value in series['balance']],
+                                     [self._balance(series['id'], end) for end in ends])
+                for index, end in enumerate(ends):
+                    debt = Decimal('500000') if end < date(2025, 4, 2) else Decimal('300000')
+                    assets = self._balance(self.bca.pk, end) + self._balance(self.cash.pk, end)
+                    self.assertEqual(Decimal(str(report['liabilities'][index])), debt)
+                    self.assertEqual(Decimal(str(report['net_worth'][index])), assets - debt)
+
+    def test_latest_point_matches_dashboard(self):
+        report = self.client.get('/api/reports/net-worth/').json()
+        dashboard = self.client.get(reverse('dashboard'))
+        self.assertEqual(Decimal(str(report['net_worth'][-1])), dashboard.context['net_worth'])
+        self.assertEqual(self.client.get('/api/reports/net-worth/?granularity=hour').status_code, 400)
+
+    def test_ten_year_daily_series_for_twenty_wallets_uses_constant_queries(self):
+        rng = random.Random(0)
+        wallets = Wallet.objects.bulk_create([Wallet(user=self.user, name=f"Dompet {i}", balance=Decimal(0))
+                                              for i in range(17)])
+        start = date.today().replace(year=date.today().year - 10)
+        Transaction.objects.bulk_create([
+            Transaction(user=self.user, wallet=rng.choice(wallets), amount=Decimal(rng.randrange(1000, 100000)),
+                        admin_fee=Decimal(0), transaction_type=rng.choice(('PEMASUKAN', 'PENGELUARAN')),
+                        transaction_date=start + timedelta(days=rng.randrange(3650))) for _ in range(5000)])
+        with CaptureQueriesContext(connection) as queries:
+            started = time.perf_counter()
+            response = self.client.get(f'/api/reports/net-worth/?date_from={start}&date_to={date.today()}'
+                                       f'&granularity=day')
+            elapsed = time.perf_counter() - started
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['wallets']), 20)
+        self.assertGreater(len(response.json()['buckets']), 3650)
+        self.assertLessEqual(len(queries), 10)
+        self.assertLess(elapsed, 1)
+
+class RecurringRuleTests(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        self.wallet = Wallet.objects.create(user=self.user, name="BCA", balance=Decimal('1000000'))
+        self.salary = Category.objects.create(user=self.user, name="Gaji")
+        self.other = User.objects.create_user(username='other', password='password')
+        self.other_wallet = Wallet.objects.create(user=self.other, name="Tunai", balance=Decimal('500000'))
+
+    def _rule(self, **fields):
+        data = {'user': self.user, 'wallet': self.wallet, 'amount': Decimal('100000'),
+                'transaction_type': 'PENGELUARAN', 'frequency': 'BULANAN', 'start_date': date(2025, 1, 31), **fields}
+        return RecurringRule.objects.create(**data)
+
+    def test_month_end_schedule_and_catch_up(self):
+        rule = self._rule(end_date=date(2025, 6, 30))
+        self.assertEqual(rule.next_run, date(2025, 1, 31))
+        self.assertEqual([recurring.occurrence(rule, i) for i in range(4)],
+                         [date(2025, 1, 31), date(2025, 2, 28), date(2025, 3, 31), date(2025, 4, 30)])
+        self.assertEqual(recurring.materialize(date(2025, 3, 31)), (1, 3))
+        rule.refresh_from_db()
+        self.assertEqual((rule.occurrences, rule.next_run), (3, date(2025, 4, 30)))
+        recurring.materialize(date(2025, 12, 31))
+        rule.refresh_from_db()
+        self.assertEqual((rule.occurrences, rule.next_run), (6, None))
+
+    def test_materialize_is_bulk_and_idempotent(self):
+        self._rule(amount=Decimal('5000000'), transaction_type='PEMASUKAN', category=self.salary, admin_fee=0)
+        self._rule(frequency='HARIAN', start_date=date(2025, 3, 1), admin_fee=Decimal('1000'))
+        RecurringRule.objects.create(user=self.other, wallet=self.other_wallet, amount=Decimal('20000'),
+                                     transaction_type='PENGELUARAN', frequency='MINGGUAN', interval=2,
+                                     start_date=date(2025, 3, 3))
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(recurring.materialize(date(2025, 3, 31)), (3, 3 + 31 + 3))
+        bulk_queries = len(queries)
+
+        expected = {self.wallet.pk: Decimal('1000000') + 3 * Decimal('5000000') - 31 * Decimal('101000'),
+                    self.other_wallet.pk: Decimal('500000') - 3 * Decimal('20000')}
+        for wallet in Wallet.objects.all():
+            self.assertEqual(wallet.balance, expected[wallet.pk])
+            self.assertEqual(balances.balance_as_of(wallet.pk), wallet.balance - expected[wallet.pk]
+                             + sum(entry.amount for entry in wallet.balance_entries.all()))
+        self.assertEqual(rollups.verify(), [])
+
+        self.assertEqual(recurring.materialize(date(2025, 3, 31)), (0, 0))
+        call_command('materialize_recurring', '--date', '2025-03-31', stdout=io.StringIO())
+        self.assertEqual(Transaction.objects.count(), 37)
+
+        # Jumlah query tidak bergantung pada jumlah aturan dan kejadian
+        for i in range(20):
+            self._rule(frequency='HARIAN', start_date=date(2025, 4, 1))
+        with CaptureQueriesContext(connection) as queries:
+            recurring.materialize(date(2025, 4, 30))
+        self.assertLessEqual(len(queries), bulk_queries)
+
+    def test_api_validates_reschedules_and_projects(self):
+        response = self.client.post('/api/recurring/', {
+            'wallet': self.other_wallet.pk, 'amount': '100000', 'transaction_type': 'PENGELUARAN',
+            'start_date': '2025-01-01'}, content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post('/api/recurring/', {
+            'wallet': self.wallet.pk, 'category': self.salary.pk, 'amount': '5000000', 'transaction_type': 'PEMASUKAN',
+            'frequency': 'BULANAN', 'start_date': '2025-01-25'}, content_type='application/json')
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()['next_run'], '2025-01-25')
+        rule_id = response.json()['id']
+        self._rule(amount=Decimal('150000'), admin_fee=Decimal('2500'), start_date=date(2025, 1, 10))
+        recurring.materialize(date(2025, 2, 28))
+
+        response = self.client.patch(f'/api/recurring/{rule_id}/', {'start_date': '2025-01-05'},
+                                     content_type='application/json')
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(response.json()['next_run'], '2025-04-05')
+
+        report = self.client.get('/api/recurring/projection/?date_from=2025-03-01&date_to=2025-05-31').json()
+        self.assertEqual(report['buckets'], ['2025-03-01', '2025-04-01', '2025-05-01'])
+        # Gaji Maret sudah lewat dari jadwal baru, jadi kejadian berikutnya 5 April
+        self.assertEqual([Decimal(str(value)) for value in report['net']],
+                         [Decimal('-152500'), Decimal('4847500'), Decimal('4847500')])
+        balance = Wallet.objects.get(pk=self.wallet.pk).balance
+        self.assertEqual(Decimal(str(report['balance'][-1])), balance + Decimal('9542500'))
+
+class JobQueueTests(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        self.wallet = Wallet.objects.create(user=self.user, name="BCA", balance=Decimal('1000000'))
+
+    def _csv(self, rows):
+        header = "Tanggal,Tipe,Penerima,Kategori,Jumlah,Biaya Admin,Dompet,Catatan\n"
+        return SimpleUploadedFile('impor.csv', (header + "\n".join(rows)).encode(), content_type='text/csv')
+
+    def _run_jobs(self):
+        call_command('run_jobs', '--once', '--processes', '0', stdout=io.StringIO())
+
+    def test_import_job_writes_in_batches_and_reports_progress(self):
+        rows = [f"2025-0{1 + i % 6}-1{i % 9},PENGELUARAN,Warung {i % 7},Makanan,{1000 + i},500,BCA,"
+                for i in range(2500)] + ["2025-07-01,PEMASUKAN,Kantor,Gaji,9000000,0,Tunai,Gaji Juli"]
+        response = self.client.post('/api/jobs/', {'kind': 'IMPOR', 'file': self._csv(rows)})
+        self.assertEqual(response.status_code, 201, response.content)
+        self.assertEqual(response.json()['status'], 'ANTRE')
+        self.assertEqual(Transaction.objects.count(), 0)
+
+        self._run_jobs()
+        job = self.client.get(f"/api/jobs/{response.json()['id']}/").json()
+        self.assertEqual((job['status'], job['progress'], job['total']), ('SELESAI', 2501, 2501))
+        self.assertEqual(job['result'], {'imported': 2501})
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 2501)
+        expected = Decimal('1000000') - sum(Decimal(1000 + i + 500) for i in range(2500))
+        self.assertEqual(Wallet.objects.get(pk=self.wallet.pk).balance, expected)
+        self.assertEqual(Wallet.objects.get(name="Tunai").balance, Decimal('9000000'))
+        self.assertEqual(rollups.verify([self.user]), [])
+
+    def test_import_resumes_after_committed_batches_when_worker_dies(self):
+        rows = [f"2025-07-0{1 + i % 9},PENGELUARAN,Warung {i % 5},Makanan,{1000 + i},500,BCA," for i in range(2500)]
+        job_id = self.client.post('/api/jobs/', {'kind': 'IMPOR', 'file': self._csv(rows)}).json()['id']
+        import_rows, batches = TransactionImporter.import_rows, []
+
+        def dies_on_second_batch(importer, batch):
+            if batches:
+                # Worker dihentikan paksa: bukan Exception sehingga job tetap BERJALAN
+                raise KeyboardInterrupt
+            batches.append(len(batch))
+            return import_rows(importer, batch)
+
+        with mock.patch.object(TransactionImporter, 'import_rows', dies_on_second_batch), \
+                self.assertRaises(KeyboardInterrupt):
+            jobs.run(jobs.claim('a'))
+        job = Job.objects.get(pk=job_id)
+        self.assertEqual((job.status, job.progress), ('BERJALAN', batches[0]))
+        self.assertEqual(Transaction.objects.count(), batches[0])
+
+        jobs.requeue_stale(timezone.now() + timedelta(seconds=settings.JOB_STALE_SECONDS + 1))
+        self._run_jobs()
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts, job.progress, job.result), ('SELESAI', 2, 2500, {'imported': 2500}))
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 2500)
+        expected = Decimal('1000000') - sum(Decimal(1000 + i + 500) for i in range(2500))
+        self.assertEqual(Wallet.objects.get(pk=self.wallet.pk).balance, expected)
+        self.assertEqual(rollups.verify([self.user]), [])
+
+    def test_invalid_import_fails_without_writing(self):
+        rows = ["2025-07-01,PENGELUARAN,Warung,Makanan,1000,0,BCA,", "2025-13-01,PENGELUARAN,Warung,Makanan,1000,0,BCA,",
+                "2025-07-02,HIBAH,Warung,Makanan,1000,0,BCA,",
+                "2025-07-03,PENGELUARAN,Warung,Makanan,seribu,0,BCA,"]
+        job_id = self.client.post('/api/jobs/', {'kind': 'IMPOR', 'file': self._csv(rows)}).json()['id']
+        self._run_jobs()
+        job = Job.objects.get(pk=job_id)
+        self.assertEqual(job.status, 'GAGAL')
+        self.assertEqual([line.split(':')[0] for line in job.error.splitlines()], ['Baris 3', 'Baris 4', 'Baris 5'])
+        self.assertEqual(Transaction.objects.count(), 0)
+        self.assertEqual(self.client.post('/api/jobs/', {'kind': 'IMPOR'}).status_code, 400)
+        self.assertEqual(self.client.post('/api/jobs/', {'kind': 'EKSPOR', 'file': self._csv([])}).status_code, 400)
+
+    def test_export_job_result_is_downloadable(self):
+        for i in range(30):
+            Transaction.objects.create(user=self.user, wallet=self.wallet, amount=Decimal(1000 + i),
+                                       transaction_type='PENGELUARAN', transaction_date=date(2025, 7, 1 + i % 28))
+        job_id = self.client.post('/api/jobs/', {'kind': 'EKSPOR'}).json()['id']
+        self.assertEqual(self.client.get(f'/api/jobs/{job_id}/download/').status_code, 404)
+        self._run_jobs()
+        job = self.client.get(f'/api/jobs/{job_id}/').json()
+        self.assertEqual((job['status'], job['progress'], job['total']), ('SELESAI', 30, 30))
+        response = self.client.get(job['download_url'])
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        self.assertEqual(gzip.decompress(response.content).decode(), ''.join(iter_transaction_csv(self.user)))
+
+        other = User.objects.create_user(username='other', password='password')
+        self.client.force_login(other)
+        self.assertEqual(self.client.get(f'/api/jobs/{job_id}/download/').status_code, 404)
+        self.assertEqual(self.client.get('/api/jobs/').json(), [])
+
+    def test_claim_is_exclusive_and_stale_jobs_are_retried(self):
+        job = jobs.enqueue(self.user, Job.Kind.RECOMPUTE)
+        self.assertEqual(jobs.claim('a').pk, job.pk)
+        self.assertIsNone(jobs.claim('b'))
+
+        later = timezone.now() + timedelta(seconds=settings.JOB_STALE_SECONDS + 1)
+        self.assertEqual(jobs.requeue_stale(later), (0, 1))
+        for attempt in range(2, settings.JOB_MAX_ATTEMPTS + 1):
+            self.assertEqual(jobs.claim('b').attempts, attempt)
+            jobs.requeue_stale(later)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), ('GAGAL', settings.JOB_MAX_ATTEMPTS))
+
+    def test_large_web_import_is_queued(self):
+        with self.settings(IMPORT_JOB_THRESHOLD_BYTES=10):
+            response = self.client.post(reverse('transaction_import'), {
+                'csv_file': self._csv(["2025-07-01,PENGELUARAN,Warung,Makanan,1000,0,BCA,"])})
+        self.assertRedirects(response, reverse('transaction_list'), fetch_redirect_response=False)
+        self.assertEqual(Transaction.objects.count(), 0)
+        self._run_jobs()
+        self.assertEqual(Job.objects.get().status, 'SELESAI')
+        self.assertEqual(Transaction.objects.count(), 1)
+
+class JobWorkerProcessTests(TransactionTestCase):
+    def test_worker_pool_drains_queue_once(self):
+        user = User.objects.create_user(username='testuser', password='password')
+        Wallet.objects.create(user=user, name="BCA", balance=Decimal('1000000'))
+        queued = [jobs.enqueue(user, Job.Kind.EXPORT if i % 2 else Job.Kind.RECOMPUTE) for i in range(6)]
+        call_command('run_jobs', '--once', '--processes', '2', '--poll-interval', '0', stdout=io.StringIO())
+        finished = Job.objects.filter(pk__in=[job.pk for job in queued])
+        self.assertEqual(set(finished.values_list('status', flat=True)), {'SELESAI'})
+        self.assertTrue(all(attempts == 1 for attempts in finished.values_list('attempts', flat=True)))
+
+class DashboardCacheTests(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        self.wallet = Wallet.objects.create(user=self.user, name="BCA", balance=Decimal('1000000'))
+        self.category = Category.objects.create(user=self.user, name="Makanan")
+
+    def _dashboard(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse('dashboard'))
+        return response, len(ctx.captured_queries)
+
+    def test_second_hit_is_served_from_cache(self):
+        _, miss_queries = self._dashboard()
+        response, hit_queries = self._dashboard()
+
+        self.assertLess(hit_queries, miss_queries)
+        self.assertEqual(response.context['total_assets'], Decimal('1000000'))
+        self.assertEqual(caching.cache_stats('dashboard'), {'hit': 1, 'miss': 1})
+
+    def test_writes_invalidate_cached_dashboard(self):
+        self._dashboard()
+        self.client.post(reverse('transaction_add'), {
+            'wallet': self.wallet.pk, 'category': self.category.pk, 'payee': 'Warung', 'amount': '50000',
+            'transaction_type': 'PENGELUARAN', 'transaction_date': date.today().isoformat()})
+
+        response, _ = self._dashboard()
+        self.assertEqual(response.context['total_assets'], Decimal('950000'))
+        self.assertEqual(response.context['expense_this_month'], Decimal('50000'))
+
+        self.client.post(reverse('debt_create'), {'lender_name': 'Bank', 'initial_amount': '200000'})
+        response, _ = self._dashboard()
+        self.assertEqual(response.context['total_liabilities'], Decimal('200000'))
+
+        self.client.post(reverse('wallet_update', kwargs={'pk': self.wallet.pk}),
+                         {'name': 'BCA', 'wallet_type': 'ASET', 'balance': '100'})
+        response, _ = self._dashboard()
+        self.assertEqual(response.context['total_assets'], Decimal('100'))
+        self.assertEqual(caching.cache_stats('dashboard'), {'hit': 0, 'miss': 4})
+
+    def test_api_writes_invalidate_cached_dashboard(self):
+        self._dashboard()
+        self.client.post('/api/wallets/', {'name': 'GoPay', 'wallet_type': 'ASET', 'balance': '300000'})
+
+        response, _ = self._dashboard()
+        self.assertEqual(response.context['total_assets'], Decimal('1300000'))
+
+
+class DashboardConcurrentQueriesTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.client.force_login(self.user)
+        Wallet.objects.create(user=self.user, name="BCA", balance=Decimal('1000000'))
+        Debt.objects.create(user=self.user, lender_name="Bank", initial_amount=Decimal('250000'))
+        category = Category.objects.create(user=self.user, name="Makanan")
+        rollups.record_transaction(Transaction(user=self.user, wallet_id=Wallet.objects.get().pk, category=category,
+                                               amount=Decimal('50000'), admin_fee=Decimal(0),
+                                               transaction_type='PENGELUARAN', transaction_date=date(2025, 7, 1)))
+
+    def _get(self, workers, url=reverse_lazy('dashboard')):
+        cache.clear()
+        threads, run = set(), concurrency._run
+
+        def recording_run(func, wrappers):
+            threads.add(threading.current_thread().name)
+            return run(func, wrappers)
+
+        with self.settings(ASYNC_QUERY_WORKERS=workers), mock.patch.object(concurrency, '_executor', None), \
+                mock.patch.object(concurrency, '_run', recording_run):
+            response = self.client.get(url)
+        return response, threads
+
+    def test_worker_threads_give_same_result_and_are_instrumented(self):
+        sequential, _ = self._get(0)
+        concurrent, threads = self._get(3)
+
+        self.assertTrue(threads and all(name.startswith('async-query') for name in threads))
+        for key in ('total_assets', 'total_liabilities', 'net_worth', 'expense_this_month', 'chart_labels'):
+            self.assertEqual(concurrent.context[key], sequential.context[key])
+        self.assertEqual(concurrent.context['total_liabilities'], Decimal('250000'))
+        # Query di thread worker ikut tercatat oleh PerformanceMiddleware
+        count = re.compile(r'desc="(\d+) queries"')
+        self.assertEqual(count.search(concurrent['Server-Timing']).group(1),
+                         count.search(sequential['Server-Timing']).group(1))
+
+    def test_net_worth_report_runs_aggregates_on_worker_threads(self):
+        url = '/api/reports/net-worth/?date_from=2025-01-01&date_to=2025-12-31'
+        sequential, _ = self._get(0, url)
+        concurrent, threads = self._get(3, url)
+
+        self.assertEqual(concurrent.status_code, 200)
+        self.assertTrue(threads and all(name.startswith('async-query') for name in threads))
+        self.assertEqual(concurrent.json(), sequential.json())
+        self.assertEqual(Decimal(str(concurrent.json()['liabilities'][-1])), Decimal('250000'))
+
+
+class BalanceServiceTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.wallet = Wallet.objects.create(user=self.user, name="BCA", balance=Decimal('100000'))
+        self.other = Wallet.objects.create(user=self.user, name="GoPay", balance=Decimal('0'))
+
+    def test_require_funds_rejects_overdraft_without_writing(self):
+        with self.assertRaises(balances.InsufficientFunds):
+            balances.apply_delta(self.wallet.pk, Decimal('-100001'), require_funds=True)
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal('100000'))
+
+    def test_failed_transfer_rolls_back_credit(self):
+        # Dompet tujuan (id lebih kecil) dikredit lebih dulu, lalu debit gagal dan kredit ikut dibatalkan
+        with self.assertRaises(balances.InsufficientFunds):
+            balances.transfer(self.other.pk, self.wallet.pk, Decimal('1'))
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal('100000'))
+
+    def test_update_view_on_same_wallet_applies_net_delta(self):
+        self.client.login(username='testuser', password='password')
+        category = Category.objects.create(user=self.user, name="Makanan")
+        self.client.post(reverse('transaction_add'), {
+            'wallet': self.wallet.pk, 'category': category.pk, 'payee': 'Warung', 'amount': '30000',
+            'transaction_type': 'PENGELUARAN', 'transaction_date': '2025-07-01'})
+        expense = Transaction.objects.get(user=self.user)
+
+        self.client.post(reverse('transaction_update', kwargs={'pk': expense.pk}), {
+            'wallet': self.wallet.pk, 'category': category.pk, 'amount': '10000', 'admin_fee': '0',
+            'transaction_type': 'PENGELUARAN', 'transaction_date': '2025-07-01'})
+
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal('90000'))
+
+
+class BalanceLedgerTests(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        self.client.post(reverse('wallet_create'), {'name': 'BCA', 'wallet_type': 'ASET', 'balance': '1000000'})
+        self.client.post(reverse('wallet_create'), {'name': 'GoPay', 'wallet_type': 'ASET', 'balance': '0'})
+        self.wallet = Wallet.objects.get(user=self.user, name='BCA')
+        self.other = Wallet.objects.get(user=self.user, name='GoPay')
+        self.category = Category.objects.create(user=self.user, name="Makanan")
+
+    def _ledger_sum(self, wallet):
+        return BalanceEntry.objects.filter(wallet=wallet).aggregate(total=Sum('amount'))['total'] or Decimal(0)
+
+    def test_every_balance_change_is_recorded(self):
+        self.client.post(reverse('transaction_add'), {
+            'wallet': self.wallet.pk, 'category': self.category.pk, 'payee': 'Warung', 'amount': '50000',
+            'admin_fee': '1000', 'transaction_type': 'PENGELUARAN', 'transaction_date': '2025-07-01'})
+        self.client.post(reverse('transfer_create'), {
+            'from_wallet': self.wallet.pk, 'to_wallet': self.other.pk, 'amount': '100000', 'admin_fee': '2500',
+            'transfer_date': '2025-07-02'})
+        self.client.post(reverse('wallet_update', kwargs={'pk': self.other.pk}),
+                         {'name': 'GoPay', 'wallet_type': 'ASET', 'balance': '90000'})
+
+        for wallet in (self.wallet, self.other):
+            wallet.refresh_from_db()
+            self.assertEqual(self._ledger_sum(wallet), wallet.balance)
+        self.assertEqual(list(BalanceEntry.objects.filter(wallet=self.other).values_list('kind', flat=True)),
+                         ['TRANSFER', 'PENYESUAIAN'])
+        self.assertEqual(self.wallet.balance, Decimal('846500'))
+
+    def test_balance_as_of_uses_checkpoint_and_bounded_tail(self):
+        start = timezone.make_aware(datetime(2025, 7, 1, 12))
+        with mock.patch.object(balances, 'LEDGER_CHECKPOINT_INTERVAL', 5):
+            for day in range(12):
+                with mock.patch('transactions.balances.timezone.now', return_value=start + timedelta(days=day)):
+                    balances.apply_delta(self.other.pk, Decimal('10'))
+
+        self.assertEqual(BalanceCheckpoint.objects.filter(wallet=self.other).count(), 2)
+        self.assertEqual(balances.balance_as_of(self.other.pk, date(2025, 6, 30)), Decimal('0'))
+        self.assertEqual(balances.balance_as_of(self.other.pk, date(2025, 7, 3)), Decimal('30'))
+        self.assertEqual(balances.balance_as_of(self.other.pk, date(2025, 7, 8)), Decimal('80'))
+        self.assertEqual(balances.balance_as_of(self.other.pk), Decimal('120'))
+
+        with CaptureQueriesContext(connection) as ctx:
+            balances.balance_as_of(self.other.pk, date(2025, 7, 11))
+        self.assertEqual(len(ctx.captured_queries), 2)
+
+        response = self.client.get(f'/api/wallets/{self.other.pk}/balance/?date=2025-07-08')
+        self.assertEqual(response.json()['balance'], '80.00')
+
+    def test_reconcile_balances_detects_and_fixes_drift(self):
+        call_command('reconcile_balances', stdout=io.StringIO())
+        Wallet.objects.filter(pk=self.wallet.pk).update(balance=Decimal('1'))
+
+        with self.assertRaises(CommandError):
+            call_command('reconcile_balances', stdout=io.StringIO())
+        call_command('reconcile_balances', '--fix', 'ledger', '--checkpoint', stdout=io.StringIO())
+
+        self.wallet.refresh_from_db()
+        self.assertEqual(self.wallet.balance, Decimal('1000000'))
+        self.assertTrue(BalanceCheckpoint.objects.filter(wallet=self.wallet, balance=Decimal('1000000')).exists())
+        call_command('reconcile_balances', stdout=io.StringIO())
+
+
+class BalanceConcurrencyTests(TransactionTestCase):
+    THREADS = 8
+    ROUNDS = 25
+
+    def setUp(self):
+        self.user = User.objects.create_user(username='testuser')
+        self.wallets = [Wallet.objects.create(user=self.user, name=f"Dompet {i}", balance=Decimal('1000'))
+                        for i in range(3)]
+
+    @staticmethod
+    def _retry_locked(work, *args):
+        # SQLite bisa menolak penulis kedua (database is locked) setelah busy timeout; ulangi seluruh operasi
+        while True:
+            try:
+                return work(*args)
+            except OperationalError as exc:
+                if connection.vendor != 'sqlite' or 'locked' not in str(exc):
+                    raise
+
+    def _run_threads(self, work):
+        errors = []
+
+        def target(index):
+            try:
+                for round_index in range(self.ROUNDS):
+                    self._retry_locked(work, index, round_index)
+            except Exception as exc:
+                errors.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=target, args=(i,)) for i in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+
+    def test_parallel_deltas_and_transfers_keep_balances_exact(self):
+        ids = [wallet.pk for wallet in self.wallets]
+
+        def work(index, round_index):
+            balances.apply_delta(ids[index % 3], Decimal('1.50'))
+            # Transfer berlawanan arah antar thread untuk menguji urutan penguncian
+            source, target = (ids[0], ids[1]) if index % 2 else (ids[1], ids[0])
+            balances.transfer(source, target, Decimal('2'), admin_fee=Decimal('0.10'))
+
+        self._run_threads(work)
+
+        total_credit = Decimal('1.50') * self.THREADS * self.ROUNDS
+        total_fees = Decimal('0.10') * self.THREADS * self.ROUNDS
+        current = {wallet.pk: wallet.balance for wallet in Wallet.objects.filter(pk__in=ids)}
+        self.assertEqual(sum(current.values()), Decimal('3000') + total_credit - total_fees)
+        # Dompet 2 hanya menerima delta langsung
+        self.assertEqual(current[ids[2]], Decimal('1000') + Decimal('1.50') * self.ROUNDS * 2)
+
+    def test_concurrent_deletes_refund_each_transaction_once(self):
+        wallet = self.wallets[0]
+        category = Category.objects.create(user=self.user, name="Makanan")
+        ids = []
+        for i in range(self.ROUNDS):
+            tx = Transaction.objects.create(user=self.user, wallet=wallet, category=category, amount=Decimal('10'),
+                                            admin_fee=Decimal('1'), transaction_type='PENGELUARAN',
+                                            transaction_date=date(2025, 7, 1 + i % 28))
+            balances.apply_delta(wallet.pk, balances.transaction_delta(tx))
+            rollups.record_transaction(tx)
+            ids.append(tx.pk)
+
+        def work(index, round_index):
+            # Sinyal pengecualian test client bersifat global, jadi error view tidak dilempar ke thread lain
+            client = Client(raise_request_exception=False)
+            client.force_login(self.user)
+            pk = ids[round_index]
+            # Jalur API, bulk, dan halaman web menghapus transaksi yang sama bersamaan
+            if index % 3 == 0:
+                response = client.delete(f'/api/transactions/{pk}/')
+                self.assertIn(response.status_code, (204, 404))
+            elif index % 3 == 1:
+                response = client.delete('/api/transactions/bulk/', [pk], content_type='application/json')
+                self.assertIn(response.status_code, (200, 400))
+            else:
+                # Penghapusan kedua di halaman web gagal seperti id lain yang tidak ada (Transaction.DoesNotExist)
+                client.post(reverse('transaction_delete', kwargs={'pk': pk}))
+
+        self._run_threads(work)
+
+        self.assertFalse(Transaction.objects.filter(pk__in=ids).exists())
+        self.assertEqual(Wallet.objects.get(pk=wallet.pk).balance, Decimal('1000'))
+        self.assertEqual(rollups.verify([self.user]), [])
+        self.assertFalse(MonthlySummary.objects.filter(user=self.user).exclude(transaction_count=0).exists())
+
+    def test_parallel_debits_never_overdraw(self):
+        wallet_id = self.wallets[0].pk
+
+        def work(index, round_index):
+            try:
+                balances.apply_delta(wallet_id, Decimal('-7'), require_funds=True)
+            except balances.InsufficientFunds:
+                pass
+
+        self._run_threads(work)
+
+        balance = Wallet.objects.get(pk=wallet_id).balance
+        self.assertGreaterEqual(balance, Decimal('0'))
+        self.assertEqual(balance, Decimal('1000') % Decimal('7'))
+
+
+class WalletAccessTests(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        self.wallet = Wallet.objects.create(user=self.user, name="BCA", balance=Decimal('1000000'))
+        self.owner = User.objects.create_user(username='pemilik')
+        self.shared = Wallet.objects.create(user=self.owner, name="Dompet Keluarga", balance=Decimal('500000'))
+        self.private = Wallet.objects.create(user=self.owner, name="Pribadi", balance=Decimal('0'))
+
+    def _ids(self):
+        # Objek user baru tiap kali: yang diuji cache antar-request, bukan memo per request
+        return access.accessible_wallet_ids(User.objects.get(pk=self.user.pk))
+
+    def test_resolved_once_and_cached_across_requests(self):
+        user = User.objects.get(pk=self.user.pk)
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(access.accessible_wallet_ids(user), [self.wallet.pk])
+            access.accessible_wallet_ids(user)
+        self.assertEqual(len(ctx.captured_queries), 1)
+        with self.assertNumQueries(1):
+            self.assertEqual(self._ids(), [self.wallet.pk])
+
+    def test_cache_follows_sharing_changes(self):
+        self.assertEqual(self._ids(), [self.wallet.pk])
+        self.shared.shared_with.add(self.user)
+        self.assertEqual(self._ids(), [self.wallet.pk, self.shared.pk])
+        self.user.shared_wallets.add(self.private)
+        self.assertEqual(self._ids(), [self.wallet.pk, self.shared.pk, self.private.pk])
+        self.private.shared_with.remove(self.user)
+        self.assertEqual(self._ids(), [self.wallet.pk, self.shared.pk])
+        self.shared.shared_with.clear()
+        self.assertEqual(self._ids(), [self.wallet.pk])
+
+        self.client.post(reverse('wallet_create'), {'name': 'GoPay', 'wallet_type': 'ASET', 'balance': '0'})
+        gopay = Wallet.objects.get(user=self.user, name='GoPay')
+        self.assertEqual(self._ids(), [self.wallet.pk, gopay.pk])
+        self.private.shared_with.add(self.user)
+        self.private.delete()
+        self.assertEqual(self._ids(), [self.wallet.pk, gopay.pk])
+
+    def test_list_views_filter_without_m2m_join_or_distinct(self):
+        self.shared.shared_with.add(self.user)
+        Transaction.objects.create(user=self.owner, wallet=self.shared, amount=Decimal('1000'), notes="Belanja bulanan",
+                                   transaction_type='PENGELUARAN', transaction_date=date.today())
+        Transfer.objects.create(user=self.owner, from_wallet=self.shared, to_wallet=self.private,
+                                amount=Decimal('1000'), transfer_date=date.today())
+        for name in ('transaction_list', 'transfer_list', 'budget_list', 'goal_list', 'debt_list'):
+            with self.subTest(view=name), CaptureQueriesContext(connection) as ctx:
+                response = self.client.get(reverse(name))
+                self.assertEqual(response.status_code, 200)
+                for query in ctx.captured_queries:
+                    if 'django_session' not in query['sql']:
+                        self.assertNotIn('DISTINCT', query['sql'])
+                        self.assertNotIn('INNER JOIN "transactions_wallet_shared_with"', query['sql'])
+        self.assertContains(self.client.get(reverse('transaction_list')), "Rp 1000")
+        self.assertEqual(len(self.client.get(reverse('transfer_list')).context['transfers']), 1)
+
+
+class PerformanceMiddlewareTests(BaseViewTest):
+    def test_server_timing_and_structured_log_for_html_and_api(self):
+        for url in (reverse('transaction_list'), '/api/transactions/'):
+            with self.subTest(url=url), self.assertLogs('finance_tracker_app.performance', 'DEBUG') as logs:
+                response = self.client.get(url)
+            record = json.loads(logs.records[-1].getMessage())
+            self.assertEqual((record['path'], record['status'], record['user']), (url, 200, self.user.pk))
+            self.assertGreater(record['queries'], 0)
+            self.assertLessEqual(len(record['slowest']), 5)
+            self.assertTrue(all(entry['sql'] for entry in record['slowest']))
+            self.assertRegex(response['Server-Timing'],
+                             rf'^db;dur=[\d.]+;desc="{record["queries"]} queries", view;dur=[\d.]+, total;dur=[\d.]+$')
+
+    def test_slow_requests_are_logged_with_query_list(self):
+        with self.settings(SLOW_REQUEST_MS=10 ** 6), self.assertNoLogs('finance_tracker_app.slow_requests'):
+            self.client.get(reverse('dashboard'))
+        with self.settings(SLOW_REQUEST_MS=0), self.assertLogs('finance_tracker_app.slow_requests') as logs:
+            self.client.get(reverse('dashboard'))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'dashboard')
+        self.assertEqual(len(record['query_list']), record['queries'])
+
+    def test_per_request_log_is_off_by_default(self):
+        self.assertFalse(logging.getLogger('finance_tracker_app.performance').isEnabledFor(logging.INFO))
+
+    async def test_runs_without_sync_adapter_under_asgi(self):
+        async def get_response(request):
+            return HttpResponse()
+
+        self.assertTrue(iscoroutinefunction(PerformanceMiddleware(get_response)))
+        await self.async_client.aforce_login(self.user)
+        with self.assertLogs('finance_tracker_app.performance', 'DEBUG') as logs:
+            response = await self.async_client.get(reverse('dashboard'))
+        record = json.loads(logs.records[-1].getMessage())
+        self.assertEqual((record['view'], record['user']), ('dashboard', self.user.pk))
+        self.assertGreater(record['queries'], 0)
+        self.assertIn('total;dur=', response['Server-Timing'])
+
+
+class DatabaseTuningTests(TestCase):
+    def test_sqlite_connections_get_pragmas_and_immediate_transactions(self):
+        if connection.vendor != 'sqlite':
+            self.skipTest("Hanya untuk SQLite")
+        with connection.cursor() as cursor:
+            pragmas = {name: cursor.execute(f'PRAGMA {name}').fetchone()[0]
+                       for name in ('journal_mode', 'synchronous', 'busy_timeout', 'cache_size')}
+        self.assertEqual(pragmas, {'journal_mode': 'wal', 'synchronous': 1, 'busy_timeout': 5000, 'cache_size': -64000})
+        self.assertEqual(connection.transaction_mode, 'IMMEDIATE')
+
+    def test_database_url_enables_health_checks_and_pool(self):
+        url = 'postgres://app:secret@db:5432/finance'
+        with mock.patch.dict(os.environ, {'DATABASE_URL': url, 'DB_POOL_MAX_SIZE': '20'}):
+            pooled = database.url_config()
+        with mock.patch.dict(os.environ, {'DATABASE_URL': url, 'DB_POOL': 'False', 'DB_CONN_MAX_AGE': '60'}):
+            persistent = database.url_config()
+
+        self.assertTrue(pooled['CONN_HEALTH_CHECKS'])
+        self.assertEqual(pooled['CONN_MAX_AGE'], 0)
+        self.assertEqual(pooled['OPTIONS']['pool'], {'min_size': 2, 'max_size': 20, 'timeout': 10})
+        self.assertEqual(pooled['OPTIONS']['sslmode'], 'require')
+        self.assertEqual(persistent['CONN_MAX_AGE'], 60)
+        self.assertNotIn('pool', persistent['OPTIONS'])
+
+
+class SyntheticDataTests(TestCase):
+    def test_seeded_data_is_consistent_and_benchmark_writes_json(self):
+        call_command('seed_synthetic', '--users', '3', '--transactions', '120', '--months', '3', '--batch-size', '50',
+                     '--share-every', '2', stdout=io.StringIO())
+        users = list(User.objects.filter(username__startswith='synth_').order_by('pk'))
+        self.assertEqual(len(users), 3)
+        self.assertEqual(Transaction.objects.count(), 360)
+        self.assertTrue(Transfer.objects.exists() and PurchaseItem.objects.exists())
+        self.assertEqual(Budget.objects.filter(user=users[0]).count(), 3 * 6)
+        self.assertEqual(Wallet.objects.filter(shared_with=users[1]).count(), 1)
+        self.assertEqual(rollups.verify(users), [])
+        call_command('reconcile_balances', stdout=io.StringIO())
+
+        with tempfile.TemporaryDirectory() as directory:
+            output = os.path.join(directory, 'run.json')
+            call_command('benchmark_hot_paths', '--iterations', '1', '--import-rows', '20', '--output', output,
+                         stdout=io.StringIO())
+            out = io.StringIO()
+            call_command('benchmark_hot_paths', '--iterations', '1', '--only', 'api_wallets', '--compare', output,
+                         '--output', os.path.join(directory, 'next.json'), stdout=out)
+            with open(output) as f:
+                report = json.load(f)
+        self.assertEqual(report['user'], users[0].username)
+        self.assertEqual(report['rows']['user_transactions'], 120)
+        self.assertEqual(set(report['results']), {
+            'dashboard', 'dashboard_cold', 'budget_list', 'transaction_list', 'transaction_export',
+            'transaction_import', 'api_transactions', 'api_budgets', 'api_budget_progress', 'api_transfers',
+            'api_wallets', 'api_categories', 'api_payees', 'api_cashflow_daily',
+            'api_net_worth_daily'})
+        for result in report['results'].values():
+            self.assertLess(result['status'], 400)
+            self.assertGreater(result['queries'], 0)
+        self.assertIn('api_wallets', out.getvalue())
+        # Impor benchmark selalu dibatalkan
+        self.assertEqual(Transaction.objects.count(), 360)
+
+
 class BudgetViewTests(BaseViewTest):
     def setUp(self):
         super().setUp()
@@ -176,6 +1695,35 @@ class BudgetViewTests(BaseViewTest):
         self.assertEqual(budget_in_context.remaining, Decimal('400000'))
         self.assertEqual(budget_in_context.percentage, 20)
 
+    def test_budget_spent_query_count_does_not_grow_with_budgets(self):
+        month = date.today().replace(day=1)
+
+        def count_queries(budget_count):
+            for i in range(budget_count):
+                category = Category.objects.create(user=self.user, name=f"Kategori {i}")
+                Budget.objects.create(user=self.user, category=category, amount=Decimal('100000'), month=month)
+                self.client.post(reverse('transaction_add'), {
+                    'wallet': self.wallet.pk, 'category': category.pk, 'payee': self.payee.name, 'amount': '25000',
+                    'transaction_type': 'PENGELUARAN', 'transaction_date': month.isoformat()})
+            # Isi cache akses dompet dulu agar yang dibandingkan hanya query anggarannya
+            access.accessible_wallet_ids(self.user)
+            with CaptureQueriesContext(connection) as html:
+                response = self.client.get(reverse('budget_list'))
+            with CaptureQueriesContext(connection) as api:
+                api_response = self.client.get('/api/budgets/progress/')
+            return response, api_response, len(html.captured_queries), len(api.captured_queries)
+
+        _, _, html_few, api_few = count_queries(2)
+        response, api_response, html_many, api_many = count_queries(20)
+
+        self.assertEqual(html_few, html_many)
+        self.assertEqual(api_few, api_many)
+        self.assertEqual(len(response.context['budgets']), 22)
+        self.assertTrue(all(budget.spent == Decimal('25000') for budget in response.context['budgets']))
+        self.assertEqual(len(api_response.json()), 22)
+        self.assertEqual(api_response.json()[0]['spent'], '25000.00')
+        self.assertEqual(api_response.json()[0]['percentage'], 25)
+
     def test_budget_create_view(self):
         form_data = {'category': self.category.pk, 'amount': '750000', 'month': '2025-08-01', }
 
@@ -282,4 +1830,187 @@ class PayeeViewTests(BaseViewTest):
     def test_payee_create_view(self):
         response = self.client.post(reverse('payee_create'), {'name': 'Penerima Baru'})
         self.assertRedirects(response, reverse('payee_list'))
-        self.assertTrue(Payee.objects.filter(name='Penerima Baru').exists())
\ No newline at end of file
+        self.assertTrue(Payee.objects.filter(name='Penerima Baru').exists())
+
+
+class PayeeSuggestTests(BaseViewTest):
+    def setUp(self):
+        super().setUp()
+        # Indeks disimpan per id pengguna di memori proses, sedangkan id bisa terpakai ulang antar-test
+        suggestions.clear()
+        self.wallet = Wallet.objects.create(user=self.user, name="BCA", balance=Decimal('10000000'))
+        self.padang = Payee.objects.create(user=self.user, name="Warung Padang")
+        self.pasar = Payee.objects.create(user=self.user, name="Pasar Baru")
+        self.cafe = Payee.objects.create(user=self.user, name="Café Pagi")
+        self.category = Category.objects.create(user=self.user, name="Belanja")
+
+    def _add(self, payee, day, count=1):
+        response = self.client.post('/api/transactions/bulk/', [
+            {'wallet': self.wallet.pk, 'payee': payee.pk, 'amount': '10000', 'transaction_type': 'PENGELUARAN',
+             'transaction_date': day.isoformat()} for _ in range(count)], content_type='application/json')
+        self.assertEqual(response.status_code, 201, response.content)
+        return [result['id'] for result in response.json()['results']]
+
+    def _names(self, query, **params):
+        response = self.client.get('/api/payees/suggest/', {'q': query, **params})
+        self.assertEqual(response.status_code, 200, response.content)
+        return [payee['name'] for payee in response.json()]
+
+    def test_counters_follow_every_write_path(self):
+        ids = self._add(self.padang, date(2025, 7, 1), count=3)
+        self.client.post(reverse('transaction_add'), {
+            'wallet': self.wallet.pk, 'category': self.category.pk, 'payee': "Pasar Baru", 'amount': '5000',
+            'admin_fee': '0',
+            'transaction_type': 'PENGELUARAN', 'transaction_date': '2025-07-09'})
+        self.client.delete('/api/transactions/bulk/', [ids[0]], content_type='application/json')
+        self.client.patch('/api/transactions/bulk/', [{'id': ids[1], 'payee': self.pasar.pk}],
+                          content_type='application/json')
+
+        usage = dict(Payee.objects.values_list('name', 'transaction_count'))
+        self.assertEqual((usage["Warung Padang"], usage["Pasar Baru"]), (1, 2))
+        self.assertEqual(Payee.objects.get(pk=self.pasar.pk).last_used, date(2025, 7, 9))
+
+        Payee.objects.update(transaction_count=0, last_used=None)
+        rollups.rebuild_payee_usage([self.user])
+        self.assertEqual(dict(Payee.objects.values_list('name', 'transaction_count')), usage)
+
+    def test_ranked_by_frequency_and_recency(self):
+        today = date.today()
+        self._add(self.padang, today - timedelta(days=200), count=6)
+        self._add(self.pasar, today - timedelta(days=2), count=2)
+        self._add(self.cafe, today - timedelta(days=1))
+
+        # Padang lebih sering, tetapi pemakaiannya sudah lama
+        self.assertEqual(self._names("pa"), ["Pasar Baru", "Café Pagi", "Warung Padang"])
+        self.assertEqual(self._names("", limit=1), ["Pasar Baru"])
+        self.assertEqual(self._names("PAD"), ["Warung Padang"])
+        self.assertEqual(self._names("cafe"), ["Café Pagi"])
+        self.assertEqual(self._names("warung pa"), ["Warung Padang"])
+        self.assertEqual(self._names("toko"), [])
+        self.assertEqual(self.client.get('/api/payees/suggest/', {'limit': 0}).status_code, 400)
+
+    def test_index_is_reused_until_payees_or_transactions_change(self):
+        self.assertEqual(self._names("pa"), ["Café Pagi", "Pasar Baru", "Warung Padang"])
+        with CaptureQueriesContext(connection) as ctx:
+            self._names("pas")
+        self.assertFalse([q for q in ctx.captured_queries if '"transactions_payee"' in q['sql']])
+
+        self.pasar.name = "Pasar Minggu"
+        self.pasar.save()
+        self.assertEqual(self._names("pasar"), ["Pasar Minggu"])
+        self._add(self.padang, date.today())
+        self.assertEqual(self._names("pa")[0], "Warung Padang")
+
+    def test_suggest_is_fast_with_thousands_of_payees(self):
+        Payee.objects.bulk_create([
+            Payee(user=self.user, name=f"Toko {random.choice(['Sinar', 'Maju', 'Jaya', 'Abadi'])} {i}",
+                  transaction_count=random.randint(0, 50), last_used=date.today() - timedelta(days=i % 400))
+            for i in range(5000)])
+        caching.bump_resource_version('payee', self.user)
+        user = User.objects.get(pk=self.user.pk)
+        self.assertEqual(len(suggestions.suggest(user, "toko")), suggestions.SUGGEST_LIMIT)
+
+        timings = []
+        for query in ["t", "to", "toko", "toko ja", "maju 12", "x"]:
+            started = time.perf_counter()
+            suggestions.suggest(user, query)
+            timings.append(time.perf_counter() - started)
+        self.assertLess(sorted(timings)[len(timings) // 2], 0.01)
+
+
+class QueryPlanTests(TestCase):
+    """EXPLAIN tiap query utama dan gagal jika tabel utamanya dibaca dengan full scan."""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser', password='password')
+        self.wallet = Wallet.objects.create(user=self.user, name="BCA")
+        self.category = Category.objects.create(user=self.user, name="Makanan")
+        self.request = RequestFactory().get('/')
+        self.request.user = self.user
+        if connection.vendor == 'postgresql':
+            # Tabel uji hampir kosong, paksa planner memilih indeks bila memang bisa dipakai
+            with connection.cursor() as cursor:
+                cursor.execute('SET enable_seqscan = off')
+
+    def assertNoFullScan(self, queryset, table):
+        plan = queryset.explain()
+        if connection.vendor == 'sqlite':
+            full_scan = re.search(rf'\bSCAN {table}\b(?! USING)', plan)
+        elif connection.vendor == 'postgresql':
+            full_scan = re.search(rf'Seq Scan on {table}\b', plan)
+        else:
+            self.skipTest(f"Pemeriksaan plan belum didukung untuk {connection.vendor}")
+        self.assertIsNone(full_scan, f"Full scan pada {table}:\n{plan}")
+
+    def _view_queryset(self, view_class):
+        view = view_class()
+        view.setup(self.request)
+        return view.get_queryset()
+
+    def test_transaction_list(self):
+        self.assertNoFullScan(self._view_queryset(TransactionListView), 'transactions_transaction')
+
+    def test_transaction_list_deep_page(self):
+        tx = Transaction.objects.create(user=self.user, wallet=self.wallet, amount=Decimal('1'),
+                                        transaction_type='PENGELUARAN', transaction_date=date(2025, 7, 1))
+        queryset = self._view_queryset(TransactionListView)
+        day, pk = pagination.decode_cursor(pagination.encode_cursor(tx))
+        queryset = queryset.filter(Q(transaction_date__lt=day) | Q(transaction_date=day, pk__lt=pk),
+                                   transaction_date__lte=day)[:51]
+        self.assertNoFullScan(queryset, 'transactions_transaction')
+
+    def test_api_transaction_filters(self):
+        payee = Payee.objects.create(user=self.user, name="Warung")
+        combinations = [
+            {'date_from': '2025-07-01', 'date_to': '2025-07-31'},
+            {'wallet': self.wallet.pk, 'date_from': '2025-07-01'},
+            {'category': self.category.pk, 'date_from': '2025-07-01', 'date_to': '2025-07-31'},
+            {'payee': payee.pk},
+            {'type': 'PENGELUARAN', 'date_from': '2025-07-01', 'date_to': '2025-07-31'},
+            {'amount_min': '1000', 'amount_max': '5000', 'ordering': 'amount'},
+            {'ordering': '-amount'},
+            {'ordering': 'transaction_date', 'wallet': self.wallet.pk},
+        ]
+        for params in combinations:
+            with self.subTest(params=params):
+                filters = TransactionFilterSerializer(data=params)
+                self.assertTrue(filters.is_valid(), filters.errors)
+                ordering = filters.validated_data['ordering']
+                queryset = Transaction.objects.filter(user=self.user, **filters.filters()).order_by(
+                    ordering, '-id' if ordering.startswith('-') else 'id')[:51]
+                self.assertNoFullScan(queryset, 'transactions_transaction')
+
+    def test_latest_transaction(self):
+        queryset = Transaction.objects.filter(user=self.user).order_by('-transaction_date')[:1]
+        self.assertNoFullScan(queryset, 'transactions_transaction')
+
+    def test_export(self):
+        queryset = Transaction.objects.filter(user=self.user).order_by('transaction_date').values_list(
+            'transaction_date', 'payee__name', 'category__name', 'wallet__name')
+        self.assertNoFullScan(queryset, 'transactions_transaction')
+
+    def test_dashboard_month_totals(self):
+        for trans_type in ('PEMASUKAN', 'PENGELUARAN'):
+            queryset = MonthlySummary.objects.filter(user=self.user, month=date(2025, 7, 1),
+                                                     transaction_type=trans_type).values('total_amount')
+            self.assertNoFullScan(queryset, 'transactions_monthlysummary')
+
+    def test_dashboard_expense_by_category(self):
+        queryset = MonthlySummary.objects.filter(user=self.user, month=date(2025, 7, 1),
+                                                 transaction_type='PENGELUARAN').values(
+            'category__name').annotate(total=Sum('total_amount')).order_by('-total')
+        self.assertNoFullScan(queryset, 'transactions_monthlysummary')
+
+    def test_budget_list(self):
+        self.assertNoFullScan(self._view_queryset(BudgetListView), 'transactions_budget')
+
+    def test_budget_spent(self):
+        queryset = MonthlySummary.objects.filter(wallet_id__in=access.accessible_wallet_ids(self.user),
+                                                 category=self.category,
+                                                 transaction_type='PENGELUARAN', month=date(2025, 7, 1)).values(
+            'total_amount')
+        self.assertNoFullScan(queryset, 'transactions_monthlysummary')
+
+    def test_transfer_list(self):
+        self.assertNoFullScan(self._view_queryset(TransferListView), 'transactions_transfer')
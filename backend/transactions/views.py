@@ -4,42 +4,72 @@ import json
 from datetime import date
 from decimal import Decimal
 
+from asgiref.sync import sync_to_async
+from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth.decorators import login_required
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.db import transaction
 from django.db.models import Sum, Q, F
-from django.http import HttpResponse, JsonResponse
+from django.http import Http404, JsonResponse, StreamingHttpResponse
 from django.middleware.csrf import get_token
 from django.shortcuts import render, redirect
 from django.urls import reverse, reverse_lazy
 from django.views.generic import ListView, CreateView, UpdateView, DeleteView, View
 
 from .forms import WalletUpdateForm, PurchaseItemForm
-from .models import Transaction, Category, Wallet, Payee, Budget, FinancialGoal, Debt, Transfer, Product, PurchaseItem
+from . import balances, caching, concurrency, jobs, reports, rollups, search
+from .access import accessible_wallet_ids, accessible_wallets
+from .exporters import iter_transaction_csv
+from .importers import TransactionImporter
+from .pagination import InvalidCursor, TRANSACTION_PAGE_SIZE, keyset_page
+from .models import (Transaction, Category, Wallet, Payee, Budget, FinancialGoal, Debt, Transfer, Product, PurchaseItem,
+                     MonthlySummary, Job)
+
+
+class DataVersionMixin:
+    # Untuk view edit generik yang mengubah data dasbor pengguna
+    def form_valid(self, form):
+        response = super().form_valid(form)
+        caching.bump_data_version(self.request.user)
+        return response
 
 
 class TransactionListView(LoginRequiredMixin, ListView):
     model = Transaction
     template_name = 'transactions/index.html'
     context_object_name = 'transactions'
+    paginate_by = TRANSACTION_PAGE_SIZE
 
     def get_queryset(self):
         user = self.request.user
-        return (
-        Transaction.objects.filter(Q(user=user) | Q(wallet__shared_with=user)).distinct().order_by('-transaction_date'))
+        return (Transaction.objects.filter(Q(user=user) | Q(wallet_id__in=accessible_wallet_ids(user)))
+                .select_related('payee', 'category').order_by('-transaction_date', '-id'))
+
+    def paginate_queryset(self, queryset, page_size):
+        query = self.request.GET.get('q', '').strip()
+        if query:
+            # Hasil pencarian diurutkan menurut relevansi, cukup satu halaman
+            return None, None, search.search_transactions(self.request.user, query, page_size), False
+        # Keyset, bukan OFFSET: ?cursor= menunjuk transaksi terakhir di halaman sebelumnya
+        try:
+            page = keyset_page(queryset, self.request.GET.get('cursor'), page_size)
+        except InvalidCursor as e:
+            raise Http404(str(e))
+        return None, page, page.object_list, page.has_next() or 'cursor' in self.request.GET
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         user = self.request.user
         context['categories'] = Category.objects.filter(user=user)
-        accessible_wallets = Wallet.objects.filter(Q(user=user) | Q(shared_with=user)).distinct()
-        context['wallets'] = accessible_wallets
+        context['wallets'] = accessible_wallets(user)
         context['payees'] = Payee.objects.filter(user=user)
+        context['search_query'] = self.request.GET.get('q', '').strip()
         return context
 
 
 @login_required
+@transaction.atomic
 def transaction_add(request):
     if request.method == 'POST':
         user = request.user
@@ -56,36 +86,28 @@ def transaction_add(request):
         category = Category.objects.get(pk=category_id, user=user)
         payee, _ = Payee.objects.get_or_create(name=payee_name, defaults={'user': user})
 
-        Transaction.objects.create(user=user, wallet=wallet, payee=payee, category=category, amount=amount,
-                                   admin_fee=admin_fee, transaction_type=trans_type, transaction_date=trans_date,
-                                   notes=notes)
-
-        total_expense = amount + admin_fee
-        if trans_type == 'PENGELUARAN':
-            wallet.balance -= total_expense
-        elif trans_type == 'PEMASUKAN':
-            wallet.balance += amount
-        wallet.save()
+        new_transaction = Transaction.objects.create(user=user, wallet=wallet, payee=payee, category=category,
+                                                     amount=amount, admin_fee=admin_fee, transaction_type=trans_type,
+                                                     transaction_date=trans_date, notes=notes)
+        rollups.record_transaction(new_transaction)
+        balances.apply_delta(wallet.pk, balances.transaction_delta(new_transaction))
+        caching.bump_data_version(user)
 
     return redirect(reverse('transaction_list'))
 
 
 @login_required
+@transaction.atomic
 def transaction_delete(request, pk):
     if request.method == 'POST':
-        transaction = Transaction.objects.get(pk=pk, user=request.user)
-        wallet = transaction.wallet
-        amount = transaction.amount
-        admin_fee = transaction.admin_fee
-
-        total_expense = amount + admin_fee
-        if transaction.transaction_type == 'PENGELUARAN':
-            wallet.balance += total_expense
-        elif transaction.transaction_type == 'PEMASUKAN':
-            wallet.balance -= amount
-        wallet.save()
+        # Dikunci agar penghapusan bersamaan tidak mengembalikan saldo dua kali
+        transaction = Transaction.objects.select_for_update(of=('self',)).select_related('wallet').get(
+            pk=pk, user=request.user)
+        balances.apply_delta(transaction.wallet_id, -balances.transaction_delta(transaction))
 
+        rollups.record_transaction(transaction, sign=-1)
         transaction.delete()
+        caching.bump_data_version(request.user, transaction.wallet.user_id)
 
     return redirect(reverse('transaction_list'))
 
@@ -96,11 +118,19 @@ class TransactionUpdateView(LoginRequiredMixin, UpdateView):
     template_name = 'transactions/transaction_form.html'
 
     def get_queryset(self):
-        return Transaction.objects.filter(user=self.request.user)
+        queryset = Transaction.objects.filter(user=self.request.user)
+        if self.request.method == 'POST':
+            # Baris dikunci sampai commit agar pembalikan saldo dihitung dari nilai terbaru
+            queryset = queryset.select_for_update(of=('self',))
+        return queryset
 
     def get_success_url(self):
         return reverse_lazy('transaction_list')
 
+    def post(self, request, *args, **kwargs):
+        with transaction.atomic():
+            return super().post(request, *args, **kwargs)
+
     def form_valid(self, form):
         # Ambil data lama sebelum disimpan
         old_transaction = self.get_object()
@@ -108,22 +138,17 @@ class TransactionUpdateView(LoginRequiredMixin, UpdateView):
         self.object = form.save(commit=False)
 
         old_wallet = old_transaction.wallet
-        if old_transaction.transaction_type == 'PENGELUARAN':
-            old_wallet.balance += (old_transaction.amount + old_transaction.admin_fee)
-        elif old_transaction.transaction_type == 'PEMASUKAN':
-            old_wallet.balance -= old_transaction.amount
-
-        if old_wallet.pk != self.object.wallet.pk:
-            old_wallet.save()
-
         new_wallet = self.object.wallet
-        if self.object.transaction_type == 'PENGELUARAN':
-            new_wallet.balance -= (self.object.amount + self.object.admin_fee)
-        elif self.object.transaction_type == 'PEMASUKAN':
-            new_wallet.balance += self.object.amount
-        new_wallet.save()
+        balances.apply_deltas([(old_wallet.pk, -balances.transaction_delta(old_transaction)),
+                               (new_wallet.pk, balances.transaction_delta(self.object))])
 
         self.object.save()
+
+        batch = rollups.RollupBatch()
+        batch.add_transaction(old_transaction, sign=-1)
+        batch.add_transaction(self.object)
+        batch.apply()
+        caching.bump_data_version(self.request.user, old_wallet.user_id, new_wallet.user_id)
         return redirect(self.get_success_url())
 
 
@@ -137,33 +162,18 @@ def transaction_import(request):
             messages.error(request, 'File harus berformat CSV.')
             return redirect(reverse('transaction_import'))
 
-        data_set = csv_file.read().decode('UTF-8')
-        io_string = io.StringIO(data_set)
+        if csv_file.size > settings.IMPORT_JOB_THRESHOLD_BYTES:
+            job = jobs.enqueue(request.user, Job.Kind.IMPORT, csv_file.name, csv_file.read())
+            messages.success(request, f'File besar diimpor di latar belakang (job #{job.pk}); '
+                                      f'transaksi muncul setelah job selesai.')
+            return redirect(reverse('transaction_list'))
+
+        io_string = io.TextIOWrapper(csv_file.file, encoding='UTF-8', newline='')
 
         next(io_string)
 
         reader = csv.reader(io_string)
-        for row in reader:
-            trans_date_str, trans_type, payee_name, category_name, amount_str, admin_fee_str, wallet_name, notes = row
-
-            user = request.user
-            amount = Decimal(amount_str)
-            admin_fee = Decimal(admin_fee_str or 0)
-
-            wallet, _ = Wallet.objects.get_or_create(name=wallet_name, user=user)
-            category, _ = Category.objects.get_or_create(name=category_name, user=user)
-            payee, _ = Payee.objects.get_or_create(name=payee_name, user=user)
-
-            Transaction.objects.create(user=user, wallet=wallet, category=category, payee=payee, amount=amount,
-                                       admin_fee=admin_fee, transaction_type=trans_type,
-                                       transaction_date=trans_date_str, notes=notes)
-
-            total_expense = amount + admin_fee
-            if trans_type == 'PENGELUARAN':
-                wallet.balance -= total_expense
-            elif trans_type == 'PEMASUKAN':
-                wallet.balance += amount
-            wallet.save()
+        TransactionImporter(request.user).import_rows(reader)
 
         messages.success(request, 'Data berhasil diimpor.')
         return redirect(reverse('transaction_list'))
@@ -173,21 +183,8 @@ def transaction_import(request):
 
 @login_required
 def export_transactions(request):
-    response = HttpResponse(content_type='text/csv')
+    response = StreamingHttpResponse(iter_transaction_csv(request.user), content_type='text/csv')
     response['Content-Disposition'] = 'attachment; filename="transaksi.csv"'
-
-    writer = csv.writer(response)
-    # Tulis baris header
-    writer.writerow(['Tanggal', 'Tipe', 'Penerima/Tujuan', 'Kategori', 'Jumlah', 'Biaya Admin', 'Dompet', 'Catatan'])
-
-    # Ambil data transaksi milik pengguna dan urutkan
-    transactions = Transaction.objects.filter(user=request.user).order_by('transaction_date')
-
-    # Tulis data baris per baris
-    for tx in transactions:
-        writer.writerow([tx.transaction_date, tx.get_transaction_type_display(), tx.payee.name if tx.payee else '',
-                         tx.category.name if tx.category else '', tx.amount, tx.admin_fee, tx.wallet.name, tx.notes])
-
     return response
 
 
@@ -199,27 +196,13 @@ class BudgetListView(LoginRequiredMixin, ListView):
     def get_queryset(self):
         today = date.today()
         first_day_of_month = today.replace(day=1)
-        return Budget.objects.filter(user=self.request.user, month__gte=first_day_of_month).order_by('month',
-                                                                                                     'category__name')
+        budgets = Budget.objects.filter(user=self.request.user, month__gte=first_day_of_month).select_related(
+            'category').order_by('month', 'category__name')
+        return reports.with_budget_spent(budgets, self.request.user)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        user = self.request.user
-        budgets = context['budgets']
-
-        accessible_wallets = Wallet.objects.filter(Q(user=user) | Q(shared_with=user)).distinct()
-
-        for budget in budgets:
-            spent = Transaction.objects.filter(wallet__in=accessible_wallets, category=budget.category,
-                transaction_type='PENGELUARAN', transaction_date__year=budget.month.year,
-                transaction_date__month=budget.month.month).aggregate(total_spent=Sum('amount'))[
-                        'total_spent'] or Decimal(0)
-
-            budget.spent = spent
-            budget.remaining = budget.amount - spent
-            budget.percentage = int((spent / budget.amount) * 100) if budget.amount > 0 else 0
-
-        context['budgets'] = budgets
+        context['budgets'] = [reports.set_budget_progress(budget) for budget in context['budgets']]
         return context
 
 
@@ -250,7 +233,7 @@ class FinancialGoalListView(LoginRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         user = self.request.user
-        context['wallets'] = Wallet.objects.filter(Q(user=user) | Q(shared_with=user)).distinct()
+        context['wallets'] = accessible_wallets(user)
         return context
 
 
@@ -266,6 +249,7 @@ class FinancialGoalCreateView(LoginRequiredMixin, CreateView):
 
 
 @login_required
+@transaction.atomic
 def add_saving_to_goal(request, pk):
     user = request.user
     goal = FinancialGoal.objects.get(pk=pk, user=user)
@@ -274,18 +258,20 @@ def add_saving_to_goal(request, pk):
         souce_wallet_id = request.POST.get('source_wallet')
         source_wallet = Wallet.objects.get(pk=souce_wallet_id, user=user)
 
-        if source_wallet.balance >= amount_to_add:
+        try:
+            balances.apply_delta(source_wallet.pk, -amount_to_add, require_funds=True)
+        except balances.InsufficientFunds:
+            messages.error(request, f"Saldo di {source_wallet.name} tidak mencukupi.")
+        else:
             saving_category, _ = Category.objects.get_or_create(name='Tabungan Tujuan', user=user)
 
-            Transaction.objects.create(user=user, wallet=source_wallet, category=saving_category, amount=amount_to_add,
-                                       transaction_type='PENGELUARAN', transaction_date=datetime.today(),
-                                       notes=f"Menabung untuk {goal.name}")
-
-            source_wallet.balance -= amount_to_add
-            source_wallet.save()
+            saving = Transaction.objects.create(user=user, wallet=source_wallet, category=saving_category,
+                                                amount=amount_to_add, transaction_type='PENGELUARAN',
+                                                transaction_date=date.today(), notes=f"Menabung untuk {goal.name}")
+            rollups.record_transaction(saving)
 
-            goal.current_amount += amount_to_add
-            goal.save()
+            FinancialGoal.objects.filter(pk=goal.pk).update(current_amount=F('current_amount') + amount_to_add)
+            caching.bump_data_version(user)
 
     return redirect(reverse('goal_list'))
 
@@ -301,11 +287,11 @@ class DebtListView(LoginRequiredMixin, ListView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         user = self.request.user
-        context['wallets'] = Wallet.objects.filter(Q(user=user) | Q(shared_with=user)).distinct()
+        context['wallets'] = accessible_wallets(user)
         return context
 
 
-class DebtCreateView(LoginRequiredMixin, CreateView):
+class DebtCreateView(LoginRequiredMixin, DataVersionMixin, CreateView):
     model = Debt
     fields = ['lender_name', 'initial_amount', 'due_date', 'notes']
     template_name = 'transactions/debt_form.html'
@@ -317,6 +303,7 @@ class DebtCreateView(LoginRequiredMixin, CreateView):
 
 
 @login_required
+@transaction.atomic
 def pay_debt(request, pk):
     user = request.user
     debt = Debt.objects.get(pk=pk, user=user)
@@ -325,20 +312,22 @@ def pay_debt(request, pk):
         souce_wallet_id = request.POST.get('source_wallet')
         source_wallet = Wallet.objects.get(pk=souce_wallet_id, user=user)
 
-        if source_wallet.balance >= amount_to_pay:
-            debt_category, _ = Category.objects.get_or_create(name='Pembayaran Utang', user=user)
+        try:
+            balances.apply_delta(source_wallet.pk, -amount_to_pay, require_funds=True)
+        except balances.InsufficientFunds:
+            messages.error(request, f"Saldo di {source_wallet.name} tidak mencukupi.")
+        else:
+            debt_category, _ = Category.objects.get_or_create(name=reports.DEBT_PAYMENT_CATEGORY, user=user)
             payee, _ = Payee.objects.get_or_create(name=debt.lender_name, user=user)
 
-            Transaction.objects.create(user=user, wallet=source_wallet, category=debt_category, payee=payee,
-                                       amount=amount_to_pay, transaction_type='PENGELUARAN',
-                                       transaction_date=datetime.today(),
-                                       notes=f"Pembayaran utang kepada {debt.lender_name}")
+            payment = Transaction.objects.create(user=user, wallet=source_wallet, category=debt_category, payee=payee,
+                                                 amount=amount_to_pay, transaction_type='PENGELUARAN',
+                                                 transaction_date=date.today(),
+                                                 notes=f"Pembayaran utang kepada {debt.lender_name}")
+            rollups.record_transaction(payment)
 
-            source_wallet.balance -= amount_to_pay
-            source_wallet.save()
-
-            debt.current_balance -= amount_to_pay
-            debt.save()
+            Debt.objects.filter(pk=debt.pk).update(current_balance=F('current_balance') - amount_to_pay)
+            caching.bump_data_version(user)
 
     return redirect(reverse('debt_list'))
 
@@ -349,11 +338,10 @@ class TransferListView(LoginRequiredMixin, ListView):
     context_object_name = 'transfers'
 
     def get_queryset(self):
-        user = self.request.user
-        accessible_wallets = Wallet.objects.filter(Q(user=user) | Q(shared_with=user)).distinct()
+        wallet_ids = accessible_wallet_ids(self.request.user)
         return Transfer.objects.filter(
-            Q(from_wallet__in=accessible_wallets) | Q(to_wallet__in=accessible_wallets)
-        ).distinct().order_by('-transfer_date')
+            Q(from_wallet_id__in=wallet_ids) | Q(to_wallet_id__in=wallet_ids)
+        ).order_by('-transfer_date')
 
 class TransferCreateView(LoginRequiredMixin, CreateView):
     model = Transfer
@@ -361,30 +349,27 @@ class TransferCreateView(LoginRequiredMixin, CreateView):
     template_name = 'transactions/transfer_form.html'
     success_url = reverse_lazy('transfer_list')
 
+    @transaction.atomic
     def form_valid(self, form):
         form.instance.user = self.request.user
         transfer = form.save(commit=False)
         from_wallet = transfer.from_wallet
         to_wallet = transfer.to_wallet
-        amount = transfer.amount
-        admin_fee = transfer.admin_fee
 
         if from_wallet == to_wallet:
             messages.error(self.request, "Dompet asal dan tujuan tidak boleh sama.")
             return self.form_invalid(form)
 
-        if from_wallet.balance < (amount + admin_fee):
+        try:
+            balances.transfer(from_wallet.pk, to_wallet.pk, transfer.amount, transfer.admin_fee)
+        except balances.InsufficientFunds:
             messages.error(self.request, f"Saldo di {from_wallet.name} tidak mencukupi.")
             return self.form_invalid(form)
 
-        from_wallet.balance -= (amount + admin_fee)
-        to_wallet.balance += amount
-
-        from_wallet.save()
-        to_wallet.save()
-
+        self.object = transfer
         transfer.save()
-        return super().form_valid(form)
+        caching.bump_data_version(self.request.user)
+        return redirect(self.get_success_url())
 
     def get_form(self, form_class=None):
         form = super().get_form(form_class)
@@ -394,34 +379,29 @@ class TransferCreateView(LoginRequiredMixin, CreateView):
         return form
 
 
-@login_required
-def dashboard_view(request):
-    user = request.user
-    latest_transaction = Transaction.objects.filter(user=user).order_by('-transaction_date').first()
-
-    if latest_transaction:
-        relevant_date = latest_transaction.transaction_date
-    else:
-        relevant_date = date.today()
+async def dashboard_context(user):
+    # Query yang saling independen dijalankan bersamaan; bulan yang ditampilkan bergantung pada transaksi terakhir
+    latest_date, total_assets, total_liabilities = await concurrency.gather(
+        lambda: Transaction.objects.filter(user=user).order_by('-transaction_date')
+        .values_list('transaction_date', flat=True).first(),
+        lambda: Wallet.objects.filter(user=user, wallet_type='ASET').aggregate(total=Sum('balance'))['total'] or 0,
+        lambda: Debt.objects.filter(user=user).aggregate(total=Sum('current_balance'))['total'] or 0,
+    )
 
+    relevant_date = latest_date or date.today()
     first_day_of_month = relevant_date.replace(day=1)
 
-    total_assets = Wallet.objects.filter(user=user, wallet_type='ASET').aggregate(total=Sum('balance'))['total'] or 0
-    total_liabilities = Debt.objects.filter(user=user).aggregate(total=Sum('current_balance'))['total'] or 0
-
-    income_this_month = \
-        Transaction.objects.filter(user=user, transaction_type='PEMASUKAN', transaction_date__gte=first_day_of_month,
-                                   transaction_date__month=first_day_of_month.month).aggregate(total=Sum('amount'))[
-            'total'] or 0
+    # Dibaca dari ringkasan bulanan, bukan agregasi ulang seluruh transaksi
+    month_summaries = MonthlySummary.objects.filter(user=user, month=first_day_of_month)
 
-    expense_this_month = \
-        Transaction.objects.filter(user=user, transaction_type='PENGELUARAN', transaction_date__gte=first_day_of_month,
-                                   transaction_date__month=first_day_of_month.month).aggregate(total=Sum('amount'))[
-            'total'] or 0
-
-    expense_by_category = Transaction.objects.filter(user=user, transaction_type='PENGELUARAN',
-                                                     transaction_date__gte=first_day_of_month).values(
-        'category__name').annotate(total=Sum('amount')).order_by('-total')
+    income_this_month, expense_this_month, expense_by_category = await concurrency.gather(
+        lambda: month_summaries.filter(transaction_type='PEMASUKAN').aggregate(
+            total=Sum('total_amount'))['total'] or 0,
+        lambda: month_summaries.filter(transaction_type='PENGELUARAN').aggregate(
+            total=Sum('total_amount'))['total'] or 0,
+        lambda: list(month_summaries.filter(transaction_type='PENGELUARAN').values('category__name').annotate(
+            total=Sum('total_amount')).order_by('-total')),
+    )
 
     chart_labels = [item['category__name'] for item in expense_by_category]
     chart_data = [float(item['total']) for item in expense_by_category]
@@ -430,7 +410,15 @@ def dashboard_view(request):
                'net_worth': total_assets - total_liabilities, 'income_this_month': income_this_month,
                'expense_this_month': expense_this_month, 'chart_labels': json.dumps(chart_labels),
                'chart_data': json.dumps(chart_data), }
-    return render(request, 'transactions/dashboard.html', context)
+    return context
+
+
+@login_required
+async def dashboard_view(request):
+    user = await request.auser()
+    context = await caching.aget_or_build('dashboard', user, lambda: dashboard_context(user))
+    # Template membaca request.user (context processor auth) secara sinkron
+    return await sync_to_async(render)(request, 'transactions/dashboard.html', context)
 
 
 class WalletListView(LoginRequiredMixin, ListView):
@@ -442,18 +430,21 @@ class WalletListView(LoginRequiredMixin, ListView):
         return Wallet.objects.filter(user=self.request.user)
 
 
-class WalletCreateView(LoginRequiredMixin, CreateView):
+class WalletCreateView(LoginRequiredMixin, DataVersionMixin, CreateView):
     model = Wallet
     fields = ['name', 'wallet_type', 'balance']
     template_name = 'transactions/wallet_form.html'
     success_url = reverse_lazy('wallet_list')
 
+    @transaction.atomic
     def form_valid(self, form):
         form.instance.user = self.request.user
-        return super().form_valid(form)
+        response = super().form_valid(form)
+        balances.record_wallet_saved(self.object)
+        return response
 
 
-class WalletUpdateView(LoginRequiredMixin, UpdateView):
+class WalletUpdateView(LoginRequiredMixin, DataVersionMixin, UpdateView):
     model = Wallet
     form_class = WalletUpdateForm
     template_name = 'transactions/wallet_form.html'
@@ -467,8 +458,15 @@ class WalletUpdateView(LoginRequiredMixin, UpdateView):
     def get_queryset(self):
         return Wallet.objects.filter(user=self.request.user)
 
+    @transaction.atomic
+    def form_valid(self, form):
+        old_balance = Wallet.objects.select_for_update().values_list('balance', flat=True).get(pk=self.object.pk)
+        response = super().form_valid(form)
+        balances.record_wallet_saved(self.object, old_balance)
+        return response
+
 
-class WalletDeleteView(LoginRequiredMixin, DeleteView):
+class WalletDeleteView(LoginRequiredMixin, DataVersionMixin, DeleteView):
     model = Wallet
     template_name = 'transactions/wallet_confirm_delete.html'
     success_url = reverse_lazy('wallet_list')
@@ -497,7 +495,7 @@ class CategoryCreateView(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
 
-class CategoryUpdateView(LoginRequiredMixin, UpdateView):
+class CategoryUpdateView(LoginRequiredMixin, DataVersionMixin, UpdateView):
     model = Category
     fields = ['name', 'description']
     template_name = 'transactions/category_form.html'
@@ -507,7 +505,7 @@ class CategoryUpdateView(LoginRequiredMixin, UpdateView):
         return Category.objects.filter(user=self.request.user)
 
 
-class CategoryDeleteView(LoginRequiredMixin, DeleteView):
+class CategoryDeleteView(LoginRequiredMixin, DataVersionMixin, DeleteView):
     model = Category
     template_name = 'transactions/category_confirm_delete.html'
     success_url = reverse_lazy('category_list')
@@ -515,6 +513,11 @@ class CategoryDeleteView(LoginRequiredMixin, DeleteView):
     def get_queryset(self):
         return Category.objects.filter(user=self.request.user)
 
+    @transaction.atomic
+    def form_valid(self, form):
+        rollups.fold_category(self.object)
+        return super().form_valid(form)
+
 
 class PayeeListView(LoginRequiredMixin, ListView):
     model = Payee
@@ -565,16 +568,15 @@ class TransactionDetailView(LoginRequiredMixin, View):
         }
         return render(request, 'transactions/transaction_detail.html', context)
 
+    @transaction.atomic
     def post(self, request, pk):
-        transaction = Transaction.objects.get(pk=pk, user=request.user)
+        transaction = Transaction.objects.select_related('wallet').get(pk=pk, user=request.user)
         form = PurchaseItemForm(request.POST)
 
         if form.is_valid():
-            wallet = transaction.wallet
-            old_transaction_total = transaction.amount + transaction.admin_fee
-
-            if transaction.transaction_type == 'PENGELUARAN':
-                wallet.balance += old_transaction_total
+            old_delta = balances.transaction_delta(transaction)
+            batch = rollups.RollupBatch()
+            batch.add_transaction(transaction, sign=-1)
 
             product_name = form.cleaned_data['product_name']
             product, _ = Product.objects.get_or_create(
@@ -596,57 +598,53 @@ class TransactionDetailView(LoginRequiredMixin, View):
 
             transaction.amount = new_amount
             transaction.save()
+            batch.add_transaction(transaction)
+            batch.apply()
 
-            new_transaction_total = transaction.amount + transaction.admin_fee
-            if transaction.transaction_type == 'PENGELUARAN':
-                wallet.balance -= new_transaction_total
-
-            wallet.save()
+            balances.apply_delta(transaction.wallet_id, balances.transaction_delta(transaction) - old_delta)
+            caching.bump_data_version(request.user, transaction.wallet.user_id)
 
         return redirect(reverse('transaction_detail', kwargs={'pk': pk}))
 
 
 @login_required
+@transaction.atomic
 def purchase_item_delete(request, pk):
     if request.method == 'POST':
-        item = PurchaseItem.objects.get(pk=pk, user=request.user)
+        item = PurchaseItem.objects.select_related('transaction__wallet').get(pk=pk, user=request.user)
         transaction = item.transaction
-        wallet = transaction.wallet
 
-        old_transaction_total = transaction.amount + transaction.admin_fee
+        old_delta = balances.transaction_delta(transaction)
+        batch = rollups.RollupBatch()
+        batch.add_transaction(transaction, sign=-1)
 
         item.delete()
 
-        if transaction.transaction_type == 'PENGELUARAN':
-            wallet.balance += old_transaction_total
-
         new_amount = transaction.items.aggregate(
             total=Sum(F('quantity') * F('price'))
         )['total'] or Decimal(0)
 
         transaction.amount = new_amount
         transaction.save()
+        batch.add_transaction(transaction)
+        batch.apply()
 
-        new_transaction_total = transaction.amount + transaction.admin_fee
-        if transaction.transaction_type == 'PENGELUARAN':
-            wallet.balance -= new_transaction_total
-
-        wallet.save()
+        balances.apply_delta(transaction.wallet_id, balances.transaction_delta(transaction) - old_delta)
+        caching.bump_data_version(request.user, transaction.wallet.user_id)
 
     return redirect(reverse('transaction_detail', kwargs={'pk': transaction.pk}))
 
 
 @login_required
+@transaction.atomic
 def purchase_item_update(request, pk):
     if request.method == 'POST':
-        item = PurchaseItem.objects.get(pk=pk, user=request.user)
+        item = PurchaseItem.objects.select_related('transaction__wallet').get(pk=pk, user=request.user)
         transaction = item.transaction
-        wallet = transaction.wallet
-
-        old_transaction_total = transaction.amount + transaction.admin_fee
 
-        if transaction.transaction_type == 'PENGELUARAN':
-            wallet.balance += old_transaction_total
+        old_delta = balances.transaction_delta(transaction)
+        batch = rollups.RollupBatch()
+        batch.add_transaction(transaction, sign=-1)
 
         product_name = request.POST.get('product_name')
         product, _ = Product.objects.get_or_create(name=product_name, user=request.user,
@@ -662,12 +660,11 @@ def purchase_item_update(request, pk):
 
         transaction.amount = new_amount
         transaction.save()
+        batch.add_transaction(transaction)
+        batch.apply()
 
-        new_transaction_total = transaction.amount + transaction.admin_fee
-        if transaction.transaction_type == 'PENGELUARAN':
-            wallet.balance -= new_transaction_total
-
-        wallet.save()
+        balances.apply_delta(transaction.wallet_id, balances.transaction_delta(transaction) - old_delta)
+        caching.bump_data_version(request.user, transaction.wallet.user_id)
 
     return redirect(reverse('transaction_detail', kwargs={'pk': transaction.pk}))
 